@@ -1,40 +1,106 @@
+import time
+INICIO_PROGRAMA = time.perf_counter()  # Referência para as fases da inicialização
+
 import tkinter as tk
 from tkinter import ttk, messagebox
-from tkcalendar import Calendar
 import datetime
-import json
+import logging
 import os
-import re
+import threading
+
+from autocompletar import ComboboxAutocompletar
+from diagnostico import medidor
+from lista_virtual import ListaVirtual
+from indices import normalizar_processo
+from lembretes import ANTECEDENCIA_MAXIMA, AgendaLembretes
+from nucleo import Repositorio, validar_dias_uteis
+from marcadores import CORES_MARCADORES, MarcadoresCalendario, texto_marcador
+from painel import DIAS_PAINEL, PainelPericias
 
 # Caminho absoluto para salvar e carregar corretamente os arquivos JSON
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-PRAZOS_FILE = os.path.join(BASE_DIR, "prazos.json")
-PERITOS_FILE = os.path.join(BASE_DIR, "peritos.json")
-PERICIAS_FILE = os.path.join(BASE_DIR, "pericias.json")
 
-def carregar_dados(file):
-    """Carrega dados de um arquivo JSON"""
+# "json" reescreve o arquivo inteiro a cada alteração; "diario" acrescenta
+# só as chaves alteradas num diário JSONL e compacta periodicamente;
+# "sqlite" usa o banco cpericias.db (migrado dos JSON na primeira execução);
+# "mensal" guarda um arquivo por mês (prazos/2025-05.json) e lê sob demanda
+MODO_ARMAZENAMENTO = os.environ.get("CPERICIAS_ARMAZENAMENTO", "json")
+
+# Dados, índices e regras; as gravações rodam em segundo plano para não
+# travar a janela
+repo = Repositorio(BASE_DIR, MODO_ARMAZENAMENTO)
+
+# Intervalo (ms) entre as verificações de erros de gravação pela interface
+INTERVALO_ERROS_GRAVACAO = 500
+
+# Espera (ms) após a última tecla antes de executar a busca ao digitar
+ATRASO_BUSCA = 250
+
+# Intervalo (ms) entre as verificações do fim da carga em segundo plano
+INTERVALO_CARGA = 50
+
+# Intervalo (ms) de atualização da janela de diagnóstico enquanto aberta
+INTERVALO_DIAGNOSTICO = 1000
+
+# Espera máxima (ms) do timer de lembretes; depois dela o próximo é recalculado
+# (cobre ajustes no relógio e o computador suspenso)
+ESPERA_MAXIMA_LEMBRETE = 60 * 60 * 1000
+# Linhas exibidas na janela de lembretes; as mais antigas saem
+LIMITE_LINHAS_LEMBRETES = 50
+
+# Colunas da lista de resultados: (nome, título, largura)
+COLUNAS_LISTA = [
+    ("data", "Data", 90),
+    ("tipo", "Tipo", 70),
+    ("status", "Status", 55),
+    ("processo", "Processo", 190),
+    ("perito", "Perito", 180),
+    ("descricao", "Descrição", 260),
+]
+
+log = logging.getLogger("cpericias")
+
+def marcar_fase(fase):
+    """Registra quanto tempo após o início do programa a fase terminou"""
+    ms = (time.perf_counter() - INICIO_PROGRAMA) * 1000
+    medidor.marcar_fase(fase, ms)
+    log.info("Inicialização: %s em %.0f ms", fase, ms)
+
+def criar_calendario(master, **kwargs):
+    """Cria um Calendar; o tkcalendar (e o babel) só é importado no primeiro uso"""
+    from tkcalendar import Calendar
+    return Calendar(master, selectmode='day', date_pattern='yyyy-mm-dd', **kwargs)
+
+def garantir_periodo(inicio=None, fim=None):
+    """Carrega os meses de prazos e perícias entre inicio e fim (todos, se None)"""
     try:
-        if os.path.exists(file):
-            with open(file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        return {}
+        repo.garantir_periodo(inicio, fim)
     except Exception as e:
-        messagebox.showerror("Erro", f"Erro ao carregar {file}: {str(e)}")
-        return {}
+        messagebox.showerror("Erro", f"Erro ao carregar dados: {str(e)}")
 
-def salvar_dados(file, data):
-    """Salva dados em um arquivo JSON"""
+def consultar_periodo(tipo, inicio, fim):
+    """Lista (data_str, item) entre inicio e fim, em ordem de data"""
     try:
-        with open(file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=4, ensure_ascii=False)
+        return repo.periodo(tipo, inicio, fim)
     except Exception as e:
-        messagebox.showerror("Erro", f"Erro ao salvar {file}: {str(e)}")
+        messagebox.showerror("Erro", f"Erro ao consultar {repo.dados[tipo][0]}: {str(e)}")
+        return []
 
-# Carrega dados iniciais
-prazos = carregar_dados(PRAZOS_FILE)
-peritos = carregar_dados(PERITOS_FILE)
-pericias = carregar_dados(PERICIAS_FILE)
+def consultar_processo(tipo, termo):
+    """Lista (data_str, item) cujo processo contém o termo, mais recentes primeiro"""
+    try:
+        return repo.buscar(tipo, termo)
+    except Exception as e:
+        messagebox.showerror("Erro", f"Erro ao consultar {repo.dados[tipo][0]}: {str(e)}")
+        return []
+
+def consultar_abertos(consulta):
+    """Lista (tipo, data_str, item) de repo.atrasados ou repo.pendentes"""
+    try:
+        return consulta()
+    except Exception as e:
+        messagebox.showerror("Erro", f"Erro ao consultar itens em aberto: {str(e)}")
+        return []
 
 class JanelaDetalhes:
     def __init__(self, root, item, item_type, data_str, index, callback_atualizar):
@@ -87,16 +153,16 @@ class JanelaDetalhes:
             ttk.Label(frame, text=label).pack(side=tk.LEFT)
             
             if key in ['concluido', 'realizada']:
-                var = tk.BooleanVar(value=self.item.get(key, False))
+                var = tk.BooleanVar(value=getattr(self.item, key))
                 entry = ttk.Checkbutton(frame, variable=var)
                 self.entries[key] = var
             elif key == 'observacoes':
                 entry = tk.Text(frame, height=5, width=40, wrap=tk.WORD)
-                entry.insert("1.0", self.item.get(key, ""))
+                entry.insert("1.0", self.item.texto(key))
                 self.entries[key] = entry
             else:
                 entry = ttk.Entry(frame, width=width)
-                entry.insert(0, self.item.get(key, ""))
+                entry.insert(0, self.item.texto(key))
                 self.entries[key] = entry
             
             entry.pack(side=tk.RIGHT)
@@ -138,26 +204,185 @@ class JanelaDetalhes:
     def salvar_alteracoes(self):
         try:
             # Atualizar os dados do item
+            campos = {}
             for key, entry in self.entries.items():
                 if isinstance(entry, ttk.Entry):
-                    self.item[key] = entry.get()
+                    campos[key] = entry.get()
                 elif isinstance(entry, tk.BooleanVar):
-                    self.item[key] = entry.get()
+                    campos[key] = entry.get()
                 elif isinstance(entry, tk.Text):
-                    self.item[key] = entry.get("1.0", tk.END).strip()
-            
-            # Salvar no JSON apropriado
-            if self.item_type == 'prazo':
-                salvar_dados(PRAZOS_FILE, prazos)
-            else:
-                salvar_dados(PERICIAS_FILE, pericias)
-            
+                    campos[key] = entry.get("1.0", tk.END).strip()
+            repo.editar(self.item.id, campos)
+
             messagebox.showinfo("Sucesso", "Alterações salvas com sucesso!")
             self.callback()  # Atualizar a lista principal
             self.top.destroy()
         except Exception as e:
             messagebox.showerror("Erro", f"Não foi possível salvar: {str(e)}")
 
+class JanelaDiagnostico:
+    """Latência das operações medidas (p50/p95/máx) e chamadas lentas recentes
+
+    Montada uma vez num Dialogo; só se atualiza enquanto estiver à vista.
+    """
+
+    COLUNAS = [
+        ("operacao", "Operação", 180),
+        ("chamadas", "Chamadas", 80),
+        ("p50", "p50 (ms)", 80),
+        ("p95", "p95 (ms)", 80),
+        ("max", "Máx (ms)", 80),
+    ]
+
+    def __init__(self, dialogo):
+        self.top = dialogo.top
+        self.agendada = None  # after() da próxima atualização
+        self.top.title("Diagnóstico")
+        self.top.geometry("560x480")
+
+        main_frame = ttk.Frame(self.top)
+        main_frame.pack(fill="both", expand=True, padx=10, pady=10)
+
+        self.inicializacao = ttk.Label(main_frame, wraplength=520, justify=tk.LEFT)
+        self.inicializacao.pack(anchor=tk.W, pady=(0, 10))
+
+        self.tabela = ttk.Treeview(main_frame, columns=[c[0] for c in self.COLUNAS],
+                                   show="headings", height=10)
+        for nome, titulo, largura in self.COLUNAS:
+            self.tabela.heading(nome, text=titulo, anchor=tk.W)
+            self.tabela.column(nome, width=largura, anchor=tk.W)
+        self.tabela.pack(fill="both", expand=True)
+
+        ttk.Label(main_frame, text=f"Chamadas acima de {medidor.limite_lento_ms:g} ms:").pack(
+            anchor=tk.W, pady=(10, 0))
+        self.lentas = tk.Text(main_frame, height=8, state="disabled", font=('Arial', 9))
+        self.lentas.pack(fill="both", expand=True)
+
+        btn_frame = ttk.Frame(main_frame)
+        btn_frame.pack(fill="x", pady=10)
+        ttk.Button(btn_frame, text="Exportar...", command=self.exportar).pack(side=tk.LEFT, padx=5)
+        ttk.Button(btn_frame, text="Limpar", command=self.limpar).pack(side=tk.LEFT, padx=5)
+        ttk.Button(btn_frame, text="Fechar", command=dialogo.esconder).pack(side=tk.RIGHT, padx=5)
+
+        # Cada abertura atualiza na hora e retoma o ciclo
+        dialogo.limpar = self.atualizar
+
+    def atualizar(self):
+        if self.agendada is not None:
+            self.top.after_cancel(self.agendada)  # Um ciclo só, mesmo com cliques repetidos
+        fases = medidor.fases_inicializacao()
+        self.inicializacao.config(text="Inicialização: " + (
+            " · ".join(f"{fase} {ms:.0f} ms" for fase, ms in fases.items()) or "não medida"))
+        self.tabela.delete(*self.tabela.get_children())
+        for operacao, dados in medidor.resumo().items():
+            self.tabela.insert("", tk.END, values=(
+                operacao, dados["chamadas"], dados["p50_ms"], dados["p95_ms"], dados["max_ms"]))
+
+        self.lentas.config(state="normal")
+        self.lentas.delete("1.0", tk.END)
+        for quando, operacao, ms in reversed(medidor.chamadas_lentas()):
+            self.lentas.insert(tk.END, f"{quando}  {operacao}  {ms} ms\n")
+        self.lentas.config(state="disabled")
+
+        self.agendada = self.top.after(INTERVALO_DIAGNOSTICO, self.atualizar_se_visivel)
+
+    def atualizar_se_visivel(self):
+        self.agendada = None
+        if self.top.state() != "withdrawn":  # Escondida: volta ao ser aberta de novo
+            self.atualizar()
+
+    def limpar(self):
+        medidor.limpar()
+        self.atualizar()
+
+    def exportar(self):
+        from tkinter import filedialog
+        caminho = filedialog.asksaveasfilename(
+            parent=self.top, defaultextension=".json", initialfile="diagnostico.json",
+            filetypes=[("JSON", "*.json")])
+        if not caminho:
+            return
+        try:
+            medidor.exportar(caminho)
+            messagebox.showinfo("Sucesso", f"Diagnóstico exportado para {caminho}", parent=self.top)
+        except Exception as e:
+            messagebox.showerror("Erro", f"Não foi possível exportar: {str(e)}", parent=self.top)
+
+class AvisoLembretes:
+    """Janela pequena no canto da tela com os lembretes disparados.
+
+    Não bloqueia a janela principal: os lembretes novos entram no topo da
+    lista e ela só some quando o usuário a fecha.
+    """
+
+    def __init__(self, root):
+        self.top = tk.Toplevel(root)
+        self.top.withdraw()
+        self.top.title("Lembretes")
+        self.top.attributes('-topmost', True)
+        self.top.protocol("WM_DELETE_WINDOW", self.esconder)
+
+        main_frame = ttk.Frame(self.top)
+        main_frame.pack(fill="both", expand=True, padx=10, pady=10)
+        self.texto = tk.Text(main_frame, width=60, height=8, wrap="word",
+                             state="disabled", font=('Arial', 9))
+        self.texto.pack(fill="both", expand=True)
+        ttk.Button(main_frame, text="Fechar", command=self.esconder).pack(side=tk.RIGHT, pady=(10, 0))
+
+    def mostrar(self, textos):
+        hora = datetime.datetime.now().strftime("%H:%M")
+        self.texto.config(state="normal")
+        self.texto.insert("1.0", "".join(f"{hora}  {texto}\n" for texto in reversed(textos)))
+        self.texto.delete(f"{LIMITE_LINHAS_LEMBRETES + 1}.0", tk.END)
+        self.texto.config(state="disabled")
+        if self.top.state() == "withdrawn":
+            self.top.update_idletasks()
+            x = self.top.winfo_screenwidth() - self.top.winfo_reqwidth() - 20
+            y = self.top.winfo_screenheight() - self.top.winfo_reqheight() - 80
+            self.top.geometry(f"+{max(x, 0)}+{max(y, 0)}")
+            self.top.deiconify()
+        self.top.lift()
+        self.top.bell()
+
+    def esconder(self):
+        self.top.withdraw()
+
+class Dialogo:
+    """Formulário em Toplevel, montado uma vez e só escondido ao fechar"""
+
+    def __init__(self, root):
+        self.top = tk.Toplevel(root)
+        self.top.withdraw()
+        self.top.transient(root)
+        self.top.protocol("WM_DELETE_WINDOW", self.esconder)
+        self.limpar = lambda: None  # Volta os campos ao estado inicial; definido ao montar
+        self.contexto = None        # Dado da abertura atual (ex.: ids dos itens a reagendar)
+
+    def mostrar(self):
+        self.limpar()
+        self.top.deiconify()
+        self.top.lift()
+
+    def esconder(self):
+        self.top.withdraw()
+
+class GerenciadorDialogos:
+    """Cria cada formulário na primeira abertura e o reaproveita nas seguintes"""
+
+    def __init__(self, root):
+        self.root = root
+        self.dialogos = {}  # nome -> Dialogo
+
+    def abrir(self, nome, montar, contexto=None):
+        """Mostra o formulário `nome`, montando-o com montar(dialogo) se ainda não existir"""
+        dialogo = self.dialogos.get(nome)
+        if dialogo is None:
+            dialogo = self.dialogos[nome] = Dialogo(self.root)
+            montar(dialogo)
+        dialogo.contexto = contexto
+        dialogo.mostrar()
+        return dialogo
+
 class SistemaPrazos:
     def __init__(self, root):
         self.root = root
@@ -169,8 +394,117 @@ class SistemaPrazos:
         self.style.configure('TFrame', background='#f0f0f0')
         self.style.configure('TButton', font=('Arial', 10), padding=5)
         
+        self.busca_agendada = None   # after() da busca ao digitar ainda não executada
+        self.busca_anterior = None   # (dígitos, alterações, resultados) da última busca
+        self.cal = None              # Calendário principal, criado após a primeira pintura
+        self.item_selecionado = None  # Id do item da última linha clicada
+        self.aguardam_dados = []     # Botões habilitados quando a carga terminar
+        self.dialogos = GerenciadorDialogos(self.root)
+
+        # A janela aparece vazia e os dados são lidos numa thread; as visões
+        # pedidas antes do fim da carga são exibidas quando ela terminar
+        self.dados_prontos = False
+        self.carga = threading.Event()
+        self.erros_carga = []
+        self.visao_atual = lambda: self.atualizar_lista(datetime.date.today())
+        # Modelo do painel dos próximos 30 dias, criado quando a carga termina;
+        # depois disso só as linhas alteradas são reescritas no Text
+        self.painel = None
+        self.aviso_painel = None   # Aviso exibido no lugar das linhas, se houver
+        # Dias com prazos/perícias no mês exibido pelo calendário principal
+        self.marcadores = None
+        # Próximos lembretes em ordem de horário; um único after() aponta para
+        # o primeiro e é reagendado quando ele muda
+        self.lembretes = None
+        self.aviso_lembretes = None
+        self.timer_lembretes = None
+        self.horario_timer = None
+
         self.criar_interface()
-        self.atualizar_lista(datetime.date.today())
+        self.exibir_registros([], "Carregando dados...")
+        threading.Thread(target=self.carregar_dados_iniciais, name="carga", daemon=True).start()
+
+        self.root.protocol("WM_DELETE_WINDOW", self.fechar)
+        for tecla in ("<Control-z>", "<Control-Z>"):
+            self.root.bind(tecla, self.desfazer)
+        for tecla in ("<Control-y>", "<Control-Y>", "<Control-Shift-Z>"):
+            self.root.bind(tecla, self.refazer)
+        self.verificar_erros_gravacao()
+        self.root.after(INTERVALO_CARGA, self.verificar_carga)
+        self.root.after_idle(self.primeira_pintura)
+        marcar_fase("janela")
+
+    def carregar_dados_iniciais(self):
+        """Roda na thread de carga: lê os arquivos e monta os índices"""
+        try:
+            self.erros_carga = repo.carregar()
+            # Os lembretes olham só alguns dias à frente; no modo mensal os
+            # demais meses continuam no disco (o selo os conta pelo resumo)
+            hoje = datetime.date.today()
+            repo.garantir_periodo(hoje, hoje + datetime.timedelta(days=ANTECEDENCIA_MAXIMA))
+            lembretes = AgendaLembretes()
+            lembretes.carregar(repo.pendentes(hoje, ler_disco=False))
+            repo.indice.ouvintes.append(lembretes)
+            self.lembretes = lembretes
+        except Exception as e:
+            self.erros_carga = [("dados", e)]
+        finally:
+            self.carga.set()
+
+    def verificar_carga(self):
+        """Quando a carga termina, libera a interface e exibe os dados"""
+        if not self.carga.is_set():
+            self.root.after(INTERVALO_CARGA, self.verificar_carga)
+            return
+        for file, e in self.erros_carga:
+            messagebox.showerror("Erro", f"Erro ao carregar {file}: {str(e)}")
+        self.dados_prontos = True
+        for botao in self.aguardam_dados:
+            botao.state(["!disabled"])
+        self.painel = PainelPericias(
+            lambda inicio, fim: consultar_periodo('pericia', inicio, fim))
+        self.marcadores = MarcadoresCalendario(consultar_periodo)
+        if self.cal is not None:
+            mes, ano = self.cal.get_displayed_month()
+        else:
+            ano, mes = datetime.date.today().year, datetime.date.today().month
+        self.marcadores.exibir_mes(ano, mes)
+        repo.indice.ouvintes.extend([self.painel, self.marcadores])
+        self.agendar_virada_do_dia()
+        self.agendar_lembretes()
+        self.atualizar_visao()
+        marcar_fase("dados")
+
+    def primeira_pintura(self):
+        self.root.update_idletasks()
+        marcar_fase("primeira pintura")
+        self.criar_calendario_principal()
+        marcar_fase("calendário")
+
+    def data_selecionada(self):
+        """Data marcada no calendário principal (hoje, enquanto ele não existe)"""
+        return self.cal.selection_get() if self.cal is not None else datetime.date.today()
+
+    def verificar_erros_gravacao(self):
+        """Exibe os erros da gravação em segundo plano (roda na thread da interface)"""
+        erros = repo.gravador.erros
+        while not erros.empty():
+            file, e = erros.get_nowait()
+            messagebox.showerror("Erro", f"Erro ao salvar {file}: {str(e)}")
+        self.root.after(INTERVALO_ERROS_GRAVACAO, self.verificar_erros_gravacao)
+
+    def fechar(self):
+        """Grava as alterações pendentes antes de fechar a janela"""
+        repo.descarregar()
+        erros = repo.gravador.erros
+        while not erros.empty():
+            file, e = erros.get_nowait()
+            if not messagebox.askyesno(
+                    "Erro", f"Erro ao salvar {file}: {str(e)}\n\n"
+                            "Fechar mesmo assim? As alterações não salvas serão perdidas."):
+                return
+        repo.fechar()
+        self.root.destroy()
 
     def criar_interface(self):
         """Cria a interface gráfica principal"""
@@ -195,11 +529,23 @@ class SistemaPrazos:
             ("Cadastrar Perícia", self.cadastrar_pericia),
             ("Prazos do Dia", lambda: self.atualizar_lista(datetime.date.today())),
             ("Prazos da Semana", self.filtrar_semana),
-            ("Prazos do Mês", self.filtrar_mes)
+            ("Prazos do Mês", self.filtrar_mes),
+            ("Atrasados", self.mostrar_atrasados),
+            ("Pendentes", self.mostrar_pendentes),
+            ("Diagnóstico", lambda: self.dialogos.abrir("diagnostico", JanelaDiagnostico))
         ]
         
         for text, command in buttons:
-            ttk.Button(tool_frame, text=text, command=command).pack(side=tk.LEFT, padx=2)
+            botao = ttk.Button(tool_frame, text=text, command=command)
+            botao.pack(side=tk.LEFT, padx=2)
+            if command in (self.cadastrar_perito, self.adicionar_prazo, self.cadastrar_pericia):
+                # Cadastros conferem duplicidades nos dados, que ainda estão sendo lidos
+                botao.state(["disabled"])
+                self.aguardam_dados.append(botao)
+
+        # Selo com a quantidade de itens em aberto
+        self.selo_abertos = ttk.Label(tool_frame, font=('Arial', 10, 'bold'))
+        self.selo_abertos.pack(side=tk.LEFT, padx=5)
 
         # Barra de busca
         search_frame = ttk.Frame(tool_frame)
@@ -208,110 +554,217 @@ class SistemaPrazos:
         ttk.Label(search_frame, text="Buscar Processo:").pack(side=tk.LEFT)
         self.entry_busca = ttk.Entry(search_frame, width=30)
         self.entry_busca.pack(side=tk.LEFT, padx=2)
+        self.entry_busca.bind("<KeyRelease>", self.agendar_busca)
+        self.entry_busca.bind("<Return>", lambda e: self.buscar_por_processo())
         ttk.Button(search_frame, text="Buscar", command=self.buscar_por_processo).pack(side=tk.LEFT)
+        self.busca_ao_digitar = tk.BooleanVar(value=True)
+        ttk.Checkbutton(search_frame, text="Ao digitar",
+                        variable=self.busca_ao_digitar).pack(side=tk.LEFT, padx=2)
 
         # Área principal com calendário e lista
         main_frame = ttk.Frame(self.root)
         main_frame.pack(fill="both", expand=True, padx=10, pady=5)
 
-        # Calendário
-        cal_frame = ttk.Frame(main_frame)
-        cal_frame.pack(side=tk.LEFT, fill="y", padx=5)
-        
-        self.cal = Calendar(cal_frame, selectmode='day', date_pattern='yyyy-mm-dd',
-                          font=('Arial', 12), background='white', foreground='black',
-                          selectbackground='#4a6984', selectforeground='white')
-        self.cal.pack(padx=5, pady=5)
-        self.cal.selection_set(datetime.date.today())
-        self.cal.bind("<<CalendarSelected>>", lambda e: self.atualizar_lista(self.cal.selection_get()))
+        # Calendário (criado em criar_calendario_principal, após a primeira pintura)
+        self.cal_frame = ttk.Frame(main_frame)
+        self.cal_frame.pack(side=tk.LEFT, fill="y", padx=5)
 
         # Lista de prazos e perícias
         list_frame = ttk.Frame(main_frame)
         list_frame.pack(side=tk.LEFT, fill="both", expand=True, padx=5)
         
-        self.lista_prazos = tk.Listbox(list_frame, width=90, height=35, bg="white", 
-                                     font=("Arial", 10), selectbackground='#4a6984',
-                                     selectforeground='white')
-        scroll = ttk.Scrollbar(list_frame, command=self.lista_prazos.yview)
-        self.lista_prazos.configure(yscrollcommand=scroll.set)
-        scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        # Seleção múltipla (Shift/Ctrl+clique, Ctrl+A) para as ações em lote
+        self.lista_prazos = ListaVirtual(list_frame, COLUNAS_LISTA, selectmode="extended", tags={
+            'concluido': {'foreground': 'green'},
+            'pendente': {'foreground': 'red'},
+            'aviso': {'foreground': 'red'},
+        })
         self.lista_prazos.pack(fill="both", expand=True)
 
         # Atualiza dashboard inicial
         self.atualizar_dashboard()
         self.configurar_menu_contexto()
 
-    def formatar_cpf(self, cpf):
-        """Formata o CPF para o padrão 000.000.000-00"""
-        cpf = re.sub(r'\D', '', cpf)
-        if len(cpf) != 11:
-            return None
-        return f"{cpf[:3]}.{cpf[3:6]}.{cpf[6:9]}-{cpf[9:11]}"
-
-    def validar_processo(self, processo):
-        """Valida o formato do número do processo"""
-        padrao = r'^\d{7}-\d{2}\.\d{4}\.\d\.\d{2}\.\d{4}$'
-        return re.match(padrao, processo) is not None
+    def criar_calendario_principal(self):
+        self.cal = criar_calendario(self.cal_frame,
+                          font=('Arial', 12), background='white', foreground='black',
+                          selectbackground='#4a6984', selectforeground='white')
+        self.cal.pack(padx=5, pady=5)
+        self.cal.selection_set(datetime.date.today())
+        self.cal.bind("<<CalendarSelected>>", lambda e: self.atualizar_lista(self.cal.selection_get()))
+        self.cal.bind("<<CalendarMonthChanged>>", self.mes_alterado)
+        for estado, cores in CORES_MARCADORES.items():
+            self.cal.tag_config(estado, **cores)
+        self.atualizar_marcadores()
 
+    @medidor.medir("atualizar_dashboard")
     def atualizar_dashboard(self):
-        """Atualiza o painel de perícias agendadas"""
+        """Aplica no painel de perícias só as linhas que mudaram"""
+        if self.painel is None:
+            self.mostrar_aviso_painel("Carregando dados...")
+            return
+        alteracoes = self.painel.retirar_pendentes()
+        if alteracoes:
+            texto = self.dashboard_text
+            texto.config(state="normal")
+            if self.aviso_painel is not None:
+                texto.delete(1.0, tk.END)
+                self.aviso_painel = None
+            for alteracao in alteracoes:
+                linha = alteracao[1] + 1
+                if alteracao[0] == "inserir":
+                    texto.insert(f"{linha}.0", alteracao[2] + "\n")
+                else:
+                    texto.delete(f"{linha}.0", f"{linha + 1}.0")
+            texto.config(state="disabled")
+        if not self.painel.chaves:
+            self.mostrar_aviso_painel(f"Nenhuma perícia marcada para os próximos {DIAS_PAINEL} dias.")
+
+    def mostrar_aviso_painel(self, aviso):
+        """Troca as linhas do painel por um aviso (carregando, nenhuma perícia)"""
+        if self.aviso_painel == aviso:
+            return
         self.dashboard_text.config(state="normal")
         self.dashboard_text.delete(1.0, tk.END)
-        
+        self.dashboard_text.insert(tk.END, aviso)
+        self.dashboard_text.config(state="disabled")
+        self.aviso_painel = aviso
+
+    @medidor.medir("atualizar_marcadores")
+    def atualizar_marcadores(self):
+        """Refaz os eventos do calendário só nos dias que mudaram"""
+        if self.cal is None or self.marcadores is None:
+            return
+        refazer, alterados = self.marcadores.retirar_alteracoes()
+        if refazer:
+            self.cal.calevent_remove('all')
+        for data_str, marcador in alterados.items():
+            data = datetime.date.fromisoformat(data_str)
+            if not refazer:
+                self.cal.calevent_remove(date=data)
+            if marcador is not None:
+                estado, pendentes, concluidos = marcador
+                self.cal.calevent_create(data, texto_marcador(pendentes, concluidos), estado)
+
+    def atualizar_paineis(self):
+        """Leva ao painel de perícias, ao calendário e ao selo as mutações recentes"""
+        self.atualizar_dashboard()
+        self.atualizar_marcadores()
+        self.atualizar_selo()
+        self.agendar_lembretes()
+
+    def atualizar_selo(self):
+        """Atrasados e pendentes no selo da barra de ferramentas"""
+        if not self.dados_prontos:
+            return
+        try:
+            atrasados, pendentes = repo.contar_abertos()
+        except Exception as e:
+            log.warning("Não foi possível contar os itens em aberto: %s", e)
+            return
+        self.selo_abertos.config(text=f"⚠ {atrasados} atrasado(s) | {pendentes} pendente(s)",
+                                 foreground='#d9534f' if atrasados else '#333333')
+
+    def agendar_lembretes(self):
+        """Aponta o timer para o próximo lembrete, se ele mudou"""
+        if self.lembretes is None:
+            return
+        proximo = self.lembretes.proximo()
+        if proximo == self.horario_timer:
+            return
+        if self.timer_lembretes is not None:
+            self.root.after_cancel(self.timer_lembretes)
+            self.timer_lembretes = None
+        self.horario_timer = proximo
+        if proximo is not None:
+            ms = int((proximo - datetime.datetime.now()).total_seconds() * 1000)
+            self.timer_lembretes = self.root.after(
+                min(max(ms, 0), ESPERA_MAXIMA_LEMBRETE), self.disparar_lembretes)
+
+    def disparar_lembretes(self):
+        self.timer_lembretes = self.horario_timer = None
+        textos = self.lembretes.retirar_vencidos()
+        if textos:
+            if self.aviso_lembretes is None:
+                self.aviso_lembretes = AvisoLembretes(self.root)
+            self.aviso_lembretes.mostrar(textos)
+        self.agendar_lembretes()
+
+    def agendar_virada_do_dia(self):
+        agora = datetime.datetime.now()
+        meia_noite = datetime.datetime.combine(agora.date() + datetime.timedelta(days=1),
+                                               datetime.time())
+        # Um segundo de folga para date.today() já devolver o novo dia
+        ms = int((meia_noite - agora).total_seconds() * 1000) + 1000
+        self.root.after(ms, self.virar_dia)
+
+    def virar_dia(self):
+        """À meia-noite o painel passa a contar os 30 dias a partir do novo dia
+        e os pendentes de ontem passam a aparecer como atrasados no calendário"""
         hoje = datetime.date.today()
-        fim = hoje + datetime.timedelta(days=30)
-        pericias_proximas = []
-        
-        for data_str in sorted(pericias):
-            try:
-                data = datetime.datetime.strptime(data_str, "%Y-%m-%d").date()
-                if hoje <= data <= fim:
-                    for p in pericias[data_str]:
-                        pericias_proximas.append((data_str, p))
-            except:
-                continue
-        
-        if pericias_proximas:
-            for data_str, p in sorted(pericias_proximas, key=lambda x: x[0]):
-                status = "✔" if p.get("realizada", False) else "🔴"
-                linha = (f"{status} Data: {data_str} | Perito: {p['perito_nome']} | "
-                        f"Processo: {p['processo']} | Especialidade: {p['especialidade']}\n")
-                self.dashboard_text.insert(tk.END, linha)
+        # Meses que entraram no alcance dos lembretes passam aos índices (e à agenda)
+        garantir_periodo(hoje, hoje + datetime.timedelta(days=ANTECEDENCIA_MAXIMA))
+        self.painel.avancar(hoje)
+        self.marcadores.definir_hoje(hoje)
+        self.atualizar_paineis()
+        self.agendar_virada_do_dia()
+
+    def mes_alterado(self, event=None):
+        """Carrega o mês exibido no calendário, se ainda não estiver em memória,
+        e recalcula os marcadores dos dias"""
+        if not self.dados_prontos:
+            return  # A carga inicial já traz os meses em volta do atual
+        mes, ano = self.cal.get_displayed_month()
+        inicio = datetime.date(ano, mes, 1)
+        fim = (inicio + datetime.timedelta(days=31)).replace(day=1) - datetime.timedelta(days=1)
+        garantir_periodo(inicio, fim)
+        self.marcadores.exibir_mes(ano, mes)
+        self.atualizar_marcadores()
+
+    def formatar_linha(self, registro):
+        """(tipo, data_str, item) -> valores das colunas e tag de cor da linha"""
+        tipo, data_str, item = registro
+        resolvido = item.resolvido
+        if tipo == 'prazo':
+            nome_tipo, descricao = "Prazo", item.descricao
         else:
-            self.dashboard_text.insert(tk.END, "Nenhuma perícia marcada para os próximos 30 dias.")
-        
-        self.dashboard_text.config(state="disabled")
+            nome_tipo, descricao = "Perícia", item.especialidade
+        valores = (data_str, nome_tipo, "✔" if resolvido else "🔴", item.processo,
+                   item.perito_nome, descricao)
+        return valores, 'concluido' if resolvido else 'pendente'
 
+    def exibir_registros(self, registros, aviso):
+        """Mostra (tipo, data_str, item) na lista; `aviso` quando não houver nenhum"""
+        self.lista_prazos.definir_linhas(registros, self.formatar_linha, aviso)
+
+    def exibir_periodo(self, inicio, fim, aviso):
+        """Mostra os prazos e depois as perícias entre inicio e fim"""
+        if not self.dados_prontos:
+            return  # Exibido por verificar_carga, via visao_atual
+        registros = [('prazo', data_str, item)
+                     for data_str, item in consultar_periodo('prazo', inicio, fim)]
+        registros += [('pericia', data_str, item)
+                      for data_str, item in consultar_periodo('pericia', inicio, fim)]
+        self.exibir_registros(registros, aviso)
+
+    def atualizar_visao(self):
+        """Refaz a última visão exibida (dia, semana, mês ou busca), o painel e
+        os marcadores do calendário"""
+        self.visao_atual()
+        self.atualizar_paineis()
+
+    @medidor.medir("atualizar_lista")
     def atualizar_lista(self, data):
         """Atualiza a lista de prazos e perícias para a data selecionada"""
-        self.lista_prazos.delete(0, tk.END)
-        data_str = data.strftime("%Y-%m-%d")
-        
-        if data_str in prazos:
-            self.lista_prazos.insert(tk.END, "=== PRAZOS ===")
-            self.lista_prazos.itemconfig(tk.END, {'fg': 'blue'})
-            
-            for p in prazos[data_str]:
-                status = "✔" if p["concluido"] else "🔴"
-                cor = "green" if p["concluido"] else "red"
-                self.lista_prazos.insert(tk.END, 
-                    f"{status} {p['processo']} - {p['perito_nome']} - {p.get('descricao', '')}")
-                self.lista_prazos.itemconfig(tk.END, {'fg': cor})
-        
-        if data_str in pericias:
-            self.lista_prazos.insert(tk.END, "=== PERÍCIAS ===")
-            self.lista_prazos.itemconfig(tk.END, {'fg': 'blue'})
-            
-            for p in pericias[data_str]:
-                status = "✔" if p.get("realizada", False) else "🔴"
-                cor = "green" if p.get("realizada", False) else "red"
-                self.lista_prazos.insert(tk.END, 
-                    f"{status} {p['processo']} - {p['perito_nome']} - {p['especialidade']}")
-                self.lista_prazos.itemconfig(tk.END, {'fg': cor})
+        self.visao_atual = lambda: self.atualizar_lista(data)
+        self.exibir_periodo(data, data, "Nenhum prazo ou perícia nesta data.")
 
     def cadastrar_perito(self):
         """Janela para cadastro de novo perito"""
-        top = tk.Toplevel(self.root)
+        self.dialogos.abrir("perito", self.montar_cadastro_perito)
+
+    def montar_cadastro_perito(self, dialogo):
+        top = dialogo.top
         top.title("Cadastro de Perito")
         top.geometry("400x250")
         top.resizable(False, False)
@@ -337,50 +790,38 @@ class SistemaPrazos:
             entries.append(entry)
         
         nome_entry, cpf_entry, telefone_entry, profissao_entry = entries
+
+        def limpar():
+            for entry in entries:
+                entry.delete(0, tk.END)
+            nome_entry.focus_set()
+        dialogo.limpar = limpar
         
         def salvar_perito():
             try:
-                nome = nome_entry.get().strip()
-                cpf = self.formatar_cpf(cpf_entry.get())
-                telefone = telefone_entry.get().strip()
-                profissao = profissao_entry.get().strip()
-                
-                # Validações
-                if not nome: raise ValueError("Nome é obrigatório!")
-                if not cpf: raise ValueError("CPF inválido! Deve conter 11 dígitos.")
-                if any(perito.get("cpf") == cpf for perito in peritos.values()):
-                    raise ValueError("CPF já cadastrado!")
-                if not telefone: raise ValueError("Telefone é obrigatório!")
-                if not profissao: raise ValueError("Profissão é obrigatória!")
-
-                peritos[nome] = {
-                    "nome": nome,
-                    "cpf": cpf,
-                    "telefone": telefone,
-                    "profissao": profissao,
-                    "data_cadastro": datetime.date.today().strftime("%Y-%m-%d")
-                }
-                
-                salvar_dados(PERITOS_FILE, peritos)
-                messagebox.showinfo("Sucesso", "Perito cadastrado com sucesso!")
-                top.destroy()
+                repo.cadastrar_perito(nome_entry.get(), cpf_entry.get(),
+                                      telefone_entry.get(), profissao_entry.get())
+                messagebox.showinfo("Sucesso", "Perito cadastrado com sucesso!", parent=top)
+                dialogo.esconder()
                 
             except Exception as e:
-                messagebox.showerror("Erro", str(e))
+                messagebox.showerror("Erro", str(e), parent=top)
 
         # Botões
         btn_frame = ttk.Frame(main_frame)
         btn_frame.pack(fill="x", pady=10)
-        ttk.Button(btn_frame, text="Cancelar", command=top.destroy).pack(side=tk.LEFT)
+        ttk.Button(btn_frame, text="Cancelar", command=dialogo.esconder).pack(side=tk.LEFT)
         ttk.Button(btn_frame, text="Salvar", command=salvar_perito).pack(side=tk.RIGHT)
 
     def cadastrar_pericia(self):
         """Janela para cadastro de nova perícia"""
-        if not peritos:
+        if not repo.peritos:
             messagebox.showerror("Erro", "Cadastre pelo menos um perito primeiro!")
             return
-            
-        top = tk.Toplevel(self.root)
+        self.dialogos.abrir("pericia", self.montar_cadastro_pericia)
+
+    def montar_cadastro_pericia(self, dialogo):
+        top = dialogo.top
         top.title("Cadastrar Perícia")
         top.geometry("450x550")
         top.resizable(False, False)
@@ -390,7 +831,7 @@ class SistemaPrazos:
         
         # Data da perícia
         ttk.Label(main_frame, text="Data da Perícia:").pack(anchor=tk.W)
-        cal = Calendar(main_frame, selectmode='day', date_pattern='yyyy-mm-dd')
+        cal = criar_calendario(main_frame)
         cal.pack(pady=5)
         
         # Número do processo
@@ -401,8 +842,9 @@ class SistemaPrazos:
         # Perito
         ttk.Label(main_frame, text="Perito:").pack(anchor=tk.W)
         perito_var = tk.StringVar()
-        perito_dropdown = ttk.Combobox(main_frame, textvariable=perito_var, 
-                                      values=list(peritos.keys()), width=35)
+        # Sugere pelo nome (sem acento) ou CPF, os usados mais recentemente primeiro
+        perito_dropdown = ComboboxAutocompletar(main_frame, repo.sugerir_peritos,
+                                                textvariable=perito_var, width=35)
         perito_dropdown.pack(fill="x")
         
         # Especialidade
@@ -420,77 +862,84 @@ class SistemaPrazos:
         obs_entry = tk.Text(main_frame, height=4, width=40, wrap=tk.WORD)
         obs_entry.pack(fill="x")
 
+        def limpar():
+            cal.selection_set(datetime.date.today())
+            for entry in (processo_entry, especialidade_entry, local_entry):
+                entry.delete(0, tk.END)
+            perito_var.set("")
+            obs_entry.delete("1.0", tk.END)
+            processo_entry.focus_set()
+        dialogo.limpar = limpar
+
         def salvar():
             try:
-                processo = processo_entry.get().strip()
-                perito = perito_var.get()
-                especialidade = especialidade_entry.get().strip()
-                local = local_entry.get().strip()
-                observacoes = obs_entry.get("1.0", tk.END).strip()
-                
-                if not self.validar_processo(processo):
-                    raise ValueError("Número do processo inválido!")
-                if not perito: raise ValueError("Selecione um perito!")
-                if not especialidade: raise ValueError("Especialidade é obrigatória!")
-                if not local: raise ValueError("Local é obrigatório!")
-
-                data_str = cal.selection_get().strftime("%Y-%m-%d")
-                
-                if data_str in pericias:
-                    for p in pericias[data_str]:
-                        if p["processo"] == processo:
-                            raise ValueError(f"Perícia já cadastrada para {data_str}!")
-
-                pericias.setdefault(data_str, []).append({
-                    "processo": processo,
-                    "perito_nome": perito,
-                    "especialidade": especialidade,
-                    "local": local,
-                    "observacoes": observacoes if observacoes else None,
-                    "realizada": False,
-                    "data_cadastro": datetime.date.today().strftime("%Y-%m-%d")
-                })
-                
-                salvar_dados(PERICIAS_FILE, pericias)
-                messagebox.showinfo("Sucesso", "Perícia agendada com sucesso!")
-                self.atualizar_dashboard()
-                top.destroy()
+                repo.adicionar_pericia(cal.selection_get(), processo_entry.get(), perito_var.get(),
+                                       especialidade_entry.get(), local_entry.get(),
+                                       obs_entry.get("1.0", tk.END))
+                messagebox.showinfo("Sucesso", "Perícia agendada com sucesso!", parent=top)
+                self.atualizar_paineis()
+                dialogo.esconder()
                 
             except Exception as e:
-                messagebox.showerror("Erro", str(e))
+                messagebox.showerror("Erro", str(e), parent=top)
 
         # Botões
         btn_frame = ttk.Frame(main_frame)
         btn_frame.pack(fill="x", pady=10)
-        ttk.Button(btn_frame, text="Cancelar", command=top.destroy).pack(side=tk.LEFT)
+        ttk.Button(btn_frame, text="Cancelar", command=dialogo.esconder).pack(side=tk.LEFT)
         ttk.Button(btn_frame, text="Salvar", command=salvar).pack(side=tk.RIGHT)
 
     def adicionar_prazo(self):
         """Janela para adicionar novo prazo"""
-        if not peritos:
+        if not repo.peritos:
             messagebox.showerror("Erro", "Cadastre pelo menos um perito primeiro!")
             return
+        self.dialogos.abrir("prazo", self.montar_adicao_prazo)
 
-        top = tk.Toplevel(self.root)
+    def montar_adicao_prazo(self, dialogo):
+        top = dialogo.top
         top.title("Adicionar Prazo")
-        top.geometry("450x550")
+        top.geometry("450x610")
         top.resizable(False, False)
 
         main_frame = ttk.Frame(top)
         main_frame.pack(fill="both", expand=True, padx=10, pady=10)
 
-        ttk.Label(main_frame, text="Data do Prazo:").pack(anchor=tk.W)
-        cal = Calendar(main_frame, selectmode='day', date_pattern='yyyy-mm-dd')
+        ttk.Label(main_frame, text="Data do Prazo (ou da intimação, se informar dias úteis):").pack(anchor=tk.W)
+        cal = criar_calendario(main_frame)
         cal.pack(pady=5)
 
+        # Prazo em dias úteis contado da data marcada, com o vencimento ao lado
+        uteis_frame = ttk.Frame(main_frame)
+        uteis_frame.pack(fill="x")
+        ttk.Label(uteis_frame, text="Dias úteis:").pack(side=tk.LEFT)
+        dias_entry = ttk.Entry(uteis_frame, width=6)
+        dias_entry.pack(side=tk.LEFT, padx=5)
+        vencimento_label = ttk.Label(uteis_frame, text="")
+        vencimento_label.pack(side=tk.LEFT)
+
+        def mostrar_vencimento(event=None):
+            dias = dias_entry.get().strip()
+            if not dias:
+                vencimento_label.config(text="")
+                return
+            try:
+                vencimento = repo.vencimentos([cal.selection_get()], validar_dias_uteis(dias))[0]
+                vencimento_label.config(text=f"Vence em {vencimento.strftime('%d/%m/%Y')}")
+            except ValueError as e:
+                vencimento_label.config(text=str(e))
+        dias_entry.bind("<KeyRelease>", mostrar_vencimento)
+        cal.bind("<<CalendarSelected>>", mostrar_vencimento)
+
         ttk.Label(main_frame, text="Número do Processo (0000000-00.0000.0.00.0000):").pack(anchor=tk.W)
         processo_entry = ttk.Entry(main_frame, width=30)
         processo_entry.pack(fill="x")
 
         ttk.Label(main_frame, text="Perito:").pack(anchor=tk.W)
         perito_var = tk.StringVar()
-        perito_dropdown = ttk.Combobox(main_frame, textvariable=perito_var, 
-                                      values=list(peritos.keys()), width=35)
+        # Sugere pelo nome (sem acento) ou CPF, os usados mais recentemente primeiro
+        perito_dropdown = ComboboxAutocompletar(main_frame, repo.sugerir_peritos,
+                                                textvariable=perito_var, width=35)
         perito_dropdown.pack(fill="x")
 
         ttk.Label(main_frame, text="Descrição:").pack(anchor=tk.W)
@@ -503,235 +952,194 @@ class SistemaPrazos:
         ttk.Radiobutton(main_frame, text="Normal", variable=prioridade_var, value="Normal").pack(anchor=tk.W)
         ttk.Radiobutton(main_frame, text="Alta", variable=prioridade_var, value="Alta").pack(anchor=tk.W)
 
+        def limpar():
+            cal.selection_set(datetime.date.today())
+            dias_entry.delete(0, tk.END)
+            vencimento_label.config(text="")
+            processo_entry.delete(0, tk.END)
+            descricao_entry.delete(0, tk.END)
+            perito_var.set("")
+            prioridade_var.set("Normal")
+            processo_entry.focus_set()
+        dialogo.limpar = limpar
+
         def salvar():
             try:
-                processo = processo_entry.get().strip()
-                perito = perito_var.get()
-                descricao = descricao_entry.get().strip()
-                prioridade = prioridade_var.get()
-
-                if not self.validar_processo(processo):
-                    raise ValueError("Número do processo inválido!")
-                if not perito: raise ValueError("Selecione um perito!")
-                if not descricao: raise ValueError("Descrição é obrigatória!")
-
-                data_str = cal.selection_get().strftime("%Y-%m-%d")
-
-                if data_str in prazos:
-                    for p in prazos[data_str]:
-                        if p["processo"] == processo:
-                            raise ValueError(f"Prazo já cadastrado para {data_str}!")
-
-                prazos.setdefault(data_str, []).append({
-                    "processo": processo,
-                    "perito_nome": perito,
-                    "descricao": descricao,
-                    "prioridade": prioridade,
-                    "concluido": False,
-                    "data_cadastro": datetime.date.today().strftime("%Y-%m-%d")
-                })
-
-                salvar_dados(PRAZOS_FILE, prazos)
-                messagebox.showinfo("Sucesso", "Prazo adicionado com sucesso!")
-                self.atualizar_lista(cal.selection_get())
-                top.destroy()
+                prazo = repo.adicionar_prazo(cal.selection_get(), processo_entry.get(),
+                                             perito_var.get(), descricao_entry.get(),
+                                             prioridade_var.get(),
+                                             dias_uteis=dias_entry.get().strip() or None)
+                messagebox.showinfo("Sucesso", "Prazo adicionado com sucesso!", parent=top)
+                self.atualizar_lista(datetime.date.fromisoformat(repo.indice.obter(prazo.id)[1]))
+                self.atualizar_paineis()
+                dialogo.esconder()
 
             except Exception as e:
-                messagebox.showerror("Erro", str(e))
+                messagebox.showerror("Erro", str(e), parent=top)
 
         btn_frame = ttk.Frame(main_frame)
         btn_frame.pack(fill="x", pady=10)
-        ttk.Button(btn_frame, text="Cancelar", command=top.destroy).pack(side=tk.LEFT)
+        ttk.Button(btn_frame, text="Cancelar", command=dialogo.esconder).pack(side=tk.LEFT)
         ttk.Button(btn_frame, text="Salvar", command=salvar).pack(side=tk.RIGHT)
 
+    @medidor.medir("filtrar_semana")
     def filtrar_semana(self):
+        self.visao_atual = self.filtrar_semana
         hoje = datetime.date.today()
         fim_semana = hoje + datetime.timedelta(days=7)
-        self.lista_prazos.delete(0, tk.END)
-        encontrados = False
-        
-        # Prazos
-        for data_str in sorted(prazos):
-            try:
-                data = datetime.datetime.strptime(data_str, "%Y-%m-%d").date()
-                if hoje <= data <= fim_semana:
-                    if not encontrados:
-                        self.lista_prazos.insert(tk.END, "=== PRAZOS DA SEMANA ===")
-                        self.lista_prazos.itemconfig(tk.END, {'fg': 'blue'})
-                        encontrados = True
-                    for prazo in prazos[data_str]:
-                        status = "✔" if prazo["concluido"] else "🔴"
-                        cor = "green" if prazo["concluido"] else "red"
-                        self.lista_prazos.insert(tk.END, f"{data_str} - {status} {prazo['processo']}")
-                        self.lista_prazos.itemconfig(tk.END, {'fg': cor})
-            except: continue
-        
-        # Perícias
-        for data_str in sorted(pericias):
-            try:
-                data = datetime.datetime.strptime(data_str, "%Y-%m-%d").date()
-                if hoje <= data <= fim_semana:
-                    if not encontrados:
-                        self.lista_prazos.insert(tk.END, "=== PERÍCIAS DA SEMANA ===")
-                        self.lista_prazos.itemconfig(tk.END, {'fg': 'blue'})
-                        encontrados = True
-                    for pericia in pericias[data_str]:
-                        status = "✔" if pericia.get("realizada", False) else "🔴"
-                        cor = "green" if pericia.get("realizada", False) else "red"
-                        self.lista_prazos.insert(tk.END, f"{data_str} - {status} {pericia['processo']}")
-                        self.lista_prazos.itemconfig(tk.END, {'fg': cor})
-            except: continue
-        
-        if not encontrados:
-            self.lista_prazos.insert(tk.END, "Nenhum registro para esta semana.")
-            self.lista_prazos.itemconfig(tk.END, {'fg': 'red'})
+        self.exibir_periodo(hoje, fim_semana, "Nenhum registro para esta semana.")
 
+    @medidor.medir("filtrar_mes")
     def filtrar_mes(self):
+        self.visao_atual = self.filtrar_mes
         hoje = datetime.date.today()
         fim_mes = hoje + datetime.timedelta(days=30)
-        self.lista_prazos.delete(0, tk.END)
-        encontrados = False
-        
-        # Prazos
-        for data_str in sorted(prazos):
-            try:
-                data = datetime.datetime.strptime(data_str, "%Y-%m-%d").date()
-                if hoje <= data <= fim_mes:
-                    if not encontrados:
-                        self.lista_prazos.insert(tk.END, "=== PRAZOS DO MÊS ===")
-                        self.lista_prazos.itemconfig(tk.END, {'fg': 'blue'})
-                        encontrados = True
-                    for prazo in prazos[data_str]:
-                        status = "✔" if prazo["concluido"] else "🔴"
-                        cor = "green" if prazo["concluido"] else "red"
-                        self.lista_prazos.insert(tk.END, f"{data_str} - {status} {prazo['processo']}")
-                        self.lista_prazos.itemconfig(tk.END, {'fg': cor})
-            except: continue
-        
-        # Perícias
-        for data_str in sorted(pericias):
-            try:
-                data = datetime.datetime.strptime(data_str, "%Y-%m-%d").date()
-                if hoje <= data <= fim_mes:
-                    if not encontrados:
-                        self.lista_prazos.insert(tk.END, "=== PERÍCIAS DO MÊS ===")
-                        self.lista_prazos.itemconfig(tk.END, {'fg': 'blue'})
-                        encontrados = True
-                    for pericia in pericias[data_str]:
-                        status = "✔" if pericia.get("realizada", False) else "🔴"
-                        cor = "green" if pericia.get("realizada", False) else "red"
-                        self.lista_prazos.insert(tk.END, f"{data_str} - {status} {pericia['processo']}")
-                        self.lista_prazos.itemconfig(tk.END, {'fg': cor})
-            except: continue
-        
-        if not encontrados:
-            self.lista_prazos.insert(tk.END, "Nenhum registro para este mês.")
-            self.lista_prazos.itemconfig(tk.END, {'fg': 'red'})
+        self.exibir_periodo(hoje, fim_mes, "Nenhum registro para este mês.")
+
+    @medidor.medir("mostrar_atrasados")
+    def mostrar_atrasados(self):
+        """Prazos e perícias em aberto de datas que já passaram"""
+        self.visao_atual = self.mostrar_atrasados
+        if self.dados_prontos:
+            self.exibir_registros(consultar_abertos(repo.atrasados), "Nenhum item atrasado.")
+
+    @medidor.medir("mostrar_pendentes")
+    def mostrar_pendentes(self):
+        """Prazos e perícias em aberto de hoje em diante"""
+        self.visao_atual = self.mostrar_pendentes
+        if self.dados_prontos:
+            self.exibir_registros(consultar_abertos(repo.pendentes), "Nenhum item pendente.")
+
+    def agendar_busca(self, event=None):
+        """Agenda a busca ao digitar, cancelando a que ainda não rodou"""
+        if not self.busca_ao_digitar.get() or event.keysym == "Return":
+            return
+        if self.busca_agendada is not None:
+            self.root.after_cancel(self.busca_agendada)
+        self.busca_agendada = self.root.after(ATRASO_BUSCA, self.buscar_ao_digitar)
 
+    def buscar_ao_digitar(self):
+        self.busca_agendada = None
+        if self.entry_busca.get().strip():
+            self.buscar_por_processo()
+        else:
+            self.atualizar_lista(self.data_selecionada())
+
+    @medidor.medir("buscar_por_processo")
     def buscar_por_processo(self):
+        if self.busca_agendada is not None:
+            self.root.after_cancel(self.busca_agendada)
+            self.busca_agendada = None
         termo = self.entry_busca.get().strip()
-        self.lista_prazos.delete(0, tk.END)
-        encontrados = False
-
-        for data_str in sorted(prazos, reverse=True):
-            for prazo in prazos[data_str]:
-                if termo.lower() in prazo["processo"].lower():
-                    if not encontrados:
-                        self.lista_prazos.insert(tk.END, "=== PRAZOS ENCONTRADOS ===")
-                        self.lista_prazos.itemconfig(tk.END, {'fg': 'blue'})
-                        encontrados = True
-                    status = "✔" if prazo["concluido"] else "🔴"
-                    cor = "green" if prazo["concluido"] else "red"
-                    self.lista_prazos.insert(tk.END, f"{data_str} - {status} {prazo['processo']}")
-                    self.lista_prazos.itemconfig(tk.END, {'fg': cor})
-
-        for data_str in sorted(pericias, reverse=True):
-            for pericia in pericias[data_str]:
-                if termo.lower() in pericia["processo"].lower():
-                    if not encontrados:
-                        self.lista_prazos.insert(tk.END, "=== PERÍCIAS ENCONTRADAS ===")
-                        self.lista_prazos.itemconfig(tk.END, {'fg': 'blue'})
-                        encontrados = True
-                    status = "✔" if pericia.get("realizada", False) else "🔴"
-                    cor = "green" if pericia.get("realizada", False) else "red"
-                    self.lista_prazos.insert(tk.END, f"{data_str} - {status} {pericia['processo']}")
-                    self.lista_prazos.itemconfig(tk.END, {'fg': cor})
-
-        if not encontrados:
-            self.lista_prazos.insert(tk.END, "Nenhum resultado encontrado.")
-            self.lista_prazos.itemconfig(tk.END, {'fg': 'red'})
+        self.visao_atual = lambda: self.buscar_por_processo_termo(termo)
+        self.buscar_por_processo_termo(termo)
 
-    
-    def concluir_item(self):
-        if not hasattr(self, 'item_selecionado'):
-            return
-        data_str = self.cal.selection_get().strftime("%Y-%m-%d")
-        texto = self.item_selecionado
-        if "===" in texto:
-            return
+    def resultados_busca(self, termo):
+        """Resultados por tipo; se o termo só estendeu o anterior, filtra a busca anterior"""
+        digitos = normalizar_processo(termo)
+        anterior = self.busca_anterior
+        if (anterior is not None and anterior[0] and anterior[0] in digitos
+                and anterior[1] == repo.alteracoes):
+            resultados = {tipo: [(data_str, item) for data_str, item in encontrados
+                                 if digitos in normalizar_processo(item.processo)]
+                          for tipo, encontrados in anterior[2].items()}
+        else:
+            resultados = {'prazo': consultar_processo('prazo', termo),
+                          'pericia': consultar_processo('pericia', termo)}
+        self.busca_anterior = (digitos, repo.alteracoes, resultados)
+        return resultados
+
+    def buscar_por_processo_termo(self, termo):
+        if not self.dados_prontos:
+            return  # Exibido por verificar_carga, via visao_atual
+        resultados = self.resultados_busca(termo)
+        registros = [('prazo', data_str, item) for data_str, item in resultados['prazo']]
+        registros += [('pericia', data_str, item) for data_str, item in resultados['pericia']]
+        self.exibir_registros(registros, "Nenhum resultado encontrado.")
+
+    def registro_selecionado(self):
+        """Retorna (tipo, data_str, item) da linha clicada, ou None"""
+        return repo.indice.obter(self.item_selecionado)
+
+    def ids_selecionados(self):
+        """Ids das linhas selecionadas que ainda existem"""
+        return [registro[2].id for registro in self.lista_prazos.linhas_selecionadas()
+                if repo.indice.obter(registro[2].id) is not None]
+
+    def aplicar_em_lote(self, acao, ids, *args, parent=None):
+        """Aplica a ação em lote (uma gravação só), refaz as visões e mostra as falhas"""
         try:
-            for i, p in enumerate(prazos.get(data_str, [])):
-                if p["processo"] in texto:
-                    p["concluido"] = True
-                    salvar_dados(PRAZOS_FILE, prazos)
-                    break
-            for i, p in enumerate(pericias.get(data_str, [])):
-                if p["processo"] in texto:
-                    p["realizada"] = True
-                    salvar_dados(PERICIAS_FILE, pericias)
-                    break
-            self.atualizar_lista(self.cal.selection_get())
+            erros = acao(ids, *args)
         except Exception as e:
-            messagebox.showerror("Erro", str(e))
+            messagebox.showerror("Erro", str(e), parent=parent)
+            return False
+        finally:
+            self.atualizar_visao()
+        if erros:
+            messagebox.showerror("Erro", f"{len(erros)} de {len(ids)} item(ns) não alterado(s):\n\n"
+                                 + "\n".join(erros[:10]), parent=parent)
+        return True
+
+    def concluir_item(self):
+        ids = self.ids_selecionados()
+        if ids:
+            self.aplicar_em_lote(repo.concluir_varios, ids)
 
     def apagar_item(self):
-        if not hasattr(self, 'item_selecionado'):
+        ids = self.ids_selecionados()
+        if not ids:
             return
-        data_str = self.cal.selection_get().strftime("%Y-%m-%d")
-        texto = self.item_selecionado
-        if "===" in texto:
+        if len(ids) > 1 and not messagebox.askyesno("Apagar", f"Apagar os {len(ids)} itens selecionados?"):
             return
-        try:
-            prazos[data_str] = [p for p in prazos.get(data_str, []) if p["processo"] not in texto]
-            pericias[data_str] = [p for p in pericias.get(data_str, []) if p["processo"] not in texto]
-            salvar_dados(PRAZOS_FILE, prazos)
-            salvar_dados(PERICIAS_FILE, pericias)
-            self.atualizar_lista(self.cal.selection_get())
-        except Exception as e:
-            messagebox.showerror("Erro", str(e))
+        self.aplicar_em_lote(repo.apagar_varios, ids)
 
     def reagendar_item(self):
-        if not hasattr(self, 'item_selecionado'):
-            return
-        data_str = self.cal.selection_get().strftime("%Y-%m-%d")
-        texto = self.item_selecionado
-        if "===" in texto:
-            return
-        nova_data = Calendar(self.root, selectmode='day', date_pattern='yyyy-mm-dd')
-        top = tk.Toplevel(self.root)
+        ids = self.ids_selecionados()
+        if ids:
+            self.dialogos.abrir("reagendar", self.montar_reagendamento, contexto=ids)
+
+    def montar_reagendamento(self, dialogo):
+        top = dialogo.top
         top.title("Reagendar para nova data")
+        nova_data = criar_calendario(top)
         nova_data.pack(padx=10, pady=10)
+
+        def limpar():
+            # Começa na data atual do (primeiro) item
+            registro = repo.indice.obter(dialogo.contexto[0])
+            data = datetime.date.fromisoformat(registro[1]) if registro else datetime.date.today()
+            nova_data.selection_set(data)
+            top.title("Reagendar para nova data" if len(dialogo.contexto) == 1
+                      else f"Reagendar {len(dialogo.contexto)} itens para nova data")
+        dialogo.limpar = limpar
+
         def confirmar():
-            nova_data_str = nova_data.selection_get().strftime("%Y-%m-%d")
-            try:
-                for i, p in enumerate(prazos.get(data_str, [])):
-                    if p["processo"] in texto:
-                        item = prazos[data_str].pop(i)
-                        prazos.setdefault(nova_data_str, []).append(item)
-                        salvar_dados(PRAZOS_FILE, prazos)
-                        break
-                for i, p in enumerate(pericias.get(data_str, [])):
-                    if p["processo"] in texto:
-                        item = pericias[data_str].pop(i)
-                        pericias.setdefault(nova_data_str, []).append(item)
-                        salvar_dados(PERICIAS_FILE, pericias)
-                        break
-                self.atualizar_lista(self.cal.selection_get())
-                top.destroy()
-            except Exception as e:
-                messagebox.showerror("Erro", str(e))
+            if self.aplicar_em_lote(repo.reagendar_varios, dialogo.contexto,
+                                    nova_data.selection_get(), parent=top):
+                dialogo.esconder()
         ttk.Button(top, text="Confirmar", command=confirmar).pack(pady=5)
 
+    def desfazer(self, event=None):
+        return self.reverter(repo.desfazer, event)
+
+    def refazer(self, event=None):
+        return self.reverter(repo.refazer, event)
+
+    def reverter(self, acao, event=None):
+        """Desfaz ou refaz o último passo e refaz as visões"""
+        if event is not None and isinstance(event.widget, tk.Entry):
+            return  # Atalho digitado num campo de texto (ex.: busca)
+        if not self.dados_prontos:
+            return "break"
+        try:
+            if not acao():
+                self.root.bell()  # Nada para desfazer/refazer
+                return "break"
+        except Exception as e:
+            messagebox.showerror("Erro", str(e))
+        self.atualizar_visao()
+        return "break"
+
     def configurar_menu_contexto(self):
         """Configura o menu de contexto para a lista de prazos"""
         self.menu_contexto = tk.Menu(self.root, tearoff=0)
@@ -741,60 +1149,62 @@ class SistemaPrazos:
         self.menu_contexto.add_command(label="Editar", command=self.editar_item)
         self.menu_contexto.add_separator()
         self.menu_contexto.add_command(label="Apagar", command=self.apagar_item)
-        self.lista_prazos.bind("<Button-3>", self.mostrar_menu_contexto)
+        self.menu_contexto.add_separator()
+        self.menu_contexto.add_command(label="Desfazer", accelerator="Ctrl+Z", command=self.desfazer)
+        self.menu_contexto.add_command(label="Refazer", accelerator="Ctrl+Y", command=self.refazer)
+        self.lista_prazos.tree.bind("<Button-3>", self.mostrar_menu_contexto)
+        self.lista_prazos.tree.bind("<Double-1>", self.abrir_linha)
+
+    def selecionar_linha(self, event):
+        """Seleciona a linha sob o mouse e guarda o id do item; False se não houver item"""
+        registro = self.lista_prazos.linha_em(event.y, selecionar=True)
+        if registro is None:
+            return False
+        self.item_selecionado = registro[2].id
+        return True
 
     def mostrar_menu_contexto(self, event):
-        try:
-            self.lista_prazos.selection_clear(0, tk.END)
-            self.lista_prazos.selection_set(self.lista_prazos.nearest(event.y))
-            self.item_selecionado = self.lista_prazos.get(self.lista_prazos.curselection())
+        if self.selecionar_linha(event):
             self.menu_contexto.post(event.x_root, event.y_root)
-        except:
-            pass
 
-    def ver_item(self):
-        if not hasattr(self, 'item_selecionado'):
+    def abrir_linha(self, event):
+        if self.selecionar_linha(event):
+            self.ver_item()
+
+    def abrir_detalhes(self, editar=False):
+        registro = self.registro_selecionado()
+        if registro is None:
             return
-        
-        data_str = self.cal.selection_get().strftime("%Y-%m-%d")
-        texto = self.item_selecionado
-        
+        tipo, data_str, item = registro
         try:
-            if "=== PRAZOS ===" in self.lista_prazos.get(0):
-                for i, prazo in enumerate(prazos.get(data_str, [])):
-                    if prazo["processo"] in texto:
-                        JanelaDetalhes(
-                            self.root, 
-                            prazo, 
-                            'prazo', 
-                            data_str, 
-                            i,
-                            lambda: self.atualizar_lista(self.cal.selection_get())
-                        )
-                        break
-            elif "=== PERÍCIAS ===" in self.lista_prazos.get(0):
-                for i, pericia in enumerate(pericias.get(data_str, [])):
-                    if pericia["processo"] in texto:
-                        JanelaDetalhes(
-                            self.root, 
-                            pericia, 
-                            'pericia', 
-                            data_str, 
-                            i,
-                            lambda: self.atualizar_lista(self.cal.selection_get())
-                        )
-                        break
+            janela = JanelaDetalhes(
+                self.root,
+                item,
+                tipo,
+                data_str,
+                repo.dados[tipo][1][data_str].index(item),
+                self.atualizar_visao
+            )
+            if editar:
+                janela.habilitar_edicao()
         except Exception as e:
             messagebox.showerror("Erro", f"Não foi possível visualizar: {str(e)}")
 
+    def ver_item(self):
+        self.abrir_detalhes()
+
     def editar_item(self):
-        if not hasattr(self, 'item_selecionado'):
-            return
-        
-        data_str = self.cal.selection_get().strftime
+        self.abrir_detalhes(editar=True)
 
 # Executar o sistema
+marcar_fase("importações")
+
 if __name__ == "__main__":
+    # Chamadas lentas (ver diagnostico.LIMITE_LENTO_MS) e as fases da
+    # inicialização vão para cpericias.log
+    logging.basicConfig(filename=os.path.join(BASE_DIR, "cpericias.log"), level=logging.INFO,
+                        format="%(asctime)s %(levelname)s %(message)s")
     root = tk.Tk()
     app = SistemaPrazos(root)
     root.mainloop()
+    repo.fechar()
@@ -0,0 +1,672 @@
+"""Persistência dos dados do CPERICIAS.
+
+Os arquivos continuam no formato original (um objeto JSON por arquivo), mas
+o modo "diario" registra cada alteração num diário de operações (JSONL) ao
+lado do snapshot.  O diário é reaplicado na carga e compactado no snapshot
+de tempos em tempos.
+
+O modo "sqlite" guarda prazos, perícias e peritos em tabelas de um banco
+SQLite; cada gravação troca só as linhas das datas alteradas, numa
+transação.  As consultas, como nos outros modos, são respondidas pelos
+índices em memória, sem esperar pelo disco.
+
+O modo "mensal" divide prazos e perícias em um arquivo por mês
+(prazos/2025-05.json) e só lê do disco os meses que a interface precisa.
+Um resumo ao lado dos meses (prazos/abertos.json) guarda quantos itens em
+aberto cada data tem, para contar atrasados e pendentes sem ler os meses.
+
+Em todos os modos os registros são lidos como objetos de registros.py
+(Prazo, Pericia, Perito) e convertidos de volta para o JSON de sempre na
+gravação.
+
+Qualquer que seja o modo, o GravadorAssincrono tira as gravações da thread
+da interface: as alterações só marcam o arquivo como pendente e uma thread
+em segundo plano agrupa as rajadas numa única gravação.
+"""
+import datetime
+import json
+import os
+import queue
+import re
+import sys
+import threading
+import time
+
+from diagnostico import medidor
+from registros import CLASSES, converter_arquivo, para_json
+
+# Quantidade de operações acumuladas no diário antes de compactar o snapshot
+LIMITE_DIARIO = 500
+
+# Espera (segundos) para agrupar alterações seguidas numa única gravação
+ATRASO_GRAVACAO = 0.3
+
+# Tentativas de serializar dados que a interface alterou durante a gravação
+TENTATIVAS_GRAVACAO = 5
+
+# No modo mensal, meses antes e depois do atual lidos na abertura
+MESES_INICIAIS = 1
+
+# Arquivos de mês (2025-05.json) e o resumo dos itens em aberto, na pasta da tabela
+PADRAO_MES = re.compile(r'^\d{4}-\d{2}\.json$')
+ARQUIVO_RESUMO = "abertos.json"
+
+
+def caminho_diario(file):
+    """Retorna o caminho do diário de operações associado a um arquivo"""
+    return os.path.splitext(file)[0] + ".diario.jsonl"
+
+
+def escrever_atomico(file, texto):
+    """Grava o texto num temporário e o renomeia sobre o arquivo final"""
+    tmp = file + ".tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write(texto)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, file)
+
+
+def serializar(data, indent=4):
+    """JSON de um arquivo ou de uma linha do diário, com os registros convertidos"""
+    return json.dumps(data, indent=indent, ensure_ascii=False, default=para_json)
+
+
+def aplicar_operacao(data, op):
+    """Aplica uma operação do diário sobre o dicionário carregado"""
+    if op.get("op") == "set":
+        data[op["k"]] = op["v"]
+    elif op.get("op") == "del":
+        data.pop(op["k"], None)
+
+
+class ArmazenamentoJSON:
+    """Modo original: cada gravação reescreve o arquivo inteiro"""
+
+    def carregar(self, file):
+        return converter_arquivo(tabela_do_arquivo(file), self._ler(file))
+
+    def _ler(self, file):
+        """Conteúdo do arquivo JSON como está no disco (dicionários)"""
+        if os.path.exists(file):
+            with open(file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return {}
+
+    def salvar(self, file, data, chaves=None):
+        escrever_atomico(file, serializar(data))
+
+    def fechar(self):
+        pass
+
+    def garantir(self, file, data, inicio=None, fim=None):
+        """Traz para `data` as datas entre inicio e fim (todas, se None) ainda não lidas
+
+        Retorna as chaves acrescentadas.  Nos modos que carregam tudo de uma
+        vez não há nada a fazer.
+        """
+        return []
+
+    def abertos_em_disco(self, file):
+        """{data_str: itens em aberto} das datas que ainda não foram lidas
+
+        Nos modos que carregam tudo de uma vez não sobra nada no disco.
+        """
+        return {}
+
+
+
+class ArmazenamentoDiario(ArmazenamentoJSON):
+    """Snapshot JSON + diário de operações por chave (data ou nome do perito).
+
+    Cada gravação com `chaves` acrescenta uma linha por chave alterada, com o
+    valor atual daquela chave, então o custo não depende do tamanho do
+    arquivo.  As operações são idempotentes: reaplicar o diário sobre um
+    snapshot já compactado produz o mesmo resultado.
+    """
+
+    def __init__(self, limite=LIMITE_DIARIO):
+        self.limite = limite
+        self.operacoes = {}  # file -> operações acumuladas no diário
+        self.diarios = {}    # file -> arquivo do diário aberto para append
+
+    def carregar(self, file):
+        data = self._ler(file)
+        total = 0
+        danificado = False
+        diario = caminho_diario(file)
+        if os.path.exists(diario):
+            with open(diario, 'r', encoding='utf-8') as f:
+                for linha in f:
+                    # Sem o "\n" a linha foi cortada (queda durante a gravação),
+                    # e a próxima operação seria acrescentada colada nela
+                    if not linha.endswith("\n"):
+                        danificado = True
+                    try:
+                        op = json.loads(linha)
+                    except ValueError:
+                        danificado = True
+                        continue
+                    aplicar_operacao(data, op)
+                    total += 1
+        self.operacoes[file] = total
+        if danificado:
+            # Grava o que foi recuperado e começa um diário limpo
+            self.compactar(file, data)
+        return converter_arquivo(tabela_do_arquivo(file), data)
+
+    def salvar(self, file, data, chaves=None):
+        if chaves is None or self.operacoes.get(file, 0) + len(chaves) > self.limite:
+            self.compactar(file, data)
+            return
+
+        linhas = []
+        for chave in chaves:
+            if chave in data:
+                op = {"op": "set", "k": chave, "v": data[chave]}
+            else:
+                op = {"op": "del", "k": chave}
+            linhas.append(serializar(op, indent=None) + "\n")
+
+        f = self.diarios.get(file)
+        if f is None:
+            f = self.diarios[file] = open(caminho_diario(file), 'a', encoding='utf-8')
+        f.write("".join(linhas))
+        f.flush()
+        self.operacoes[file] = self.operacoes.get(file, 0) + len(linhas)
+
+    def compactar(self, file, data):
+        """Grava o snapshot completo e esvazia o diário"""
+        escrever_atomico(file, serializar(data))
+        # O snapshot já contém tudo; só então o diário pode ser descartado
+        f = self.diarios.pop(file, None)
+        if f is not None:
+            f.close()
+        diario = caminho_diario(file)
+        if os.path.exists(diario):
+            os.remove(diario)
+        self.operacoes[file] = 0
+
+    def fechar(self):
+        for f in self.diarios.values():
+            f.close()
+        self.diarios.clear()
+
+
+# Coluna de status de cada tabela de compromissos
+CAMPOS_STATUS = {"prazos": "concluido", "pericias": "realizada"}
+
+ESQUEMA_SQLITE = """
+CREATE TABLE IF NOT EXISTS prazos (
+    id INTEGER PRIMARY KEY,
+    data TEXT NOT NULL,
+    processo TEXT NOT NULL,
+    perito_nome TEXT,
+    status INTEGER NOT NULL DEFAULT 0,
+    dados TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_prazos_data ON prazos(data);
+CREATE INDEX IF NOT EXISTS idx_prazos_processo ON prazos(processo);
+CREATE INDEX IF NOT EXISTS idx_prazos_perito ON prazos(perito_nome);
+CREATE INDEX IF NOT EXISTS idx_prazos_status ON prazos(status, data);
+
+CREATE TABLE IF NOT EXISTS pericias (
+    id INTEGER PRIMARY KEY,
+    data TEXT NOT NULL,
+    processo TEXT NOT NULL,
+    perito_nome TEXT,
+    status INTEGER NOT NULL DEFAULT 0,
+    dados TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_pericias_data ON pericias(data);
+CREATE INDEX IF NOT EXISTS idx_pericias_processo ON pericias(processo);
+CREATE INDEX IF NOT EXISTS idx_pericias_perito ON pericias(perito_nome);
+CREATE INDEX IF NOT EXISTS idx_pericias_status ON pericias(status, data);
+
+CREATE TABLE IF NOT EXISTS peritos (
+    nome TEXT PRIMARY KEY,
+    cpf TEXT,
+    dados TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_peritos_cpf ON peritos(cpf);
+
+-- Tabelas cujo arquivo JSON já foi copiado para o banco
+CREATE TABLE IF NOT EXISTS migrados (
+    tabela TEXT PRIMARY KEY
+);
+"""
+
+
+def tabela_do_arquivo(file):
+    """prazos.json -> prazos"""
+    return os.path.splitext(os.path.basename(file))[0]
+
+
+class ArmazenamentoSQLite(ArmazenamentoJSON):
+    """Banco SQLite com uma tabela por arquivo JSON.
+
+    Cada registro é guardado inteiro na coluna `dados` (JSON), com data,
+    processo, perito_nome e status replicados em colunas indexadas para
+    consultas externas ao banco; o programa consulta os índices em memória.
+    Na primeira carga de cada tabela o arquivo JSON correspondente é migrado
+    para o banco, na mesma transação que registra a migração em `migrados`:
+    uma queda no meio da migração faz a tabela ser migrada de novo na próxima
+    abertura.
+
+    A conexão é compartilhada entre a carga e o gravador em segundo plano,
+    por isso todo acesso passa pelo mesmo lock.
+    """
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self.lock = threading.RLock()
+        import sqlite3  # Só o modo sqlite precisa do módulo
+        self.conn = sqlite3.connect(caminho, check_same_thread=False)
+        existentes = {nome for (nome,) in self.conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table'")}
+        self.conn.executescript(ESQUEMA_SQLITE)
+        if "prazos" in existentes and "migrados" not in existentes:
+            # Banco anterior ao registro das migrações: migrava tudo ao ser criado
+            with self.conn:
+                self.conn.executemany("INSERT INTO migrados (tabela) VALUES (?)",
+                                      [(tabela,) for tabela in CLASSES])
+        self.migrados = {tabela for (tabela,) in self.conn.execute("SELECT tabela FROM migrados")}
+
+    def carregar(self, file):
+        tabela = tabela_do_arquivo(file)
+        if tabela not in self.migrados:
+            self.migrar(file)
+
+        data = {}
+        classe = CLASSES[tabela]
+        with self.lock:
+            if tabela == "peritos":
+                for nome, dados in self.conn.execute("SELECT nome, dados FROM peritos"):
+                    data[nome] = classe.de_json(json.loads(dados))
+            else:
+                for data_str, dados in self.conn.execute(
+                        f"SELECT data, dados FROM {tabela} ORDER BY data, id"):
+                    data.setdefault(data_str, []).append(classe.de_json(json.loads(dados)))
+        return data
+
+    def migrar(self, file):
+        """Copia o arquivo JSON (se houver) para a tabela, sobrescrevendo-a"""
+        tabela = tabela_do_arquivo(file)
+        data = ArmazenamentoJSON.carregar(self, file)
+        with self.lock, self.conn:
+            self._gravar(tabela, data, None)
+            self.conn.execute("INSERT OR IGNORE INTO migrados (tabela) VALUES (?)", (tabela,))
+        self.migrados.add(tabela)
+
+    def salvar(self, file, data, chaves=None):
+        with self.lock, self.conn:
+            self._gravar(tabela_do_arquivo(file), data, chaves)
+
+    def _gravar(self, tabela, data, chaves):
+        """Troca as linhas das chaves (ou a tabela inteira), dentro da transação aberta"""
+        if chaves is None:
+            self.conn.execute(f"DELETE FROM {tabela}")
+            chaves = list(data)
+        if tabela == "peritos":
+            self._gravar_peritos(data, chaves)
+        else:
+            self._gravar_dias(tabela, data, chaves)
+
+    def _gravar_peritos(self, data, chaves):
+        self.conn.executemany("DELETE FROM peritos WHERE nome = ?", [(c,) for c in chaves])
+        self.conn.executemany(
+            "INSERT INTO peritos (nome, cpf, dados) VALUES (?, ?, ?)",
+            [(nome, data[nome].cpf, serializar(data[nome], indent=None))
+             for nome in chaves if nome in data])
+
+    def _gravar_dias(self, tabela, data, chaves):
+        self.conn.executemany(f"DELETE FROM {tabela} WHERE data = ?", [(c,) for c in chaves])
+        self.conn.executemany(
+            f"INSERT INTO {tabela} (data, processo, perito_nome, status, dados) "
+            "VALUES (?, ?, ?, ?, ?)",
+            [(data_str, item.processo, item.perito_nome, int(item.resolvido),
+              serializar(item, indent=None))
+             for data_str in chaves for item in data.get(data_str, [])])
+
+    def fechar(self):
+        with self.lock:
+            self.conn.close()
+
+
+def somar_meses(data, meses):
+    """Retorna o mês ("AAAA-MM") deslocado `meses` a partir de uma data"""
+    total = data.year * 12 + data.month - 1 + meses
+    return f"{total // 12:04d}-{total % 12 + 1:02d}"
+
+
+def em_aberto(item, campo_status):
+    """Item da memória (registro) ou do disco (dicionário) ainda não resolvido"""
+    if isinstance(item, dict):
+        return not item.get(campo_status, False)
+    return not item.resolvido
+
+
+def contar_abertos_mes(conteudo, campo_status):
+    """{data_str: itens em aberto} de um mês ({data_str: itens})"""
+    contagem = {}
+    for data_str, itens in conteudo.items():
+        abertos = sum(1 for item in itens if em_aberto(item, campo_status))
+        if abertos:
+            contagem[data_str] = abertos
+    return contagem
+
+
+def assinatura(caminho):
+    """Identifica a versão gravada de um arquivo (para saber se o resumo dele vale)"""
+    info = os.stat(caminho)
+    return [info.st_mtime_ns, info.st_size]
+
+
+class ArmazenamentoMensal(ArmazenamentoJSON):
+    """Prazos e perícias divididos em um arquivo por mês (prazos/2025-05.json).
+
+    Na abertura só são lidos os MESES_INICIAIS meses em volta do atual; os
+    demais entram no dicionário sob demanda, via `garantir`.  Cada gravação
+    reescreve apenas os meses das chaves alteradas.  Na primeira execução o
+    arquivo único existente é dividido nos meses (e mantido como cópia de
+    segurança).  Peritos continuam num arquivo único.
+
+    O resumo (ARQUIVO_RESUMO) guarda, por mês, os itens em aberto de cada
+    data e a assinatura (mtime, tamanho) do arquivo do mês quando foi
+    contado.  Cada gravação de um mês atualiza a sua entrada.  Na abertura,
+    meses sem entrada ou com assinatura diferente (gravados por fora, ou
+    uma queda entre o mês e o resumo) são relidos e recontados.
+    """
+
+    def __init__(self, meses_iniciais=MESES_INICIAIS):
+        self.meses_iniciais = meses_iniciais
+        self.lock = threading.Lock()
+        self.carregados = {}   # file -> meses já lidos para a memória
+        self.disponiveis = {}  # file -> meses com arquivo no disco
+        self.resumos = {}      # file -> {mes: {"arquivo": assinatura, "abertos": {data_str: n}}}
+
+    def _fragmentado(self, file):
+        return tabela_do_arquivo(file) in CAMPOS_STATUS
+
+    def _pasta(self, file):
+        return os.path.splitext(file)[0]
+
+    def _caminho_mes(self, file, mes):
+        return os.path.join(self._pasta(file), mes + ".json")
+
+    def _ler_mes(self, file, mes):
+        with open(self._caminho_mes(file, mes), 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _caminho_resumo(self, file):
+        return os.path.join(self._pasta(file), ARQUIVO_RESUMO)
+
+    def _resumir(self, file, mes, conteudo):
+        """Entrada do resumo do mês recém-gravado (ou lido) do disco"""
+        return {"arquivo": assinatura(self._caminho_mes(file, mes)),
+                "abertos": contar_abertos_mes(conteudo, CAMPOS_STATUS[tabela_do_arquivo(file)])}
+
+    def _montar_resumo(self, file):
+        """Lê o resumo gravado e reconta os meses que mudaram desde então"""
+        caminho = self._caminho_resumo(file)
+        try:
+            with open(caminho, 'r', encoding='utf-8') as f:
+                gravado = json.load(f)
+            if not isinstance(gravado, dict):
+                gravado = {}
+        except (OSError, ValueError):
+            gravado = {}  # Sem resumo ainda (ou danificado): conta tudo de novo
+
+        resumo = {}
+        for mes in self.disponiveis[file]:
+            entrada = gravado.get(mes)
+            if (isinstance(entrada, dict)
+                    and entrada.get("arquivo") == assinatura(self._caminho_mes(file, mes))):
+                resumo[mes] = entrada
+            else:
+                resumo[mes] = self._resumir(file, mes, self._ler_mes(file, mes))
+        with self.lock:
+            self.resumos[file] = resumo
+        if resumo != gravado:
+            escrever_atomico(caminho, serializar(resumo, indent=None))
+
+    def abertos_em_disco(self, file):
+        if not self._fragmentado(file):
+            return {}
+        with self.lock:
+            carregados = self.carregados.get(file, set())
+            return {data_str: quantidade
+                    for mes, entrada in self.resumos.get(file, {}).items() if mes not in carregados
+                    for data_str, quantidade in entrada["abertos"].items()}
+
+    def _fragmentar(self, file):
+        """Divide o arquivo único nos arquivos mensais"""
+        por_mes = {}
+        for data_str, itens in self._ler(file).items():
+            por_mes.setdefault(data_str[:7], {})[data_str] = itens
+        os.makedirs(self._pasta(file), exist_ok=True)
+        for mes, conteudo in por_mes.items():
+            escrever_atomico(self._caminho_mes(file, mes), serializar(conteudo))
+
+    def carregar(self, file):
+        if not self._fragmentado(file):
+            return super().carregar(file)
+
+        if not os.path.isdir(self._pasta(file)):
+            self._fragmentar(file)
+        with self.lock:
+            self.carregados[file] = set()
+            self.disponiveis[file] = {nome[:-5] for nome in os.listdir(self._pasta(file))
+                                      if PADRAO_MES.match(nome)}
+        self._montar_resumo(file)
+
+        hoje = datetime.date.today()
+        data = {}
+        self.garantir(file, data, None, None, (somar_meses(hoje, -self.meses_iniciais),
+                                               somar_meses(hoje, self.meses_iniciais)))
+        return data
+
+    def garantir(self, file, data, inicio=None, fim=None, meses=None):
+        if not self._fragmentado(file):
+            return []
+        if meses is None and inicio is not None:
+            meses = (somar_meses(inicio, 0), somar_meses(fim, 0))
+
+        with self.lock:
+            carregados = self.carregados.setdefault(file, set())
+            faltando = sorted(mes for mes in self.disponiveis.get(file, ())
+                              if mes not in carregados
+                              and (meses is None or meses[0] <= mes <= meses[1]))
+
+        novas = []
+        tabela = tabela_do_arquivo(file)
+        for mes in faltando:
+            for data_str, itens in converter_arquivo(tabela, self._ler_mes(file, mes)).items():
+                data[data_str] = itens
+                novas.append(data_str)
+            with self.lock:
+                carregados.add(mes)
+        return novas
+
+    def salvar(self, file, data, chaves=None):
+        if not self._fragmentado(file):
+            return super().salvar(file, data, chaves)
+
+        with self.lock:
+            carregados = self.carregados.setdefault(file, set())
+            disponiveis = self.disponiveis.setdefault(file, set())
+            resumo = self.resumos.setdefault(file, {})
+            if chaves is None:
+                # Os meses lidos e os criados nesta sessão (ainda sem arquivo,
+                # por exemplo quando a primeira gravação falhou)
+                meses = set(carregados) | {data_str[:7] for data_str in list(data)}
+            else:
+                meses = {chave[:7] for chave in chaves}
+
+        por_mes = {}
+        for data_str in list(data):
+            if data_str[:7] in meses:
+                itens = data.get(data_str)
+                if itens:
+                    por_mes.setdefault(data_str[:7], {})[data_str] = itens
+
+        for mes in sorted(meses):
+            conteudo = por_mes.get(mes, {})
+            with self.lock:
+                carregado = mes in carregados
+                no_disco = mes in disponiveis
+            if no_disco and not carregado:
+                # Mês que a interface ainda não leu: preserva o que está no disco
+                for data_str, itens in self._ler_mes(file, mes).items():
+                    conteudo.setdefault(data_str, itens)
+
+            caminho = self._caminho_mes(file, mes)
+            if conteudo:
+                os.makedirs(self._pasta(file), exist_ok=True)
+                escrever_atomico(caminho, serializar(dict(sorted(conteudo.items()))))
+                entrada = self._resumir(file, mes, conteudo)
+                with self.lock:
+                    disponiveis.add(mes)
+                    resumo[mes] = entrada
+                    if not no_disco:
+                        carregados.add(mes)  # Mês novo: tudo já está na memória
+            elif os.path.exists(caminho):
+                os.remove(caminho)
+                with self.lock:
+                    disponiveis.discard(mes)
+                    resumo.pop(mes, None)
+
+        if meses:
+            with self.lock:
+                texto = serializar(resumo, indent=None)
+            escrever_atomico(self._caminho_resumo(file), texto)
+
+
+class GravadorAssincrono:
+    """Grava os arquivos numa thread própria, agrupando rajadas de alterações.
+
+    `agendar` só marca o arquivo (e as chaves alteradas) como pendente e
+    retorna na hora.  A thread espera ATRASO_GRAVACAO segundos para juntar
+    as alterações seguintes e então faz uma gravação por arquivo.  Erros vão
+    para a fila `erros`, que a interface consulta pela própria thread; o
+    arquivo que falhou volta a ser gravado por inteiro na próxima alteração
+    ou no próximo `descarregar()`.
+    """
+
+    def __init__(self, armazenamento, atraso=ATRASO_GRAVACAO):
+        self.armazenamento = armazenamento
+        self.atraso = atraso
+        self.pendentes = {}  # file -> [data, chaves (set) ou None = arquivo inteiro]
+        self.falhas = {}     # file -> data cuja última gravação falhou
+        self.erros = queue.Queue()
+        self.cond = threading.Condition()
+        self.lock_gravacao = threading.Lock()
+        self.ativo = True
+        self.thread = threading.Thread(target=self._executar, name="gravador", daemon=True)
+        self.thread.start()
+
+    def agendar(self, file, data, chaves=None):
+        """Marca o arquivo como pendente de gravação"""
+        with self.cond:
+            if file in self.falhas:
+                self.falhas.pop(file)
+                chaves = None
+            pendente = self.pendentes.get(file)
+            if pendente is None:
+                self.pendentes[file] = [data, None if chaves is None else set(chaves)]
+            elif chaves is None or pendente[1] is None:
+                pendente[1] = None
+            else:
+                pendente[1].update(chaves)
+            self.cond.notify()
+
+    def descarregar(self, file=None):
+        """Grava agora o que estiver pendente (de um arquivo ou de todos)"""
+        with self.lock_gravacao:
+            with self.cond:
+                if file is None:
+                    for nome, data in self.falhas.items():
+                        self.pendentes[nome] = [data, None]
+                    self.falhas.clear()
+                    lote, self.pendentes = self.pendentes, {}
+                elif file in self.pendentes:
+                    lote = {file: self.pendentes.pop(file)}
+                else:
+                    return
+            for nome, (data, chaves) in lote.items():
+                try:
+                    self._gravar(nome, data, chaves)
+                except Exception as e:
+                    with self.cond:
+                        self.falhas[nome] = data
+                    self.erros.put((nome, e))
+
+    def fechar(self):
+        """Para a thread, grava o que restou e fecha o armazenamento"""
+        with self.cond:
+            if not self.ativo:
+                return
+            self.ativo = False
+            self.cond.notify()
+        self.thread.join()
+        self.descarregar()
+        self.armazenamento.fechar()
+
+    def _executar(self):
+        while True:
+            with self.cond:
+                while self.ativo and not self.pendentes:
+                    self.cond.wait()
+                if not self.ativo:
+                    return
+            time.sleep(self.atraso)
+            self.descarregar()
+
+    @medidor.medir("gravar_arquivo")
+    def _gravar(self, file, data, chaves):
+        if chaves is not None:
+            chaves = sorted(chaves)
+        for tentativa in range(TENTATIVAS_GRAVACAO):
+            try:
+                self.armazenamento.salvar(file, data, chaves)
+                return
+            except RuntimeError:
+                # O dicionário mudou de tamanho durante a serialização; a
+                # alteração já agendou outra gravação, basta tentar de novo
+                if tentativa == TENTATIVAS_GRAVACAO - 1:
+                    raise
+
+
+def migrar_json_para_sqlite(caminho_db, *arquivos):
+    """Copia os arquivos JSON informados para o banco SQLite (sobrescreve as tabelas)"""
+    banco = ArmazenamentoSQLite(caminho_db)
+    try:
+        for file in arquivos:
+            banco.migrar(file)
+    finally:
+        banco.fechar()
+
+
+MODOS = {
+    "json": lambda base_dir: ArmazenamentoJSON(),
+    "diario": lambda base_dir: ArmazenamentoDiario(),
+    "sqlite": lambda base_dir: ArmazenamentoSQLite(os.path.join(base_dir, "cpericias.db")),
+    "mensal": lambda base_dir: ArmazenamentoMensal(),
+}
+
+
+def criar_armazenamento(modo, base_dir):
+    """Cria o armazenamento correspondente ao modo configurado"""
+    try:
+        return MODOS[modo](base_dir)
+    except KeyError:
+        raise ValueError(f"Modo de armazenamento desconhecido: {modo}")
+
+
+if __name__ == "__main__":
+    # Migração avulsa: python armazenamento.py [pasta com os JSON]
+    pasta = sys.argv[1] if len(sys.argv) > 1 else os.path.dirname(os.path.abspath(__file__))
+    migrar_json_para_sqlite(
+        os.path.join(pasta, "cpericias.db"),
+        *(os.path.join(pasta, nome) for nome in ("prazos.json", "pericias.json", "peritos.json")))
+    print(f"Dados migrados para {os.path.join(pasta, 'cpericias.db')}")
@@ -0,0 +1,28 @@
+"""Combobox com sugestões calculadas a partir do texto digitado.
+
+Em vez de carregar todas as opções, a lista é preenchida a cada tecla (e ao
+abrir pela seta ou pela tecla Down) com o resultado de uma função de busca,
+normalmente um índice em memória.
+"""
+from tkinter import ttk
+
+# Teclas que só navegam e não mudam o texto digitado
+TECLAS_NAVEGACAO = {"Up", "Down", "Left", "Right", "Home", "End", "Prior", "Next",
+                    "Return", "KP_Enter", "Escape", "Tab",
+                    "Shift_L", "Shift_R", "Control_L", "Control_R", "Alt_L", "Alt_R"}
+
+
+class ComboboxAutocompletar(ttk.Combobox):
+    """ttk.Combobox cujas opções vêm de `sugerir(texto)`"""
+
+    def __init__(self, master, sugerir, **kwargs):
+        super().__init__(master, postcommand=self.atualizar_sugestoes, **kwargs)
+        self.sugerir = sugerir
+        self.bind("<KeyRelease>", self._digitou)
+
+    def atualizar_sugestoes(self):
+        self.configure(values=self.sugerir(self.get()))
+
+    def _digitou(self, event):
+        if event.keysym not in TECLAS_NAVEGACAO:
+            self.atualizar_sugestoes()
@@ -0,0 +1,352 @@
+"""Benchmarks dos caminhos de dados do CPERICIAS, sobre dados sintéticos.
+
+Gera prazos.json, pericias.json e peritos.json numa pasta temporária (números
+de processo no padrão CNJ e CPFs com dígitos verificadores válidos), mede as
+operações do núcleo e grava os tempos em JSON para comparar execuções:
+
+    python benchmark.py --escala media --saida base.json
+    python benchmark.py --escala media --comparar base.json
+
+Com --gerar-apenas PASTA só gera os arquivos (para abrir na interface).
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+from lembretes import AgendaLembretes
+from nucleo import Repositorio
+
+# (itens entre prazos e perícias, peritos)
+ESCALAS = {
+    "pequena": (1_000, 100),
+    "media": (50_000, 2_000),
+    "grande": (500_000, 10_000),
+}
+
+# Fração dos itens que são prazos (o resto são perícias)
+FRACAO_PRAZOS = 0.6
+# Os itens ficam espalhados entre DIAS_ANTES dias atrás e DIAS_DEPOIS adiante
+DIAS_ANTES = 365
+DIAS_DEPOIS = 365
+
+# Repetições das operações leves e das que leem ou gravam arquivos inteiros
+REPETICOES_LEVES = 50
+REPETICOES_PESADAS = 5
+
+# Acima desta razão (atual / base) a operação é marcada como mais lenta
+TOLERANCIA = 1.2
+
+NOMES = ["Ana", "Bruno", "Carla", "Daniel", "Eduarda", "Felipe", "Gabriela", "Henrique",
+         "Isabela", "João", "Larissa", "Marcos", "Natália", "Otávio", "Paula", "Rafael",
+         "Sabrina", "Thiago", "Vanessa", "William"]
+SOBRENOMES = ["Almeida", "Barbosa", "Cardoso", "Dias", "Esteves", "Ferreira", "Gomes",
+              "Hoffmann", "Lima", "Machado", "Nogueira", "Oliveira", "Pereira", "Ribeiro",
+              "Santos", "Teixeira", "Vieira", "Zanetti"]
+PROFISSOES = ["Médico", "Engenheiro Civil", "Contador", "Psicólogo", "Grafotécnico",
+              "Engenheiro de Segurança", "Fisioterapeuta", "Avaliador de Imóveis"]
+DESCRICOES = ["apresentar laudo", "responder quesitos", "manifestar sobre impugnação",
+              "entregar esclarecimentos", "juntar documentos", "estimar honorários"]
+LOCAIS = ["Fórum Central", "Consultório do perito", "Local do imóvel", "Empresa ré",
+          "IML", "Videoconferência"]
+
+
+def gerar_processo(rnd):
+    """Número CNJ (NNNNNNN-DD.AAAA.J.TR.OOOO) com dígito verificador válido"""
+    sequencial = rnd.randrange(10_000_000)
+    ano = rnd.randint(2015, 2025)
+    justica, tribunal, origem = 8, rnd.randint(1, 27), rnd.randrange(10_000)
+    base = int(f"{sequencial:07d}{ano:04d}{justica}{tribunal:02d}{origem:04d}")
+    digito = 98 - (base * 100) % 97
+    return f"{sequencial:07d}-{digito:02d}.{ano:04d}.{justica}.{tribunal:02d}.{origem:04d}"
+
+
+def gerar_cpf(rnd):
+    """CPF formatado com os dois dígitos verificadores válidos"""
+    digitos = [rnd.randrange(10) for _ in range(9)]
+    for tamanho in (9, 10):
+        soma = sum(d * (tamanho + 1 - i) for i, d in enumerate(digitos))
+        resto = soma * 10 % 11
+        digitos.append(0 if resto == 10 else resto)
+    cpf = "".join(map(str, digitos))
+    return f"{cpf[:3]}.{cpf[3:6]}.{cpf[6:9]}-{cpf[9:]}"
+
+
+def gerar_peritos(rnd, quantidade, hoje):
+    peritos = {}
+    cpfs = set()
+    while len(peritos) < quantidade:
+        nome = f"{rnd.choice(NOMES)} {rnd.choice(SOBRENOMES)} {rnd.choice(SOBRENOMES)}"
+        if nome in peritos:
+            nome = f"{nome} {len(peritos)}"
+        cpf = gerar_cpf(rnd)
+        if cpf in cpfs:
+            continue
+        cpfs.add(cpf)
+        peritos[nome] = {
+            "nome": nome,
+            "cpf": cpf,
+            "telefone": f"(43) 9{rnd.randrange(10**8):08d}",
+            "profissao": rnd.choice(PROFISSOES),
+            "data_cadastro": (hoje - datetime.timedelta(days=rnd.randrange(1000))).isoformat()
+        }
+    return peritos
+
+
+def gerar_itens(rnd, quantidade, nomes_peritos, hoje, pericia):
+    dados = {}
+    for _ in range(quantidade):
+        data = hoje + datetime.timedelta(days=rnd.randint(-DIAS_ANTES, DIAS_DEPOIS))
+        passado = data < hoje
+        item = {
+            "id": "%032x" % rnd.getrandbits(128),
+            "processo": gerar_processo(rnd),
+            "perito_nome": rnd.choice(nomes_peritos),
+        }
+        if pericia:
+            item.update({
+                "especialidade": rnd.choice(PROFISSOES),
+                "local": rnd.choice(LOCAIS),
+                "observacoes": None,
+                "realizada": passado and rnd.random() < 0.9,
+            })
+        else:
+            item.update({
+                "descricao": rnd.choice(DESCRICOES),
+                "prioridade": rnd.choice(("Baixa", "Normal", "Alta")),
+                "concluido": passado and rnd.random() < 0.9,
+            })
+        item["data_cadastro"] = (data - datetime.timedelta(days=rnd.randrange(90))).isoformat()
+        dados.setdefault(data.isoformat(), []).append(item)
+    return dict(sorted(dados.items()))
+
+
+def gerar_dados(pasta, itens, peritos, semente=42):
+    """Grava os três arquivos sintéticos na pasta"""
+    rnd = random.Random(semente)
+    hoje = datetime.date.today()
+    dados_peritos = gerar_peritos(rnd, peritos, hoje)
+    nomes = list(dados_peritos)
+    prazos = int(itens * FRACAO_PRAZOS)
+    arquivos = {
+        "peritos.json": dados_peritos,
+        "prazos.json": gerar_itens(rnd, prazos, nomes, hoje, pericia=False),
+        "pericias.json": gerar_itens(rnd, itens - prazos, nomes, hoje, pericia=True),
+    }
+    os.makedirs(pasta, exist_ok=True)
+    for nome, dados in arquivos.items():
+        with open(os.path.join(pasta, nome), "w", encoding="utf-8") as f:
+            json.dump(dados, f, indent=4, ensure_ascii=False)
+
+
+def medir(funcao, repeticoes, preparar=None):
+    """Executa `funcao` várias vezes; `preparar` roda antes de cada uma, fora da medição"""
+    tempos = []
+    for _ in range(repeticoes):
+        argumentos = preparar() if preparar else ()
+        inicio = time.perf_counter()
+        funcao(*argumentos)
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return {
+        "repeticoes": repeticoes,
+        "min_ms": round(min(tempos), 4),
+        "mediana_ms": round(statistics.median(tempos), 4),
+        "max_ms": round(max(tempos), 4),
+    }
+
+
+def executar(pasta, modo, leves=REPETICOES_LEVES, pesadas=REPETICOES_PESADAS, semente=42):
+    """Mede as operações sobre os dados da pasta; retorna {nome: tempos}"""
+    rnd = random.Random(semente)
+    hoje = datetime.date.today()
+    resultados = {}
+
+    def abrir():
+        repo = Repositorio(pasta, modo, assincrono=False)
+        repo.carregar()
+        repo.fechar()
+
+    abrir()  # Migrações e divisões de primeira execução ficam fora da medição
+
+    repo = Repositorio(pasta, modo)
+    repo.carregar()
+    try:
+        resultados["carregar_dados"] = medir(
+            lambda: repo.carregar_dados(repo.prazos_file), pesadas)
+        resultados["abrir_repositorio"] = medir(abrir, pesadas)
+
+        repo.garantir_periodo()
+        repo.descarregar()
+        datas = sorted(repo.prazos)
+        resultados["salvar_dados_completo"] = medir(
+            lambda: repo.armazenamento.salvar(repo.prazos_file, repo.prazos), pesadas)
+        resultados["salvar_dados_um_dia"] = medir(
+            lambda data_str: repo.armazenamento.salvar(repo.prazos_file, repo.prazos, [data_str]),
+            pesadas, lambda: (rnd.choice(datas),))
+
+        for nome, dias in (("visao_dia", 0), ("visao_semana", 7), ("visao_mes", 30)):
+            fim = hoje + datetime.timedelta(days=dias)
+            resultados[nome] = medir(
+                lambda fim=fim: [repo.periodo(tipo, hoje, fim) for tipo in repo.dados], leves)
+
+        quinzena = hoje + datetime.timedelta(days=15)
+        resultados["filtrar_pendentes_quinzena"] = medir(
+            lambda: repo.filtrar(hoje, quinzena, tipo='prazo', resolvido=False), leves)
+        resultados["contar_atrasados"] = medir(
+            lambda: repo.contar(fim=hoje - datetime.timedelta(days=1), resolvido=False), leves)
+        resultados["contar_por_perito"] = medir(
+            lambda: repo.contar_por('perito', resolvido=False), leves)
+        resultados["listar_atrasados"] = medir(repo.atrasados, leves)
+        resultados["contar_abertos"] = medir(repo.contar_abertos, leves)
+        resultados["montar_lembretes"] = medir(
+            lambda: AgendaLembretes().carregar(repo.pendentes()), pesadas)
+
+        registros = list(repo.indice.por_id.values())
+        resultados["buscar_processo_completo"] = medir(
+            lambda termo: [repo.buscar(tipo, termo) for tipo in repo.dados], leves,
+            lambda: (rnd.choice(registros)[2].processo,))
+        resultados["buscar_processo_trecho"] = medir(
+            lambda termo: [repo.buscar(tipo, termo) for tipo in repo.dados], leves,
+            lambda: (rnd.choice(registros)[2].processo[2:7],))
+
+        peritos = list(repo.peritos.values())
+
+        def cpf_livre():
+            cpf = gerar_cpf(rnd)
+            while cpf in repo.peritos_por_cpf:
+                cpf = gerar_cpf(rnd)
+            return cpf
+        resultados["sugerir_perito_nome"] = medir(
+            repo.sugerir_peritos, leves,
+            lambda: (rnd.choice(rnd.choice(peritos).nome.split())[:rnd.randint(1, 4)],))
+        resultados["sugerir_perito_cpf"] = medir(
+            repo.sugerir_peritos, leves, lambda: (rnd.choice(peritos).cpf[:5],))
+
+        resultados["cadastrar_perito"] = medir(
+            lambda nome, cpf: repo.cadastrar_perito(nome, cpf, "(43) 90000-0000", "Benchmark"),
+            leves, lambda: (f"Perito Benchmark {len(repo.peritos)}", cpf_livre()))
+
+        prazos = [r for r in registros if r[0] == 'prazo']
+
+        def duplicado(data_str, item):
+            try:
+                repo.adicionar_prazo(datetime.date.fromisoformat(data_str), item.processo,
+                                     item.perito_nome, "duplicado")
+            except ValueError:
+                pass
+        resultados["checagem_duplicado"] = medir(
+            duplicado, leves, lambda: rnd.choice(prazos)[1:])
+
+        novos = []
+        resultados["adicionar_prazo"] = medir(
+            lambda data, processo: novos.append(repo.adicionar_prazo(
+                data, processo, "Perito Benchmark", "benchmark")),
+            leves, lambda: (hoje + datetime.timedelta(days=rnd.randint(-30, 30)),
+                            f"{len(novos):07d}-00.2099.8.16.0000"))
+        resultados["concluir"] = medir(
+            repo.concluir, leves, lambda: (rnd.choice(novos).id,))
+        resultados["editar"] = medir(
+            lambda id_item: repo.editar(id_item, {"descricao": "editado"}), leves,
+            lambda: (rnd.choice(novos).id,))
+        resultados["reagendar"] = medir(
+            repo.reagendar, leves,
+            lambda: (rnd.choice(novos).id, hoje + datetime.timedelta(days=rnd.randint(1, 60))))
+        resultados["apagar"] = medir(
+            lambda item: repo.apagar(item.id), len(novos), lambda: (novos.pop(),))
+    finally:
+        repo.fechar()
+    return resultados
+
+
+def comparar(atual, base, tolerancia=TOLERANCIA):
+    """Imprime atual x base; retorna os nomes das operações mais lentas que a tolerância"""
+    piores = []
+    print(f"{'operação':28} {'base (ms)':>12} {'atual (ms)':>12} {'razão':>8}")
+    for nome, tempos in atual["resultados"].items():
+        anterior = base["resultados"].get(nome)
+        if anterior is None:
+            print(f"{nome:28} {'-':>12} {tempos['mediana_ms']:12.3f}")
+            continue
+        razao = tempos["mediana_ms"] / anterior["mediana_ms"] if anterior["mediana_ms"] else 1.0
+        marca = ""
+        if razao > tolerancia:
+            marca = "  PIOR"
+            piores.append(nome)
+        elif razao < 1 / tolerancia:
+            marca = "  melhor"
+        print(f"{nome:28} {anterior['mediana_ms']:12.3f} {tempos['mediana_ms']:12.3f} "
+              f"{razao:8.2f}{marca}")
+    return piores
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks dos dados do CPERICIAS")
+    parser.add_argument("--escala", choices=ESCALAS, default="pequena")
+    parser.add_argument("--itens", type=int, help="total de prazos e perícias (substitui a escala)")
+    parser.add_argument("--peritos", type=int, help="quantidade de peritos (substitui a escala)")
+    parser.add_argument("--armazenamento", default=os.environ.get("CPERICIAS_ARMAZENAMENTO", "json"),
+                        help="json, diario, sqlite ou mensal")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--rapido", action="store_true", help="menos repetições")
+    parser.add_argument("--saida", default="benchmark_resultados.json")
+    parser.add_argument("--comparar", metavar="BASE", help="resultado anterior para comparar")
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA)
+    parser.add_argument("--gerar-apenas", metavar="PASTA", help="só gera os arquivos na pasta")
+    args = parser.parse_args(argv)
+
+    itens, peritos = ESCALAS[args.escala]
+    itens = args.itens or itens
+    peritos = args.peritos or peritos
+
+    if args.gerar_apenas:
+        gerar_dados(args.gerar_apenas, itens, peritos, args.semente)
+        print(f"{itens} itens e {peritos} peritos gerados em {args.gerar_apenas}")
+        return 0
+
+    pasta = tempfile.mkdtemp(prefix="cpericias_bench_")
+    try:
+        inicio = time.perf_counter()
+        gerar_dados(pasta, itens, peritos, args.semente)
+        print(f"Dados gerados em {time.perf_counter() - inicio:.1f}s "
+              f"({itens} itens, {peritos} peritos)", file=sys.stderr)
+        leves, pesadas = (5, 1) if args.rapido else (REPETICOES_LEVES, REPETICOES_PESADAS)
+        resultados = executar(pasta, args.armazenamento, leves, pesadas, args.semente)
+    finally:
+        shutil.rmtree(pasta, ignore_errors=True)
+
+    saida = {
+        "data": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "armazenamento": args.armazenamento,
+        "itens": itens,
+        "peritos": peritos,
+        "semente": args.semente,
+        "resultados": resultados,
+    }
+    with open(args.saida, "w", encoding="utf-8") as f:
+        json.dump(saida, f, indent=4, ensure_ascii=False)
+    print(f"Resultados gravados em {args.saida}", file=sys.stderr)
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            base = json.load(f)
+        if (base.get("itens"), base.get("armazenamento")) != (itens, args.armazenamento):
+            print("Aviso: a base foi medida com outra escala ou outro armazenamento",
+                  file=sys.stderr)
+        return 1 if comparar(saida, base, args.tolerancia) else 0
+
+    for nome, tempos in resultados.items():
+        print(f"{nome:28} {tempos['mediana_ms']:12.3f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,201 @@
+"""Espelho em colunas de prazos e perícias para filtros e contagens.
+
+Cada registro ocupa uma linha em arrays paralelos (array.array): ordinal da
+data, tipo, status, prioridade e perito.  Um filtro como "prazos Alta
+pendentes nos próximos 15 dias do perito X" vira uma máscara sobre as
+colunas inteiras.  Com o numpy instalado as colunas são lidas sem cópia
+(numpy.frombuffer) e as máscaras são vetorizadas; sem ele, o mesmo filtro
+roda em Python sobre os arrays.
+
+As colunas são montadas na primeira consulta a partir do IndiceRegistros e
+depois mantidas como ouvinte dele.  Linhas de registros removidos ficam
+marcadas como livres e são reaproveitadas pela próxima inclusão.
+"""
+import array
+import functools
+
+from indices import ordinal_da_data
+from registros import Prioridade
+
+# Código de cada tipo na coluna `tipos`
+CODIGOS_TIPO = {'prazo': 0, 'pericia': 1}
+
+# Prioridade das perícias, que não têm prioridade
+SEM_PRIORIDADE = -1
+
+
+@functools.lru_cache(maxsize=None)
+def carregar_numpy():
+    """O módulo numpy, se estiver instalado (importado só na primeira consulta)"""
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+class ColunasRegistros:
+    """Colunas por registro; `filtrar`, `contar` e `contar_por` aceitam os filtros:
+
+    tipo ('prazo'/'pericia'), inicio e fim (datetime.date, inclusive),
+    resolvido (bool), prioridade (Prioridade) e perito (nome).
+    """
+
+    def __init__(self, indice):
+        self.indice = indice
+        self.montado = False
+        self.ids = []                       # linha -> id do registro (None se livre)
+        self.linhas = {}                    # id -> linha
+        self.livres = []                    # linhas livres para reaproveitar
+        self.ordinais = array.array('i')
+        self.tipos = array.array('b')
+        self.status = array.array('b')
+        self.prioridades = array.array('b')
+        self.peritos = array.array('i')
+        self.vivos = array.array('b')       # 1 = linha ocupada
+        self.codigo_perito = {}             # nome -> código
+        self.nomes_peritos = []             # código -> nome
+
+    def _perito(self, nome):
+        codigo = self.codigo_perito.get(nome)
+        if codigo is None:
+            codigo = self.codigo_perito[nome] = len(self.nomes_peritos)
+            self.nomes_peritos.append(nome)
+        return codigo
+
+    def _valores(self, tipo, data_str, item):
+        prioridade = getattr(item, "prioridade", SEM_PRIORIDADE)
+        return (ordinal_da_data(data_str) or 0, CODIGOS_TIPO[tipo], int(item.resolvido),
+                int(prioridade), self._perito(item.perito_nome))
+
+    def montar(self):
+        """Monta as colunas de uma vez a partir de todos os registros indexados"""
+        ordinais_por_data = {}
+        registros = list(self.indice.por_id.values())
+        self.ids = [item.id for _, _, item in registros]
+        self.linhas = {id_item: linha for linha, id_item in enumerate(self.ids)}
+        self.livres = []
+        ordinais = []
+        for _, data_str, _ in registros:
+            ordinal = ordinais_por_data.get(data_str)
+            if ordinal is None:
+                ordinal = ordinais_por_data[data_str] = ordinal_da_data(data_str) or 0
+            ordinais.append(ordinal)
+        self.ordinais = array.array('i', ordinais)
+        self.tipos = array.array('b', [CODIGOS_TIPO[tipo] for tipo, _, _ in registros])
+        self.status = array.array('b', [item.resolvido for _, _, item in registros])
+        self.prioridades = array.array(
+            'b', [getattr(item, "prioridade", SEM_PRIORIDADE) for _, _, item in registros])
+        self.peritos = array.array('i', [self._perito(item.perito_nome) for _, _, item in registros])
+        self.vivos = array.array('b', [1]) * len(registros)
+        self.montado = True
+
+    def inserir(self, tipo, data_str, item):
+        if not self.montado:
+            return
+        valores = self._valores(tipo, data_str, item)
+        colunas = (self.ordinais, self.tipos, self.status, self.prioridades, self.peritos)
+        if self.livres:
+            linha = self.livres.pop()
+            for coluna, valor in zip(colunas, valores):
+                coluna[linha] = valor
+            self.vivos[linha] = 1
+            self.ids[linha] = item.id
+        else:
+            linha = len(self.ids)
+            for coluna, valor in zip(colunas, valores):
+                coluna.append(valor)
+            self.vivos.append(1)
+            self.ids.append(item.id)
+        self.linhas[item.id] = linha
+
+    def remover(self, tipo, data_str, item):
+        if not self.montado:
+            return
+        linha = self.linhas.pop(item.id, None)
+        if linha is None:
+            return
+        self.vivos[linha] = 0
+        self.ids[linha] = None
+        self.livres.append(linha)
+
+    # Consultas
+
+    def _criterios(self, tipo=None, inicio=None, fim=None, resolvido=None, prioridade=None,
+                   perito=None):
+        """[(coluna, operação, valor)] dos filtros informados; None se nada pode casar"""
+        criterios = [(self.vivos, "==", 1)]
+        if tipo is not None:
+            criterios.append((self.tipos, "==", CODIGOS_TIPO[tipo]))
+        if resolvido is not None:
+            criterios.append((self.status, "==", int(resolvido)))
+        if prioridade is not None:
+            criterios.append((self.prioridades, "==", int(prioridade)))
+        if perito is not None:
+            codigo = self.codigo_perito.get(perito)
+            if codigo is None:
+                return None
+            criterios.append((self.peritos, "==", codigo))
+        if inicio is not None:
+            criterios.append((self.ordinais, ">=", inicio.toordinal()))
+        if fim is not None:
+            criterios.append((self.ordinais, "<=", fim.toordinal()))
+        return criterios
+
+    def _linhas(self, filtros):
+        """Linhas que casam com os filtros (array numpy ou lista)"""
+        if not self.montado:
+            self.montar()
+        criterios = self._criterios(**filtros)
+        if criterios is None:
+            return []
+        numpy = carregar_numpy()
+        if numpy is not None:
+            mascara = None
+            for coluna, operacao, valor in criterios:
+                valores = numpy.frombuffer(coluna, dtype=coluna.typecode)
+                parcial = valores == valor if operacao == "==" else (
+                    valores >= valor if operacao == ">=" else valores <= valor)
+                mascara = parcial if mascara is None else mascara & parcial
+            return numpy.flatnonzero(mascara)
+        linhas = range(len(self.ids))
+        for coluna, operacao, valor in criterios:
+            if operacao == "==":
+                linhas = [linha for linha in linhas if coluna[linha] == valor]
+            elif operacao == ">=":
+                linhas = [linha for linha in linhas if coluna[linha] >= valor]
+            else:
+                linhas = [linha for linha in linhas if coluna[linha] <= valor]
+        return linhas
+
+    def filtrar(self, **filtros):
+        """Ids dos registros que casam com os filtros"""
+        linhas = self._linhas(filtros)
+        ids = self.ids  # Depois de _linhas, que pode ter montado as colunas
+        return [ids[linha] for linha in (linhas.tolist() if hasattr(linhas, "tolist") else linhas)]
+
+    def contar(self, **filtros):
+        return len(self._linhas(filtros))
+
+    def contar_por(self, coluna, **filtros):
+        """{valor: quantidade} agrupando por 'perito' (nome) ou 'prioridade'
+        (Prioridade, ou None para as perícias)"""
+        linhas = self._linhas(filtros)
+        # Depois de _linhas, que pode ter montado as colunas
+        valores = self.peritos if coluna == 'perito' else self.prioridades
+        numpy = carregar_numpy()
+        if numpy is not None and len(linhas):
+            selecionados = numpy.frombuffer(valores, dtype=valores.typecode)[linhas]
+            deslocamento = 1 if coluna == 'prioridade' else 0  # SEM_PRIORIDADE = -1
+            contagem = numpy.bincount(selecionados + deslocamento)
+            pares = ((codigo - deslocamento, int(quantidade))
+                     for codigo, quantidade in enumerate(contagem.tolist()) if quantidade)
+        else:
+            contagem = {}
+            for linha in linhas:
+                contagem[valores[linha]] = contagem.get(valores[linha], 0) + 1
+            pares = contagem.items()
+        if coluna == 'perito':
+            return {self.nomes_peritos[codigo]: quantidade for codigo, quantidade in pares}
+        return {None if codigo == SEM_PRIORIDADE else Prioridade(codigo): quantidade
+                for codigo, quantidade in pares}
@@ -0,0 +1,277 @@
+"""Linha de comando do CPERICIAS para tarefas em lote, sem interface gráfica.
+
+Usa o mesmo núcleo (nucleo.Repositorio) e o mesmo armazenamento da janela:
+
+    python cpericias_cli.py listar --de 2025-05-01 --ate 2025-05-31
+    python cpericias_cli.py buscar 0029304-44
+    python cpericias_cli.py concluir --ate 2025-05-31 --tipo prazo
+    python cpericias_cli.py exportar pericias.csv --tipo pericia --pendentes
+    python cpericias_cli.py resumo --dias 15 --perito "Ana Souza"
+    python cpericias_cli.py vencimento 2025-05-23 15
+    python cpericias_cli.py importar intimacoes.csv --simular
+"""
+import argparse
+import csv
+import datetime
+import json
+import os
+import sys
+
+from indices import normalizar_processo
+from nucleo import TIPOS, Repositorio, validar_dias_uteis
+from registros import Prioridade
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Colunas obrigatórias do CSV de `importar` (prioridade é opcional)
+CAMPOS_IMPORTACAO = ["processo", "perito_nome", "descricao", "intimacao", "dias_uteis"]
+
+# Colunas da exportação em CSV (campos que o item não tem ficam vazios)
+CAMPOS_EXPORTACAO = ["tipo", "data", "id", "processo", "perito_nome", "descricao",
+                     "prioridade", "especialidade", "local", "observacoes",
+                     "concluido", "realizada", "data_cadastro"]
+
+
+def data_arg(texto):
+    try:
+        return datetime.date.fromisoformat(texto)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"data inválida (use AAAA-MM-DD): {texto}")
+
+
+def selecionar(repo, args):
+    """(tipo, data_str, item) do período e dos filtros pedidos, em ordem de data"""
+    inicio = args.de or datetime.date.min
+    fim = args.ate or datetime.date.max
+    # Como na busca: compara só os dígitos, com ou sem a pontuação do número
+    digitos = normalizar_processo(args.processo or "")
+    registros = []
+    for tipo in ([args.tipo] if args.tipo else TIPOS):
+        for data_str, item in repo.periodo(tipo, inicio, fim):
+            if args.pendentes and item.resolvido:
+                continue
+            if args.processo and not (digitos and digitos in normalizar_processo(item.processo)):
+                continue
+            registros.append((tipo, data_str, item))
+    return registros
+
+
+def como_dicionario(tipo, data_str, item):
+    return {"tipo": tipo, "data": data_str, **item.para_json()}
+
+
+def imprimir(registros):
+    for tipo, data_str, item in registros:
+        status = "✔" if item.resolvido else "🔴"
+        detalhe = item.descricao if tipo == 'prazo' else item.especialidade
+        print(f"{status} {data_str} | {'Prazo' if tipo == 'prazo' else 'Perícia'} | "
+              f"{item.processo} | {item.perito_nome} | {detalhe} | {item.id}")
+    print(f"{len(registros)} registro(s)", file=sys.stderr)
+
+
+def escrever(registros, saida, formato):
+    if formato == "json":
+        json.dump([como_dicionario(*registro) for registro in registros],
+                  saida, indent=4, ensure_ascii=False)
+        saida.write("\n")
+    elif formato == "csv":
+        escritor = csv.DictWriter(saida, CAMPOS_EXPORTACAO, extrasaction="ignore")
+        escritor.writeheader()
+        for registro in registros:
+            escritor.writerow(como_dicionario(*registro))
+    else:
+        imprimir(registros)
+
+
+def cmd_listar(repo, args):
+    escrever(selecionar(repo, args), sys.stdout, args.formato)
+
+
+def cmd_buscar(repo, args):
+    registros = [(tipo, data_str, item)
+                 for tipo in ([args.tipo] if args.tipo else TIPOS)
+                 for data_str, item in repo.buscar(tipo, args.termo)]
+    escrever(registros, sys.stdout, args.formato)
+
+
+def cmd_concluir(repo, args):
+    if args.id:
+        registros = [repo.obter(id_item) for id_item in args.id]
+    elif args.de or args.ate or args.processo:
+        args.pendentes = True
+        registros = selecionar(repo, args)
+    else:
+        raise ValueError("Informe --id ou um filtro (--de, --ate, --processo)")
+    if args.simular:
+        for tipo, data_str, item in registros:
+            print(f"concluiria {tipo} {data_str} {item.processo} ({item.id})")
+        print(f"{len(registros)} registro(s) a concluir", file=sys.stderr)
+        return
+    erros = repo.concluir_varios([item.id for _, _, item in registros])
+    for erro in erros:
+        print(f"Erro: {erro}", file=sys.stderr)
+    print(f"{len(registros) - len(erros)} registro(s) concluído(s)", file=sys.stderr)
+
+
+def cmd_exportar(repo, args):
+    formato = args.formato or os.path.splitext(args.saida)[1].lstrip(".").lower()
+    if formato not in ("csv", "json"):
+        raise ValueError("Formato de exportação deve ser csv ou json")
+    registros = selecionar(repo, args)
+    with open(args.saida, "w", encoding="utf-8", newline="") as f:
+        escrever(registros, f, formato)
+    print(f"{len(registros)} registro(s) exportado(s) para {args.saida}", file=sys.stderr)
+
+
+def cmd_resumo(repo, args):
+    hoje = datetime.date.today()
+    ontem = hoje - datetime.timedelta(days=1)
+    fim = hoje + datetime.timedelta(days=args.dias)
+    filtros = {"perito": args.perito} if args.perito else {}
+
+    print("Atrasados: "
+          f"{repo.contar(tipo='prazo', resolvido=False, fim=ontem, **filtros)} prazo(s), "
+          f"{repo.contar(tipo='pericia', resolvido=False, fim=ontem, **filtros)} perícia(s)")
+    por_prioridade = repo.contar_por('prioridade', tipo='prazo', resolvido=False,
+                                     inicio=hoje, fim=fim, **filtros)
+    print(f"Prazos pendentes nos próximos {args.dias} dias: " + ", ".join(
+        f"{prioridade.rotulo} {por_prioridade.get(prioridade, 0)}"
+        for prioridade in sorted(Prioridade, reverse=True)))
+    if not args.perito:
+        carga = repo.contar_por('perito', resolvido=False, inicio=hoje, fim=fim)
+        print(f"Peritos com mais pendências nos próximos {args.dias} dias:")
+        for nome, quantidade in sorted(carga.items(), key=lambda par: (-par[1], par[0]))[:args.limite]:
+            print(f"  {quantidade:6d}  {nome}")
+
+
+def cmd_vencimento(repo, args):
+    vencimento = repo.vencimentos([args.intimacao], validar_dias_uteis(args.dias_uteis))[0]
+    restantes = repo.calendario_forense().restantes(vencimento)
+    if restantes >= 0:
+        print(f"{vencimento.isoformat()} (faltam {restantes} dia(s) útil(eis))")
+    else:
+        print(f"{vencimento.isoformat()} (vencido há {-restantes} dia(s) útil(eis))")
+
+
+def cmd_importar(repo, args):
+    """Cria prazos a partir de um CSV de intimações, com os vencimentos calculados de uma vez"""
+    with open(args.entrada, "r", encoding="utf-8", newline="") as f:
+        leitor = csv.DictReader(f)
+        faltando = [campo for campo in CAMPOS_IMPORTACAO if campo not in (leitor.fieldnames or ())]
+        if faltando:
+            raise ValueError(f"Colunas ausentes em {args.entrada}: {', '.join(faltando)}")
+        linhas = list(leitor)
+
+    validas, erros = [], 0
+    for numero, linha in enumerate(linhas, start=2):
+        try:
+            intimacao = data_arg(linha["intimacao"])
+            validas.append((numero, linha, intimacao, validar_dias_uteis(linha["dias_uteis"])))
+        except (argparse.ArgumentTypeError, ValueError) as e:
+            print(f"linha {numero}: {e}", file=sys.stderr)
+            erros += 1
+    vencimentos = repo.vencimentos([intimacao for _, _, intimacao, _ in validas],
+                                   [dias for _, _, _, dias in validas])
+
+    criados = 0
+    for (numero, linha, _, _), vencimento in zip(validas, vencimentos):
+        if args.simular:
+            print(f"criaria prazo {vencimento.isoformat()} {linha['processo']}")
+            continue
+        try:
+            repo.adicionar_prazo(vencimento, linha["processo"], linha["perito_nome"],
+                                 linha["descricao"], linha.get("prioridade") or "Normal")
+            criados += 1
+        except ValueError as e:
+            print(f"linha {numero}: {e}", file=sys.stderr)
+            erros += 1
+    total = len(validas) if args.simular else criados
+    print(f"{total} prazo(s) {'a criar' if args.simular else 'criado(s)'}, {erros} erro(s)",
+          file=sys.stderr)
+
+
+def criar_parser():
+    parser = argparse.ArgumentParser(prog="cpericias_cli",
+                                     description="Tarefas em lote sobre prazos e perícias")
+    parser.add_argument("--pasta", default=BASE_DIR,
+                        help="pasta dos arquivos de dados (padrão: a do programa)")
+    parser.add_argument("--armazenamento",
+                        default=os.environ.get("CPERICIAS_ARMAZENAMENTO", "json"),
+                        help="json, diario, sqlite ou mensal")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    filtros = argparse.ArgumentParser(add_help=False)
+    filtros.add_argument("--de", type=data_arg, help="data inicial (AAAA-MM-DD)")
+    filtros.add_argument("--ate", type=data_arg, help="data final (AAAA-MM-DD)")
+    filtros.add_argument("--tipo", choices=TIPOS)
+    filtros.add_argument("--processo", help="trecho do número do processo, com ou sem pontuação")
+    filtros.add_argument("--pendentes", action="store_true",
+                         help="só prazos não concluídos e perícias não realizadas")
+
+    listar = sub.add_parser("listar", parents=[filtros], help="lista um período")
+    listar.add_argument("--formato", choices=("texto", "json", "csv"), default="texto")
+    listar.set_defaults(funcao=cmd_listar)
+
+    buscar = sub.add_parser("buscar", help="busca pelo número do processo")
+    buscar.add_argument("termo", help="trecho do processo, com ou sem pontuação")
+    buscar.add_argument("--tipo", choices=TIPOS)
+    buscar.add_argument("--formato", choices=("texto", "json", "csv"), default="texto")
+    buscar.set_defaults(funcao=cmd_buscar)
+
+    concluir = sub.add_parser("concluir", parents=[filtros],
+                              help="conclui prazos e marca perícias como realizadas")
+    concluir.add_argument("--id", action="append", help="id do item (pode repetir)")
+    concluir.add_argument("--simular", action="store_true", help="só mostra o que seria feito")
+    concluir.set_defaults(funcao=cmd_concluir)
+
+    exportar = sub.add_parser("exportar", parents=[filtros], help="exporta para CSV ou JSON")
+    exportar.add_argument("saida", help="arquivo de saída (.csv ou .json)")
+    exportar.add_argument("--formato", choices=("csv", "json"))
+    exportar.set_defaults(funcao=cmd_exportar)
+
+    resumo = sub.add_parser("resumo", help="atrasados, pendências por prioridade e por perito")
+    resumo.add_argument("--dias", type=int, default=15, help="janela a partir de hoje (padrão: 15)")
+    resumo.add_argument("--perito", help="só os itens deste perito")
+    resumo.add_argument("--limite", type=int, default=10, help="peritos listados (padrão: 10)")
+    resumo.set_defaults(funcao=cmd_resumo)
+
+    vencimento = sub.add_parser("vencimento", help="data da intimação + N dias úteis")
+    vencimento.add_argument("intimacao", type=data_arg, help="data da intimação (AAAA-MM-DD)")
+    vencimento.add_argument("dias_uteis", help="prazo em dias úteis")
+    vencimento.set_defaults(funcao=cmd_vencimento)
+
+    importar = sub.add_parser("importar", help="cria prazos a partir de um CSV de intimações")
+    importar.add_argument("entrada", help="CSV com " + ", ".join(CAMPOS_IMPORTACAO)
+                          + " e, opcionalmente, prioridade")
+    importar.add_argument("--simular", action="store_true", help="só mostra o que seria feito")
+    importar.set_defaults(funcao=cmd_importar)
+    return parser
+
+
+def main(argv=None):
+    args = criar_parser().parse_args(argv)
+    try:
+        repo = Repositorio(args.pasta, args.armazenamento)
+    except ValueError as e:
+        print(f"Erro: {e}", file=sys.stderr)
+        return 2
+    try:
+        for file, e in repo.carregar():
+            print(f"Erro ao carregar {file}: {e}", file=sys.stderr)
+        args.funcao(repo, args)
+    except ValueError as e:
+        print(f"Erro: {e}", file=sys.stderr)
+        return 1
+    finally:
+        # As alterações em lote são agrupadas pelo gravador e gravadas aqui
+        repo.fechar()
+    falhas = 0
+    while not repo.gravador.erros.empty():
+        file, e = repo.gravador.erros.get_nowait()
+        print(f"Erro ao salvar {file}: {e}", file=sys.stderr)
+        falhas += 1
+    return 1 if falhas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+"""Medição de latência das operações principais do CPERICIAS.
+
+Cada operação medida guarda as últimas JANELA_AMOSTRAS durações (uma janela
+móvel) além do total de chamadas, de onde saem p50, p95 e máximo.  Chamadas
+acima do limite de lentidão são registradas no log "cpericias" e ficam numa
+lista das mais recentes.  O custo por chamada é de dois perf_counter() e um
+append sob lock, então a medição fica sempre ligada.
+
+As fases da inicialização (ms desde o início do programa) ficam à parte,
+sem entrar nos percentis.
+"""
+import collections
+import datetime
+import functools
+import json
+import logging
+import os
+import threading
+import time
+
+# Quantas durações recentes cada operação guarda para os percentis
+JANELA_AMOSTRAS = 500
+
+# Chamadas mais lentas que isto (ms) vão para o log; ajustável pela variável
+# de ambiente CPERICIAS_LIMITE_LENTO_MS
+LIMITE_LENTO_MS = float(os.environ.get("CPERICIAS_LIMITE_LENTO_MS", "200"))
+
+# Chamadas lentas recentes mantidas para a janela de diagnóstico
+MAX_LENTAS = 100
+
+log = logging.getLogger("cpericias")
+
+
+def percentil(ordenadas, fracao):
+    """Percentil (0 a 1) de uma lista já ordenada, pelo vizinho mais próximo"""
+    if not ordenadas:
+        return 0.0
+    return ordenadas[min(len(ordenadas) - 1, int(fracao * len(ordenadas)))]
+
+
+class Medidor:
+    """Durações por operação, alimentadas pelas threads da interface e do gravador"""
+
+    def __init__(self, limite_lento_ms=LIMITE_LENTO_MS, janela=JANELA_AMOSTRAS):
+        self.limite_lento_ms = limite_lento_ms
+        self.janela = janela
+        self.lock = threading.Lock()
+        self.amostras = {}  # operação -> deque com as últimas durações (ms)
+        self.chamadas = {}  # operação -> total de chamadas desde o início
+        self.lentas = collections.deque(maxlen=MAX_LENTAS)  # (quando, operação, ms)
+        self.fases = {}     # fase da inicialização -> ms desde o início do programa
+
+    def registrar(self, operacao, ms):
+        with self.lock:
+            amostras = self.amostras.get(operacao)
+            if amostras is None:
+                amostras = self.amostras[operacao] = collections.deque(maxlen=self.janela)
+            amostras.append(ms)
+            self.chamadas[operacao] = self.chamadas.get(operacao, 0) + 1
+            lenta = ms > self.limite_lento_ms
+            if lenta:
+                self.lentas.append((datetime.datetime.now().isoformat(timespec="seconds"),
+                                    operacao, round(ms, 1)))
+        if lenta:
+            log.warning("Operação lenta: %s levou %.1f ms", operacao, ms)
+
+    def marcar_fase(self, fase, ms):
+        with self.lock:
+            self.fases[fase] = round(ms, 1)
+
+    def fases_inicializacao(self):
+        with self.lock:
+            return dict(self.fases)
+
+    def medir(self, operacao):
+        """Decorador que registra a duração de cada chamada da função"""
+        def decorador(funcao):
+            @functools.wraps(funcao)
+            def medida(*args, **kwargs):
+                inicio = time.perf_counter()
+                try:
+                    return funcao(*args, **kwargs)
+                finally:
+                    self.registrar(operacao, (time.perf_counter() - inicio) * 1000)
+            return medida
+        return decorador
+
+    def resumo(self):
+        """{operação: {chamadas, p50_ms, p95_ms, max_ms}} da janela atual"""
+        with self.lock:
+            copia = {operacao: (sorted(amostras), self.chamadas[operacao])
+                     for operacao, amostras in self.amostras.items()}
+        return {operacao: {
+                    "chamadas": chamadas,
+                    "p50_ms": round(percentil(ordenadas, 0.5), 3),
+                    "p95_ms": round(percentil(ordenadas, 0.95), 3),
+                    "max_ms": round(ordenadas[-1], 3),
+                }
+                for operacao, (ordenadas, chamadas) in sorted(copia.items())}
+
+    def chamadas_lentas(self):
+        with self.lock:
+            return list(self.lentas)
+
+    def limpar(self):
+        with self.lock:
+            self.amostras.clear()
+            self.chamadas.clear()
+            self.lentas.clear()
+
+    def exportar(self, caminho):
+        """Grava resumo, amostras e chamadas lentas num arquivo JSON"""
+        with self.lock:
+            amostras = {operacao: [round(ms, 3) for ms in valores]
+                        for operacao, valores in self.amostras.items()}
+        dados = {
+            "gerado_em": datetime.datetime.now().isoformat(timespec="seconds"),
+            "limite_lento_ms": self.limite_lento_ms,
+            "inicializacao_ms": self.fases_inicializacao(),
+            "resumo": self.resumo(),
+            "lentas": self.chamadas_lentas(),
+            "amostras": amostras,
+        }
+        with open(caminho, "w", encoding="utf-8") as f:
+            json.dump(dados, f, indent=4, ensure_ascii=False)
+
+
+# Medidor único do programa
+medidor = Medidor()
@@ -0,0 +1,205 @@
+"""Contagem de prazos processuais em dias úteis.
+
+Como no CPC (arts. 219, 220 e 224): exclui-se o dia do começo (a intimação),
+conta-se só dia útil e o prazo fica suspenso no recesso forense, de 20 de
+dezembro a 20 de janeiro.  Não são úteis os sábados, domingos, feriados
+nacionais (inclusive Carnaval, Sexta-feira Santa e Corpus Christi) e os
+feriados do arquivo feriados.json da pasta dos dados, se existir:
+
+    {
+        "feriados": ["12-08", "12-10", "2025-03-19"],
+        "recessos": [["12-20", "01-20"]]
+    }
+
+"MM-DD" vale para todos os anos e "AAAA-MM-DD" só para aquela data.  A lista
+"recessos", quando presente, substitui o recesso padrão.
+
+O calendário é tabelado uma vez para um intervalo de anos (estendido quando
+uma data cai fora dele): para cada dia, quantos dias úteis houve até ele, e
+a lista dos dias úteis em ordem.  Assim "intimação + N dias úteis" e "dias
+úteis restantes" são só consultas às duas tabelas, em O(1).
+"""
+import array
+import datetime
+import itertools
+import json
+import os
+
+# Recesso forense padrão (CPC, art. 220), de um ano para o outro
+RECESSO_PADRAO = (("12-20", "01-20"),)
+
+# Feriados nacionais de data fixa (Leis 662/1949, 6.802/1980 e 14.759/2023)
+FERIADOS_FIXOS = ("01-01", "04-21", "05-01", "09-07", "10-12", "11-02", "11-15", "12-25")
+# Consciência Negra, feriado nacional a partir de 2024
+CONSCIENCIA_NEGRA = ("11-20", 2024)
+# Feriados móveis: dias em relação ao domingo de Páscoa (Carnaval, Sexta-feira
+# Santa, Corpus Christi)
+FERIADOS_MOVEIS = (-48, -47, -2, 60)
+
+# Anos tabelados em volta do ano atual na primeira consulta
+ANOS_ANTES = 2
+ANOS_DEPOIS = 5
+
+
+def pascoa(ano):
+    """Domingo de Páscoa do ano (algoritmo de Meeus/Jones/Butcher)"""
+    a = ano % 19
+    b, c = divmod(ano, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    mes, dia = divmod(h + l - 7 * m + 114, 31)
+    return datetime.date(ano, mes, dia + 1)
+
+
+def feriados_nacionais(ano):
+    """Datas dos feriados nacionais (e dos móveis forenses) do ano"""
+    feriados = {datetime.date(ano, *map(int, dia.split("-"))) for dia in FERIADOS_FIXOS}
+    if ano >= CONSCIENCIA_NEGRA[1]:
+        feriados.add(datetime.date(ano, *map(int, CONSCIENCIA_NEGRA[0].split("-"))))
+    domingo = pascoa(ano)
+    feriados.update(domingo + datetime.timedelta(days=dias) for dias in FERIADOS_MOVEIS)
+    return feriados
+
+
+def ler_dia(texto, origem):
+    """'MM-DD' -> (mês, dia), repetido todo ano; 'AAAA-MM-DD' -> datetime.date"""
+    try:
+        if isinstance(texto, str) and len(texto) == 5:
+            mes, dia = map(int, texto.split("-"))
+            datetime.date(2000, mes, dia)  # Valida (2000 é bissexto: aceita 02-29)
+            return mes, dia
+        return datetime.date.fromisoformat(texto)
+    except (TypeError, ValueError):
+        raise ValueError(f"Data inválida em {origem}: {texto!r} (use MM-DD ou AAAA-MM-DD)")
+
+
+class CalendarioForense:
+    """Dias úteis forenses e as tabelas para contar prazos.
+
+    `feriados` e `recessos` seguem o formato do feriados.json.
+    """
+
+    def __init__(self, feriados=(), recessos=RECESSO_PADRAO, origem="feriados"):
+        dias = [ler_dia(texto, origem) for texto in feriados]
+        self.anuais = {dia for dia in dias if isinstance(dia, tuple)}
+        self.datas = {dia for dia in dias if isinstance(dia, datetime.date)}
+        self.recessos = []
+        for par in recessos:
+            if not isinstance(par, (list, tuple)) or len(par) != 2:
+                raise ValueError(f"Recesso inválido em {origem}: {par!r} (use [inicio, fim])")
+            inicio, fim = (ler_dia(texto, origem) for texto in par)
+            if type(inicio) is not type(fim):
+                raise ValueError(f"Recesso inválido em {origem}: {par!r} (use o mesmo formato nas duas datas)")
+            self.recessos.append((inicio, fim))
+        self.primeiro_ano = self.ultimo_ano = None
+        self.base = 0                        # Ordinal do primeiro dia tabelado
+        self.acumulado = array.array('i')    # dia - base -> dias úteis até ele, inclusive
+        self.uteis = array.array('i')        # ordinais dos dias úteis, em ordem
+
+    @classmethod
+    def de_arquivo(cls, caminho):
+        """Calendário com os feriados do arquivo (só os nacionais, se ele não existir)"""
+        if not os.path.exists(caminho):
+            return cls()
+        try:
+            with open(caminho, 'r', encoding='utf-8') as f:
+                dados = json.load(f)
+        except ValueError as e:
+            raise ValueError(f"Erro ao ler {caminho}: {str(e)}")
+        if not isinstance(dados, dict):
+            raise ValueError(f"Erro ao ler {caminho}: esperado um objeto com \"feriados\"")
+        return cls(dados.get("feriados", ()), dados.get("recessos", RECESSO_PADRAO), caminho)
+
+    # Tabelas
+
+    def _suspensos(self, primeiro_ano, ultimo_ano):
+        """Ordinais de feriados e recessos entre os anos (inclusive)"""
+        suspensos = set()
+        for ano in range(primeiro_ano, ultimo_ano + 1):
+            suspensos.update(dia.toordinal() for dia in feriados_nacionais(ano))
+            suspensos.update(datetime.date(ano, mes, dia).toordinal() for mes, dia in self.anuais
+                             if (mes, dia) != (2, 29) or ano % 4 == 0 and (ano % 100 or ano % 400 == 0))
+        suspensos.update(dia.toordinal() for dia in self.datas)
+        for inicio, fim in self.recessos:
+            if isinstance(inicio, datetime.date):
+                periodos = [(inicio, fim)]
+            else:
+                # Recesso anual; o do ano anterior pode avançar sobre janeiro
+                periodos = []
+                for ano in range(max(primeiro_ano - 1, 1), min(ultimo_ano, 9998) + 1):
+                    ano_fim = ano if fim >= inicio else ano + 1
+                    periodos.append((datetime.date(ano, *inicio), datetime.date(ano_fim, *fim)))
+            for comeco, termino in periodos:
+                suspensos.update(range(comeco.toordinal(), termino.toordinal() + 1))
+        return suspensos
+
+    def _montar(self, primeiro_ano, ultimo_ano):
+        primeiro_ano, ultimo_ano = max(primeiro_ano, 1), min(ultimo_ano, 9999)
+        suspensos = self._suspensos(primeiro_ano, ultimo_ano)
+        base = datetime.date(primeiro_ano, 1, 1).toordinal()
+        fim = datetime.date(ultimo_ano, 12, 31).toordinal()
+        dias = range(base, fim + 1)
+        # ordinal % 7: 6 = sábado, 0 = domingo
+        util = [ordinal % 7 not in (6, 0) and ordinal not in suspensos for ordinal in dias]
+        self.primeiro_ano, self.ultimo_ano, self.base = primeiro_ano, ultimo_ano, base
+        self.acumulado = array.array('i', itertools.accumulate(util))
+        self.uteis = array.array('i', itertools.compress(dias, util))
+
+    def _cobrir(self, menor, maior):
+        """Garante que as tabelas cobrem os ordinais de menor a maior"""
+        ano_menor = datetime.date.fromordinal(max(menor, 1)).year
+        ano_maior = datetime.date.fromordinal(min(maior, datetime.date.max.toordinal())).year
+        if self.primeiro_ano is None:
+            atual = datetime.date.today().year
+            self._montar(min(ano_menor, atual - ANOS_ANTES), max(ano_maior, atual + ANOS_DEPOIS))
+        elif ano_menor < self.primeiro_ano or ano_maior > self.ultimo_ano:
+            self._montar(min(ano_menor, self.primeiro_ano), max(ano_maior, self.ultimo_ano))
+
+    # Consultas
+
+    def dia_util(self, data):
+        ordinal = data.toordinal()
+        self._cobrir(ordinal, ordinal)
+        posicao = ordinal - self.base
+        anterior = self.acumulado[posicao - 1] if posicao else 0
+        return self.acumulado[posicao] > anterior
+
+    def somar(self, inicio, dias):
+        """Vencimento de um prazo de `dias` dias úteis contado a partir de `inicio`"""
+        return self.somar_lote([inicio], dias)[0]
+
+    def somar_lote(self, inicios, dias):
+        """Vencimentos de vários prazos; `dias` é um número só ou um por início"""
+        ordinais = [inicio.toordinal() for inicio in inicios]
+        if not ordinais:
+            return []
+        quantidades = [dias] * len(ordinais) if isinstance(dias, int) else list(dias)
+        if len(quantidades) != len(ordinais):
+            raise ValueError("Informe uma quantidade de dias úteis por data")
+        if min(quantidades) < 1:
+            raise ValueError("O prazo deve ter pelo menos 1 dia útil")
+        # Folga para o recesso e os fins de semana: 2 dias corridos por dia útil + 60
+        self._cobrir(min(ordinais), max(ordinais) + 2 * max(quantidades) + 60)
+        acumulado, uteis, base = self.acumulado, self.uteis, self.base
+        while True:
+            posicoes = [acumulado[ordinal - base] + quantidade - 1
+                        for ordinal, quantidade in zip(ordinais, quantidades)]
+            if max(posicoes) < len(uteis):
+                break
+            if self.ultimo_ano >= 9999:
+                raise ValueError("Data além do calendário suportado")
+            self._montar(self.primeiro_ano, self.ultimo_ano + 10)
+            acumulado, uteis, base = self.acumulado, self.uteis, self.base
+        fromordinal = datetime.date.fromordinal
+        return [fromordinal(uteis[posicao]) for posicao in posicoes]
+
+    def restantes(self, vencimento, hoje=None):
+        """Dias úteis depois de hoje até o vencimento, inclusive (negativo se já passou)"""
+        fim, inicio = vencimento.toordinal(), (hoje or datetime.date.today()).toordinal()
+        self._cobrir(min(inicio, fim), max(inicio, fim))
+        return self.acumulado[fim - self.base] - self.acumulado[inicio - self.base]
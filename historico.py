@@ -0,0 +1,32 @@
+"""Histórico de desfazer/refazer do Repositorio, guardado como operações inversas.
+
+Cada alteração do Repositorio passa por operações elementares (incluir,
+retirar, mover, trocar campos, trocar perito), e cada uma devolve a sua
+inversa, uma tupla como ("retirar", id) ou ("campos", id, valores, extras).
+As inversas das operações de um `lote` formam um passo.  Desfazer aplica as
+inversas do passo, da última para a primeira; as inversas delas formam o
+passo de refazer.  Nada é copiado além dos valores alterados (e do próprio
+registro, quando ele é apagado), então a memória não cresce com o tamanho
+dos dados.
+"""
+import collections
+
+# Passos guardados para desfazer; os mais antigos são descartados
+LIMITE_HISTORICO = 200
+
+
+class Historico:
+    """Pilhas de passos para desfazer e refazer"""
+
+    def __init__(self, limite=LIMITE_HISTORICO):
+        self.desfazer = collections.deque(maxlen=limite)
+        self.refazer = collections.deque(maxlen=limite)
+
+    def registrar(self, passo):
+        """Passo novo (feito pelo usuário): o que havia para refazer se perde"""
+        self.desfazer.append(passo)
+        self.refazer.clear()
+
+    def limpar(self):
+        self.desfazer.clear()
+        self.refazer.clear()
@@ -0,0 +1,431 @@
+"""Índices em memória sobre prazos e perícias.
+
+Todo prazo e toda perícia recebe um `id` persistente na primeira vez que é
+carregado ou criado.  O IndiceRegistros liga cada id à sua posição atual
+(tipo, data, registro), para que as ações do menu de contexto encontrem o
+item em O(1) e alterem exatamente um registro.
+
+Os demais índices (datas, itens em aberto, duplicidades, processos, peritos)
+se registram como ouvintes do IndiceRegistros e são avisados de cada
+inclusão e remoção, sempre com o item ainda com os valores que tinha quando
+foi indexado.
+"""
+import bisect
+import datetime
+import heapq
+import re
+import unicodedata
+import uuid
+
+# Tamanho dos pedaços (n-gramas) indexados do número do processo
+TAMANHO_NGRAMA = 3
+
+# Quantos peritos o autocompletar sugere de cada vez
+LIMITE_SUGESTOES = 10
+
+# Faixas com mais de 1/FRACAO_FAIXA_GRANDE dos peritos são respondidas
+# percorrendo os peritos por uso em vez de ordenar a faixa
+FRACAO_FAIXA_GRANDE = 20
+
+
+def novo_id():
+    """Gera um identificador único para um prazo ou perícia"""
+    return uuid.uuid4().hex
+
+
+def ordinal_da_data(data_str):
+    """'2025-05-23' -> ordinal da data (None se a chave não for uma data)"""
+    try:
+        return datetime.date.fromisoformat(data_str).toordinal()
+    except ValueError:
+        return None
+
+
+def normalizar_processo(processo):
+    """Mantém só os dígitos: '0029304-44.2024.8.16.0014' -> '00293044420248160014'"""
+    return re.sub(r'\D', '', processo)
+
+
+def normalizar_texto(texto):
+    """'João Sá' -> 'joao sa': sem acentos e sem diferença de maiúsculas"""
+    if texto.isascii():
+        return texto.lower()
+    decomposto = unicodedata.normalize("NFKD", texto)
+    return "".join(c for c in decomposto if not unicodedata.combining(c)).casefold()
+
+
+def garantir_ids(data, chaves=None):
+    """Atribui id aos itens que ainda não têm; retorna as datas alteradas"""
+    alteradas = []
+    for data_str in (data if chaves is None else chaves):
+        faltando = False
+        for item in data.get(data_str, []):
+            if not item.id:
+                item.id = novo_id()
+                faltando = True
+        if faltando:
+            alteradas.append(data_str)
+    return alteradas
+
+
+class IndiceRegistros:
+    """id -> (tipo, data_str, item) de todos os prazos e perícias carregados"""
+
+    def __init__(self):
+        self.por_id = {}
+        self.ouvintes = []  # Índices derivados, com inserir/remover(tipo, data_str, item)
+
+    def inserir(self, tipo, data_str, item):
+        self.por_id[item.id] = (tipo, data_str, item)
+        for ouvinte in self.ouvintes:
+            ouvinte.inserir(tipo, data_str, item)
+
+    def remover(self, id_item):
+        """Tira o registro do índice e o retorna (None se não existir)"""
+        registro = self.por_id.pop(id_item, None)
+        if registro is not None:
+            for ouvinte in self.ouvintes:
+                ouvinte.remover(*registro)
+        return registro
+
+    def mover(self, id_item, nova_data_str):
+        tipo, _, item = self.remover(id_item)
+        self.inserir(tipo, nova_data_str, item)
+
+    def obter(self, id_item):
+        """Retorna (tipo, data_str, item) ou None"""
+        return self.por_id.get(id_item)
+
+
+class IndiceDatas:
+    """Datas que têm itens, em ordem, para consultas por intervalo.
+
+    Mantém por tipo uma lista ordenada dos ordinais das datas e quantos itens
+    cada data tem; a lista só muda quando uma data ganha o primeiro item ou
+    perde o último.  Um intervalo é respondido com duas buscas binárias.
+    """
+
+    def __init__(self):
+        self.ordinais = {}  # tipo -> ordinais em ordem crescente
+        self.contagem = {}  # (tipo, ordinal) -> quantidade de itens
+
+    def inserir(self, tipo, data_str, item):
+        ordinal = ordinal_da_data(data_str)
+        if ordinal is None:
+            return
+        chave = (tipo, ordinal)
+        quantidade = self.contagem.get(chave, 0)
+        if quantidade == 0:
+            bisect.insort(self.ordinais.setdefault(tipo, []), ordinal)
+        self.contagem[chave] = quantidade + 1
+
+    def remover(self, tipo, data_str, item):
+        ordinal = ordinal_da_data(data_str)
+        chave = (tipo, ordinal)
+        if chave not in self.contagem:
+            return
+        self.contagem[chave] -= 1
+        if self.contagem[chave] == 0:
+            del self.contagem[chave]
+            ordinais = self.ordinais[tipo]
+            del ordinais[bisect.bisect_left(ordinais, ordinal)]
+
+    def datas(self, tipo, inicio, fim):
+        """Datas ("AAAA-MM-DD") com itens entre inicio e fim, em ordem"""
+        ordinais = self.ordinais.get(tipo, [])
+        i = bisect.bisect_left(ordinais, inicio.toordinal())
+        j = bisect.bisect_right(ordinais, fim.toordinal())
+        return [datetime.date.fromordinal(o).isoformat() for o in ordinais[i:j]]
+
+
+class IndiceAbertos:
+    """Prazos não concluídos e perícias não realizadas, em ordem de data.
+
+    As chaves (data_str, tipo, processo, id) dos itens em aberto ficam numa
+    lista ordenada, montada na primeira consulta e depois mantida a cada
+    inclusão e remoção.  Hoje divide a lista em duas: antes dele os
+    atrasados, a partir dele os pendentes.  Uma busca binária acha a
+    divisa, então as contagens saem em O(log n) e as listas em O(resultado).
+    """
+
+    def __init__(self):
+        self.abertos = {}    # id -> (tipo, data_str, item)
+        self.chaves = None   # Chaves dos itens em aberto, em ordem; None = montar
+
+    def inserir(self, tipo, data_str, item):
+        if item.resolvido:
+            return
+        self.abertos[item.id] = (tipo, data_str, item)
+        if self.chaves is not None:
+            bisect.insort(self.chaves, (data_str, tipo, item.processo, item.id))
+
+    def remover(self, tipo, data_str, item):
+        if self.abertos.pop(item.id, None) is None:
+            return
+        if self.chaves is not None:
+            del self.chaves[bisect.bisect_left(self.chaves, (data_str, tipo, item.processo, item.id))]
+
+    def _divisa(self, hoje):
+        if self.chaves is None:
+            self.chaves = sorted((data_str, tipo, item.processo, item.id)
+                                 for tipo, data_str, item in self.abertos.values())
+        return bisect.bisect_left(self.chaves, (hoje.isoformat(),))
+
+    def atrasados(self, hoje):
+        """Lista (tipo, data_str, item) em aberto de datas anteriores a hoje"""
+        divisa = self._divisa(hoje)
+        return [self.abertos[chave[3]] for chave in self.chaves[:divisa]]
+
+    def pendentes(self, hoje):
+        """Lista (tipo, data_str, item) em aberto de hoje em diante"""
+        divisa = self._divisa(hoje)
+        return [self.abertos[chave[3]] for chave in self.chaves[divisa:]]
+
+    def contar(self, hoje):
+        """(atrasados, pendentes)"""
+        divisa = self._divisa(hoje)
+        return divisa, len(self.chaves) - divisa
+
+
+class IndiceDuplicados:
+    """(tipo, data_str, processo) de todos os itens, para barrar duplicidades em O(1).
+
+    Guarda quantos itens têm cada combinação, porque dados antigos podem já
+    ter o mesmo processo duas vezes no mesmo dia.
+    """
+
+    def __init__(self):
+        self.contagem = {}
+
+    def inserir(self, tipo, data_str, item):
+        chave = (tipo, data_str, item.processo)
+        self.contagem[chave] = self.contagem.get(chave, 0) + 1
+
+    def remover(self, tipo, data_str, item):
+        chave = (tipo, data_str, item.processo)
+        quantidade = self.contagem.get(chave, 0)
+        if quantidade <= 1:
+            self.contagem.pop(chave, None)
+        else:
+            self.contagem[chave] = quantidade - 1
+
+    def existe(self, tipo, data_str, processo):
+        return (tipo, data_str, processo) in self.contagem
+
+
+class IndiceProcessos:
+    """Busca por trecho do número do processo, com ou sem pontuação.
+
+    Cada número é guardado só com os dígitos e quebrado em n-gramas de
+    TAMANHO_NGRAMA dígitos; cada n-grama aponta para os números que o
+    contêm.  Uma busca cruza os conjuntos dos n-gramas do termo (do menor
+    para o maior) e confere o trecho apenas nos candidatos, então serve
+    tanto para prefixo quanto para trecho do meio.
+    """
+
+    def __init__(self):
+        self.itens = {}     # dígitos -> {id: (tipo, data_str, item)}
+        self.ngramas = {}   # n-grama -> dígitos dos processos que o contêm
+
+    def _ngramas(self, digitos):
+        return {digitos[i:i + TAMANHO_NGRAMA]
+                for i in range(len(digitos) - TAMANHO_NGRAMA + 1)}
+
+    def inserir(self, tipo, data_str, item):
+        digitos = normalizar_processo(item.processo)
+        registros = self.itens.get(digitos)
+        if registros is None:
+            registros = self.itens[digitos] = {}
+            for ngrama in self._ngramas(digitos):
+                self.ngramas.setdefault(ngrama, set()).add(digitos)
+        registros[item.id] = (tipo, data_str, item)
+
+    def remover(self, tipo, data_str, item):
+        digitos = normalizar_processo(item.processo)
+        registros = self.itens.get(digitos)
+        if registros is None:
+            return
+        registros.pop(item.id, None)
+        if not registros:
+            del self.itens[digitos]
+            for ngrama in self._ngramas(digitos):
+                processos = self.ngramas[ngrama]
+                processos.discard(digitos)
+                if not processos:
+                    del self.ngramas[ngrama]
+
+    def _candidatos(self, termo):
+        if len(termo) < TAMANHO_NGRAMA:
+            return self.itens.keys()  # Termo curto demais para o índice
+        conjuntos = []
+        for ngrama in self._ngramas(termo):
+            processos = self.ngramas.get(ngrama)
+            if not processos:
+                return ()
+            conjuntos.append(processos)
+        conjuntos.sort(key=len)
+        return set.intersection(*conjuntos)
+
+    def buscar(self, tipo, termo):
+        """Lista (data_str, item) do tipo cujo processo contém o termo, mais recentes primeiro"""
+        digitos = normalizar_processo(termo)
+        if not digitos and termo.strip():
+            return []
+        resultado = [(data_str, item)
+                     for processo in self._candidatos(digitos) if digitos in processo
+                     for tipo_item, data_str, item in self.itens[processo].values()
+                     if tipo_item == tipo]
+        resultado.sort(key=lambda registro: registro[0], reverse=True)
+        return resultado
+
+
+class IndicePeritos:
+    """Sugestões de peritos pelo começo de qualquer palavra do nome ou do CPF.
+
+    Cada palavra do nome (sem acentos, em minúsculas) e os dígitos do CPF
+    apontam para os nomes que os contêm; as chaves distintas ficam numa lista
+    ordenada, então o trecho digitado vira uma faixa achada com duas buscas
+    binárias.  As sugestões saem ordenadas pelo uso mais recente do perito
+    (data de cadastro do último prazo ou perícia dele), que o índice
+    acompanha como ouvinte do IndiceRegistros.
+
+    Quando a faixa é grande (uma ou duas letras), percorrer os peritos do
+    mais recente para o mais antigo até juntar as sugestões é mais rápido que
+    ordenar a faixa inteira; para isso há a lista `por_uso`, montada na
+    primeira consulta e depois mantida a cada alteração.
+    """
+
+    def __init__(self):
+        self.palavras = ChavesOrdenadas()  # palavra normalizada -> nomes
+        self.cpfs = ChavesOrdenadas()      # dígitos do CPF -> nomes
+        self.nomes = {}       # nome -> (palavras normalizadas, dígitos do CPF)
+        self.uso = {}         # nome -> ordinal da data do uso mais recente
+        self.por_uso = None   # (-uso, nome) dos peritos, em ordem; None = montar
+
+    def carregar(self, peritos):
+        """Indexa vários peritos de uma vez, ordenando as chaves só no fim"""
+        for perito in peritos:
+            self._registrar(perito, ordenar=False)
+        self.palavras.ordenar()
+        self.cpfs.ordenar()
+        self.por_uso = None
+
+    def incluir(self, perito):
+        nome = self._registrar(perito, ordenar=True)
+        if self.por_uso is not None:
+            bisect.insort(self.por_uso, (-self.uso.get(nome, 0), nome))
+
+    def _registrar(self, perito, ordenar):
+        nome = perito.nome
+        if nome in self.nomes:
+            self.retirar(nome)
+        palavras = normalizar_texto(nome).split()
+        cpf = (perito.cpf or "").replace(".", "").replace("-", "")
+        self.nomes[nome] = (palavras, cpf)
+        for palavra in palavras:
+            self.palavras.incluir(palavra, nome, ordenar)
+        if cpf:
+            self.cpfs.incluir(cpf, nome, ordenar)
+        return nome
+
+    def retirar(self, nome):
+        palavras, cpf = self.nomes.pop(nome)
+        for palavra in palavras:
+            self.palavras.retirar(palavra, nome)
+        if cpf:
+            self.cpfs.retirar(cpf, nome)
+        if self.por_uso is not None:
+            del self.por_uso[bisect.bisect_left(self.por_uso, (-self.uso.get(nome, 0), nome))]
+
+    def inserir(self, tipo, data_str, item):
+        nome = item.perito_nome
+        quando = item.data_cadastro or 0
+        anterior = self.uso.get(nome, 0)
+        if not nome or quando <= anterior:
+            return
+        self.uso[nome] = quando
+        if self.por_uso is not None and nome in self.nomes:
+            del self.por_uso[bisect.bisect_left(self.por_uso, (-anterior, nome))]
+            bisect.insort(self.por_uso, (-quando, nome))
+
+    def remover(self, tipo, data_str, item):
+        pass  # O uso mais recente continua valendo para a ordenação
+
+    def _ordem_uso(self):
+        if self.por_uso is None:
+            self.por_uso = sorted((-self.uso.get(nome, 0), nome) for nome in self.nomes)
+        return self.por_uso
+
+    def sugerir(self, termo, limite=LIMITE_SUGESTOES):
+        """Até `limite` nomes que casam com o termo, os usados mais recentemente
+        primeiro e, no empate, em ordem alfabética"""
+        consulta = normalizar_texto(termo).split()
+        if not consulta:
+            return [nome for _, nome in self._ordem_uso()[:limite]]
+        if not re.search(r'[^\d.\-\s]', termo):
+            # Só dígitos e pontuação: trecho inicial do CPF
+            chaves, prefixo = self.cpfs, normalizar_processo(termo)
+            def casa(nome):
+                return self.nomes[nome][1].startswith(prefixo)
+        else:
+            # A palavra mais longa do termo é a mais seletiva para a faixa
+            chaves, prefixo = self.palavras, max(consulta, key=len)
+            def casa(nome):
+                palavras = self.nomes[nome][0]
+                return all(any(palavra.startswith(parte) for palavra in palavras)
+                           for parte in consulta)
+
+        faixa = chaves.com_prefixo(prefixo, len(self.nomes) // FRACAO_FAIXA_GRANDE)
+        if faixa is None:
+            # Faixa grande: as primeiras sugestões aparecem logo no começo da ordem de uso
+            sugestoes = []
+            for _, nome in self._ordem_uso():
+                if casa(nome):
+                    sugestoes.append(nome)
+                    if len(sugestoes) == limite:
+                        break
+            return sugestoes
+        candidatos = {nome for nome in faixa if casa(nome)}
+        return heapq.nsmallest(limite, candidatos, key=lambda nome: (-self.uso.get(nome, 0), nome))
+
+
+class ChavesOrdenadas:
+    """chave -> conjunto de nomes, com as chaves distintas em ordem para buscas por prefixo"""
+
+    def __init__(self):
+        self.nomes = {}   # chave -> set de nomes
+        self.chaves = []  # chaves distintas, em ordem
+
+    def incluir(self, chave, nome, ordenar=True):
+        """Com ordenar=False a chave nova só é acrescentada; chame ordenar() no fim"""
+        nomes = self.nomes.get(chave)
+        if nomes is None:
+            nomes = self.nomes[chave] = set()
+            if ordenar:
+                bisect.insort(self.chaves, chave)
+            else:
+                self.chaves.append(chave)
+        nomes.add(nome)
+
+    def ordenar(self):
+        self.chaves.sort()
+
+    def retirar(self, chave, nome):
+        nomes = self.nomes.get(chave)
+        if nomes is None:
+            return
+        nomes.discard(nome)
+        if not nomes:
+            del self.nomes[chave]
+            del self.chaves[bisect.bisect_left(self.chaves, chave)]
+
+    def com_prefixo(self, prefixo, maximo):
+        """Nomes das chaves que começam com o prefixo; None se passarem de `maximo`"""
+        inicio = bisect.bisect_left(self.chaves, prefixo)
+        fim = bisect.bisect_left(self.chaves, prefixo + "\uffff")
+        encontrados = []
+        for chave in self.chaves[inicio:fim]:
+            encontrados.extend(self.nomes[chave])
+            if len(encontrados) > maximo:
+                return None
+        return encontrados
@@ -0,0 +1,166 @@
+"""Lembretes de prazos e perícias próximos ("Prazo Alta vence amanhã").
+
+Os itens só têm data, então cada lembrete dispara às HORA_LEMBRETE de alguns
+dias antes do vencimento (ANTECEDENCIAS), e no próprio dia.  A
+AgendaLembretes guarda os disparos futuros num heap, montado uma vez a
+partir dos itens em aberto.  Como ouvinte do IndiceRegistros, cada inclusão
+empilha os disparos do item (O(log n)).  Cada remoção só invalida os
+disparos antigos, que são descartados quando chegam ao topo.  A interface
+mantém um único `after` apontado para `proximo()`.
+"""
+import datetime
+import functools
+import heapq
+import itertools
+
+from registros import Prioridade
+
+# Hora do dia em que os lembretes disparam
+HORA_LEMBRETE = datetime.time(8, 0)
+
+# Dias de antecedência dos lembretes (0 = no dia)
+ANTECEDENCIAS_PRAZO = {Prioridade.ALTA: (3, 1, 0), Prioridade.NORMAL: (1, 0),
+                       Prioridade.BAIXA: (0,)}
+ANTECEDENCIAS_PERICIA = (1, 0)
+# Dias à frente que precisam estar em memória para nenhum lembrete faltar
+ANTECEDENCIA_MAXIMA = max(max(dias) for dias in (*ANTECEDENCIAS_PRAZO.values(),
+                                                 ANTECEDENCIAS_PERICIA))
+
+# O heap é refeito quando mais da metade das entradas está invalidada
+MINIMO_COMPACTAR = 1000
+
+
+def quando_texto(dias):
+    if dias == 0:
+        return "hoje"
+    if dias == 1:
+        return "amanhã"
+    return f"em {dias} dias"
+
+
+def texto_lembrete(tipo, data_str, item, dias):
+    data = datetime.date.fromisoformat(data_str).strftime("%d/%m")
+    if tipo == 'prazo':
+        return (f"Prazo {item.prioridade.rotulo} vence {quando_texto(dias)} ({data}): "
+                f"{item.processo} | {item.perito_nome} | {item.descricao}")
+    return (f"Perícia {quando_texto(dias)} ({data}): "
+            f"{item.processo} | {item.perito_nome} | {item.local}")
+
+
+@functools.lru_cache(maxsize=4096)
+def horarios(data_str, antecedencias):
+    """[(horário, dias)] dos lembretes de um vencimento, do mais cedo para o mais tarde"""
+    try:
+        data = datetime.date.fromisoformat(data_str)
+    except ValueError:
+        return []
+    return sorted((datetime.datetime.combine(data - datetime.timedelta(days=dias), HORA_LEMBRETE), dias)
+                  for dias in antecedencias)
+
+
+class AgendaLembretes:
+    """Disparos futuros dos itens em aberto, em ordem de horário.
+
+    Cada entrada do heap é (horário, versão, dias, id).  A versão muda a cada
+    inclusão do item, então entradas de antes de uma remoção (ou edição) não
+    valem mais.  Um item que entra com disparos já passados (ao abrir o
+    programa, ou ao ser criado em cima da hora) ganha o mais recente deles,
+    que dispara na hora.  Um lembrete já exibido não volta por causa de uma
+    edição do item (que sai e volta ao índice); a memória dos exibidos de uma
+    data é descartada quando a data passa.
+    """
+
+    def __init__(self, relogio=datetime.datetime.now):
+        self.relogio = relogio
+        self.heap = []
+        self.versoes = itertools.count(1)
+        self.itens = {}        # id -> (tipo, data_str, item, versão)
+        self.entradas = {}     # id -> quantas entradas do heap são do item
+        self.obsoletas = 0     # Entradas invalidadas ainda no heap
+        self.exibidos = {}     # data_str -> {(id, dias)} já retirados
+
+    def _disparos(self, tipo, data_str, item, agora):
+        """[(horário, dias)] do item, do mais cedo para o mais tarde"""
+        if item.resolvido or data_str < agora.date().isoformat():
+            return []
+        if tipo == 'prazo':
+            antecedencias = ANTECEDENCIAS_PRAZO.get(item.prioridade, ANTECEDENCIAS_PERICIA)
+        else:
+            antecedencias = ANTECEDENCIAS_PERICIA
+        disparos = horarios(data_str, antecedencias)
+        if disparos and disparos[0][0] <= agora:
+            passados = [disparo for disparo in disparos if disparo[0] <= agora]
+            disparos = passados[-1:] + disparos[len(passados):]
+        exibidos = self.exibidos.get(data_str)
+        if not exibidos:
+            return disparos
+        return [(quando, dias) for quando, dias in disparos if (item.id, dias) not in exibidos]
+
+    def _entradas(self, tipo, data_str, item, agora):
+        versao = next(self.versoes)
+        disparos = self._disparos(tipo, data_str, item, agora)
+        if not disparos:
+            return []
+        self.itens[item.id] = (tipo, data_str, item, versao)
+        self.entradas[item.id] = len(disparos)
+        return [(quando, versao, dias, item.id) for quando, dias in disparos]
+
+    def carregar(self, registros):
+        """Monta o heap de uma vez a partir de (tipo, data_str, item)"""
+        agora = self.relogio()
+        for registro in registros:
+            self.heap.extend(self._entradas(*registro, agora))
+        heapq.heapify(self.heap)
+
+    def inserir(self, tipo, data_str, item):
+        for entrada in self._entradas(tipo, data_str, item, self.relogio()):
+            heapq.heappush(self.heap, entrada)
+
+    def remover(self, tipo, data_str, item):
+        if self.itens.pop(item.id, None) is None:
+            return
+        self.obsoletas += self.entradas.pop(item.id)
+        if self.obsoletas > len(self.heap) // 2 and len(self.heap) > MINIMO_COMPACTAR:
+            self.heap = [entrada for entrada in self.heap if self._valida(entrada)]
+            heapq.heapify(self.heap)
+            self.obsoletas = 0
+
+    def _valida(self, entrada):
+        registro = self.itens.get(entrada[3])
+        return registro is not None and registro[3] == entrada[1]
+
+    def _descartar_obsoletas(self):
+        while self.heap and not self._valida(self.heap[0]):
+            heapq.heappop(self.heap)
+            self.obsoletas -= 1
+
+    def proximo(self):
+        """Horário (datetime) do próximo lembrete, ou None"""
+        self._descartar_obsoletas()
+        return self.heap[0][0] if self.heap else None
+
+    def retirar_vencidos(self, agora=None):
+        """Textos dos lembretes com horário até agora, em ordem.
+
+        O texto conta os dias a partir de agora, não do horário do disparo (o
+        timer pode atrasar com o computador suspenso); lembretes de itens que
+        já venceram são descartados.
+        """
+        agora = agora or self.relogio()
+        textos = []
+        hoje = agora.date().isoformat()
+        for data_str in [data_str for data_str in self.exibidos if data_str < hoje]:
+            del self.exibidos[data_str]  # Itens dessas datas não entram mais na agenda
+        self._descartar_obsoletas()
+        while self.heap and self.heap[0][0] <= agora:
+            _, _, dias, id_item = heapq.heappop(self.heap)
+            tipo, data_str, item, _ = self.itens[id_item]
+            self.exibidos.setdefault(data_str, set()).add((id_item, dias))
+            faltam = (datetime.date.fromisoformat(data_str) - agora.date()).days
+            if faltam >= 0:
+                textos.append(texto_lembrete(tipo, data_str, item, faltam))
+            self.entradas[id_item] -= 1
+            if not self.entradas[id_item]:
+                del self.entradas[id_item], self.itens[id_item]
+            self._descartar_obsoletas()
+        return textos
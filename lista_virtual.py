@@ -0,0 +1,177 @@
+"""Lista de resultados virtualizada sobre ttk.Treeview.
+
+As linhas ficam numa lista Python e o Treeview só tem um item para cada
+linha visível.  Ao rolar, esses poucos itens são reescritos com o conteúdo
+da nova janela de linhas, então o custo de desenhar não depende do tamanho
+do resultado.  As cores vêm de tags configuradas uma única vez.
+"""
+import tkinter as tk
+from tkinter import ttk
+
+# Altura (px) usada quando o tema não informa a altura da linha do Treeview
+ALTURA_LINHA_PADRAO = 20
+# Altura (px) estimada do cabeçalho antes de haver linhas para medir
+ALTURA_CABECALHO_PADRAO = 25
+# Linhas roladas por passo da roda do mouse
+LINHAS_POR_ROLAGEM = 3
+# Bits de event.state de Shift e Control (clique que acrescenta à seleção)
+MODIFICADORES_SELECAO = 0x0001 | 0x0004
+
+
+class ListaVirtual(ttk.Frame):
+    """Treeview com rolagem virtual.
+
+    `colunas` é uma sequência de (nome, título, largura).  `definir_linhas`
+    recebe as linhas (objetos quaisquer) e uma função que transforma uma
+    linha em (valores, tag); ela só é chamada para as linhas visíveis.
+    """
+
+    def __init__(self, master, colunas, tags=None, selectmode="browse", **kwargs):
+        super().__init__(master, **kwargs)
+        nomes = [nome for nome, _, _ in colunas]
+        self.tree = ttk.Treeview(self, columns=nomes, show="headings",
+                                 selectmode=selectmode, height=1)
+        for nome, titulo, largura in colunas:
+            self.tree.heading(nome, text=titulo, anchor=tk.W)
+            self.tree.column(nome, width=largura, anchor=tk.W, stretch=(nome == nomes[-1]))
+        for tag, opcoes in (tags or {}).items():
+            self.tree.tag_configure(tag, **opcoes)
+
+        self.scroll = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.rolar)
+        self.scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.pack(fill="both", expand=True)
+
+        self.colunas = nomes
+        self.linhas = []
+        self.formatar = None
+        self.aviso = ""
+        self.inicio = 0            # Índice da primeira linha visível
+        self.visiveis = 1          # Quantas linhas cabem na área do Treeview
+        self.itens = []            # iids do Treeview, um por linha visível
+        self.selecionadas = set()  # Índices (em self.linhas) selecionados
+        self.selecao_desenhada = ()
+        self.acrescentar = False   # Último clique com Shift/Ctrl
+
+        altura = ttk.Style().lookup("Treeview", "rowheight")
+        self.altura_linha = int(altura) if altura else ALTURA_LINHA_PADRAO
+
+        self.tree.bind("<Configure>", self._redimensionar)
+        self.tree.bind("<<TreeviewSelect>>", self._selecionou)
+        self.tree.bind("<ButtonPress-1>", self._clicou)
+        self.tree.bind("<MouseWheel>", lambda e: self.rolar(
+            "scroll", -LINHAS_POR_ROLAGEM if e.delta > 0 else LINHAS_POR_ROLAGEM, "units"))
+        self.tree.bind("<Button-4>", lambda e: self.rolar("scroll", -LINHAS_POR_ROLAGEM, "units"))
+        self.tree.bind("<Button-5>", lambda e: self.rolar("scroll", LINHAS_POR_ROLAGEM, "units"))
+        self.tree.bind("<Up>", lambda e: self._mover_selecao(-1))
+        self.tree.bind("<Down>", lambda e: self._mover_selecao(1))
+        self.tree.bind("<Prior>", lambda e: self._mover_selecao(-self.visiveis))
+        self.tree.bind("<Next>", lambda e: self._mover_selecao(self.visiveis))
+        if selectmode == "extended":
+            self.tree.bind("<Control-a>", lambda e: self.selecionar_todas())
+
+    def definir_linhas(self, linhas, formatar, aviso=""):
+        """Troca o conteúdo da lista; `aviso` é exibido quando não há linhas"""
+        self.linhas = linhas
+        self.formatar = formatar
+        self.aviso = aviso
+        self.inicio = 0
+        self.selecionadas = set()
+        self._desenhar()
+
+    def linha_em(self, y, selecionar=False):
+        """Retorna a linha sob a coordenada y (None para área vazia ou aviso)"""
+        iid = self.tree.identify_row(y)
+        if not iid or not self.linhas or iid not in self.itens:
+            return None
+        indice = self.inicio + self.itens.index(iid)
+        if selecionar and indice not in self.selecionadas:
+            self.selecionadas = {indice}
+            self._desenhar()
+        return self.linhas[indice]
+
+    def linhas_selecionadas(self):
+        return [self.linhas[i] for i in sorted(self.selecionadas) if i < len(self.linhas)]
+
+    def selecionar_todas(self):
+        self.selecionadas = set(range(len(self.linhas)))
+        self._desenhar()
+        return "break"
+
+    def rolar(self, acao, quantidade=0, unidade="units"):
+        """Comando da barra de rolagem (moveto/scroll), como o yview dos widgets Tk"""
+        if acao == "moveto":
+            self.inicio = int(float(quantidade) * len(self.linhas))
+        elif acao == "scroll":
+            passo = self.visiveis if unidade == "pages" else 1
+            self.inicio += int(quantidade) * passo
+        self._desenhar()
+
+    def _redimensionar(self, event):
+        cabecalho = ALTURA_CABECALHO_PADRAO
+        if self.itens:
+            caixa = self.tree.bbox(self.itens[0])
+            if caixa:
+                cabecalho = caixa[1]
+        visiveis = max(1, (event.height - cabecalho) // self.altura_linha)
+        if visiveis != self.visiveis:
+            self.visiveis = visiveis
+            self._desenhar()
+
+    def _desenhar(self):
+        total = len(self.linhas)
+        self.inicio = max(0, min(self.inicio, total - self.visiveis))
+        quantidade = max(1, min(self.visiveis, total - self.inicio))
+
+        while len(self.itens) < quantidade:
+            self.itens.append(self.tree.insert("", tk.END))
+        while len(self.itens) > quantidade:
+            self.tree.delete(self.itens.pop())
+
+        if not self.linhas:
+            valores = [""] * len(self.colunas)
+            valores[-1] = self.aviso
+            self.tree.item(self.itens[0], values=valores, tags=("aviso",))
+        else:
+            for posicao, iid in enumerate(self.itens):
+                valores, tag = self.formatar(self.linhas[self.inicio + posicao])
+                self.tree.item(iid, values=valores, tags=(tag,))
+
+        self.selecao_desenhada = tuple(
+            iid for posicao, iid in enumerate(self.itens)
+            if self.linhas and self.inicio + posicao in self.selecionadas)
+        self.tree.selection_set(self.selecao_desenhada)
+
+        if total:
+            self.scroll.set(self.inicio / total, (self.inicio + quantidade) / total)
+        else:
+            self.scroll.set(0, 1)
+
+    def _selecionou(self, event=None):
+        atual = self.tree.selection()
+        if atual == self.selecao_desenhada or not self.linhas:
+            return  # Seleção aplicada pelo próprio _desenhar
+        if self.acrescentar:
+            # Mantém as linhas selecionadas que estão fora da janela visível
+            visiveis = set(range(self.inicio, self.inicio + len(self.itens)))
+            self.selecionadas = {i for i in self.selecionadas if i not in visiveis}
+        else:
+            self.selecionadas = set()
+        self.selecionadas.update(self.inicio + self.itens.index(iid) for iid in atual)
+        self.selecao_desenhada = atual
+
+    def _clicou(self, event):
+        self.acrescentar = bool(event.state & MODIFICADORES_SELECAO)
+
+    def _mover_selecao(self, passo):
+        if not self.linhas:
+            return "break"
+        atual = max(self.selecionadas) if self.selecionadas else self.inicio - 1
+        destino = max(0, min(len(self.linhas) - 1, atual + passo))
+        self.selecionadas = {destino}
+        if destino < self.inicio:
+            self.inicio = destino
+        elif destino >= self.inicio + self.visiveis:
+            self.inicio = destino - self.visiveis + 1
+        self._desenhar()
+        self.tree.focus(self.itens[destino - self.inicio])
+        return "break"
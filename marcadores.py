@@ -0,0 +1,101 @@
+"""Marcadores do calendário principal: dias com prazos e perícias.
+
+Só o mês exibido é acompanhado.  Ao trocar de mês, MarcadoresCalendario
+conta os itens do mês pelo índice de datas.  Depois disso, como ouvinte do
+IndiceRegistros, ajusta apenas a contagem do dia afetado por cada mutação.
+A interface retira as alterações (`retirar_alteracoes`) e refaz os eventos
+do tkcalendar só desses dias.
+"""
+import calendar
+import datetime
+
+from registros import TIPOS
+
+# Estado do dia -> cores no calendário (tag do calevent)
+CORES_MARCADORES = {
+    'atrasado': {'background': '#d9534f', 'foreground': 'white'},
+    'pendente': {'background': '#f0ad4e', 'foreground': 'black'},
+    'concluido': {'background': '#5cb85c', 'foreground': 'white'},
+}
+
+
+def estado_do_dia(data_str, pendentes, concluidos, hoje_str):
+    if pendentes:
+        return 'atrasado' if data_str < hoje_str else 'pendente'
+    if concluidos:
+        return 'concluido'
+    return None
+
+
+def texto_marcador(pendentes, concluidos):
+    """Texto da dica exibida ao passar o mouse sobre o dia"""
+    partes = []
+    if pendentes:
+        partes.append(f"{pendentes} pendente(s)")
+    if concluidos:
+        partes.append(f"{concluidos} concluído(s)")
+    return ", ".join(partes)
+
+
+class MarcadoresCalendario:
+    """Contagem de pendentes e concluídos por dia do mês exibido.
+
+    `consultar(tipo, inicio, fim)` lista (data_str, item) do período.
+    As alterações são {data_str: (estado, pendentes, concluídos) ou None}.
+    Quando `refazer` é verdadeiro, os marcadores anteriores devem ser todos
+    apagados (troca de mês).
+    """
+
+    def __init__(self, consultar, hoje=None):
+        self.consultar = consultar
+        self.hoje_str = (hoje or datetime.date.today()).isoformat()
+        self.inicio_str = self.fim_str = None
+        self.contagens = {}   # data_str -> [pendentes, concluídos]
+        self.alterados = {}
+        self.refazer = False
+
+    def exibir_mes(self, ano, mes):
+        """Recalcula os marcadores para o mês exibido"""
+        inicio = datetime.date(ano, mes, 1)
+        fim = inicio.replace(day=calendar.monthrange(ano, mes)[1])
+        self.inicio_str, self.fim_str = inicio.isoformat(), fim.isoformat()
+        self.contagens = {}
+        for tipo in TIPOS:
+            for data_str, item in self.consultar(tipo, inicio, fim):
+                contagem = self.contagens.setdefault(data_str, [0, 0])
+                contagem[1 if item.resolvido else 0] += 1
+        self.refazer = True
+        self.alterados = {data_str: self._marcador(data_str) for data_str in self.contagens}
+
+    def definir_hoje(self, hoje):
+        """Na virada do dia, pendentes de dias que ficaram para trás viram atrasados"""
+        anterior, self.hoje_str = self.hoje_str, hoje.isoformat()
+        menor, maior = sorted((anterior, self.hoje_str))
+        for data_str, (pendentes, _) in self.contagens.items():
+            if pendentes and menor <= data_str < maior:
+                self.alterados[data_str] = self._marcador(data_str)
+
+    def retirar_alteracoes(self):
+        refazer, alterados = self.refazer, self.alterados
+        self.refazer, self.alterados = False, {}
+        return refazer, alterados
+
+    def _marcador(self, data_str):
+        pendentes, concluidos = self.contagens.get(data_str, (0, 0))
+        estado = estado_do_dia(data_str, pendentes, concluidos, self.hoje_str)
+        return (estado, pendentes, concluidos) if estado else None
+
+    def _ajustar(self, tipo, data_str, item, delta):
+        if self.inicio_str is None or not self.inicio_str <= data_str <= self.fim_str:
+            return
+        contagem = self.contagens.setdefault(data_str, [0, 0])
+        contagem[1 if item.resolvido else 0] += delta
+        if contagem == [0, 0]:
+            del self.contagens[data_str]
+        self.alterados[data_str] = self._marcador(data_str)
+
+    def inserir(self, tipo, data_str, item):
+        self._ajustar(tipo, data_str, item, 1)
+
+    def remover(self, tipo, data_str, item):
+        self._ajustar(tipo, data_str, item, -1)
@@ -0,0 +1,571 @@
+"""Núcleo do CPERICIAS, sem interface gráfica.
+
+O Repositorio reúne os dados (prazos, perícias e peritos), o armazenamento
+configurado, os índices em memória, as consultas e todas as alterações com
+suas validações.  A janela Tk (CPERICIAS_FINAL_COMPLETO.py) e a linha de
+comando (cpericias_cli.py) usam as mesmas regras.
+
+Os registros são objetos de registros.py (Prazo, Pericia, Perito).
+
+Erros de validação são levantados como ValueError com a mensagem que deve
+ser mostrada ao usuário.
+
+Toda alteração pode ser desfeita e refeita (`desfazer`/`refazer`); ver
+historico.py.
+"""
+import contextlib
+import datetime
+import functools
+import os
+import re
+
+from armazenamento import GravadorAssincrono, criar_armazenamento
+from colunas import ColunasRegistros
+from diagnostico import medidor
+from dias_uteis import CalendarioForense
+from historico import Historico
+from indices import (IndiceAbertos, IndiceDatas, IndiceDuplicados, IndicePeritos, IndiceProcessos,
+                     IndiceRegistros, LIMITE_SUGESTOES, garantir_ids, novo_id)
+from registros import TIPOS, Pericia, Perito, Prazo, Prioridade
+
+PRIORIDADES = tuple(prioridade.rotulo for prioridade in Prioridade)
+
+# Mensagem quando o processo já tem um item do mesmo tipo na data
+MENSAGEM_DUPLICADO = {'prazo': "Prazo já cadastrado para {}!",
+                      'pericia': "Perícia já cadastrada para {}!"}
+
+PADRAO_PROCESSO = re.compile(r'^\d{7}-\d{2}\.\d{4}\.\d\.\d{2}\.\d{4}$')
+
+
+def formatar_cpf(cpf):
+    """Formata o CPF para o padrão 000.000.000-00 (None se não tiver 11 dígitos)"""
+    cpf = re.sub(r'\D', '', cpf)
+    if len(cpf) != 11:
+        return None
+    return f"{cpf[:3]}.{cpf[3:6]}.{cpf[6:9]}-{cpf[9:11]}"
+
+
+def validar_processo(processo):
+    """Valida o formato do número do processo"""
+    return PADRAO_PROCESSO.match(processo) is not None
+
+
+def validar_dias_uteis(dias):
+    """Quantidade de dias úteis (texto da tela ou número) -> int, ou ValueError"""
+    try:
+        dias = int(dias)
+    except (TypeError, ValueError):
+        dias = 0
+    if dias < 1:
+        raise ValueError("Dias úteis deve ser um número inteiro maior que zero!")
+    return dias
+
+
+def hoje_ordinal():
+    return datetime.date.today().toordinal()
+
+
+def alteracao(metodo):
+    """Roda o método num `lote`: uma gravação por arquivo e um passo no histórico"""
+    @functools.wraps(metodo)
+    def executar(self, *args, **kwargs):
+        with self.lote():
+            return metodo(self, *args, **kwargs)
+    return executar
+
+
+class Repositorio:
+    """Dados, índices e regras do sistema.
+
+    Com `assincrono` as gravações passam pelo GravadorAssincrono (a janela
+    e os lotes da linha de comando); sem ele cada alteração grava na hora.
+    """
+
+    def __init__(self, base_dir, modo="json", assincrono=True):
+        self.prazos_file = os.path.join(base_dir, "prazos.json")
+        self.peritos_file = os.path.join(base_dir, "peritos.json")
+        self.pericias_file = os.path.join(base_dir, "pericias.json")
+        # Feriados locais e recessos para a contagem em dias úteis (opcional)
+        self.feriados_file = os.path.join(base_dir, "feriados.json")
+        self.calendario = None
+
+        self.armazenamento = criar_armazenamento(modo, base_dir)
+        self.gravador = GravadorAssincrono(self.armazenamento) if assincrono else None
+        self.alteracoes = 0  # Alterações feitas; serve para invalidar caches de consultas
+        self.pendentes_lote = None  # file -> [data, chaves] enquanto um `lote` está aberto
+        self.passo = None           # Inversas das operações do lote aberto
+        self.historico = Historico()
+
+        self.prazos = {}
+        self.peritos = {}
+        self.pericias = {}
+        # Arquivo e dicionário de cada tipo de item
+        self.dados = {'prazo': (self.prazos_file, self.prazos),
+                      'pericia': (self.pericias_file, self.pericias)}
+
+        # id -> (tipo, data, item) de todos os prazos e perícias carregados
+        self.indice = IndiceRegistros()
+        # Datas com itens, em ordem, para as visões por intervalo
+        self.indice_datas = IndiceDatas()
+        self.indice.ouvintes.append(self.indice_datas)
+        # Prazos e perícias em aberto, em ordem de data, para atrasados e pendentes
+        self.indice_abertos = IndiceAbertos()
+        self.indice.ouvintes.append(self.indice_abertos)
+        # (tipo, data, processo) de todos os itens, para a checagem de duplicidade
+        self.indice_duplicados = IndiceDuplicados()
+        self.indice.ouvintes.append(self.indice_duplicados)
+        # Números de processo (só dígitos) em n-gramas, para a busca
+        self.indice_processos = IndiceProcessos()
+        self.indice.ouvintes.append(self.indice_processos)
+        # Nomes e CPFs dos peritos para o autocompletar, com o uso mais recente
+        self.indice_peritos = IndicePeritos()
+        self.indice.ouvintes.append(self.indice_peritos)
+        # CPF formatado -> nome do perito
+        self.peritos_por_cpf = {}
+        # Data, tipo, status, prioridade e perito em colunas, para filtros e contagens
+        self.colunas = ColunasRegistros(self.indice)
+        self.indice.ouvintes.append(self.colunas)
+
+    # Persistência
+
+    @medidor.medir("carregar_dados")
+    def carregar_dados(self, file):
+        """Carrega dados de um arquivo JSON (snapshot + diário, se houver)"""
+        return self.armazenamento.carregar(file)
+
+    @medidor.medir("salvar_dados")
+    def salvar_dados(self, file, data, chaves=None):
+        """Grava um arquivo (em segundo plano, se houver gravador)
+
+        `chaves` lista as datas (ou nomes de peritos) alteradas; sem ela o
+        arquivo é gravado por inteiro.
+        """
+        self.alteracoes += 1
+        if self.pendentes_lote is not None:
+            pendente = self.pendentes_lote.setdefault(file, [data, set()])
+            if chaves is None or pendente[1] is None:
+                pendente[1] = None
+            else:
+                pendente[1].update(chaves)
+            return
+        if self.gravador is not None:
+            self.gravador.agendar(file, data, chaves)
+        else:
+            self.armazenamento.salvar(file, data, chaves)
+
+    @contextlib.contextmanager
+    def lote(self, historico=True):
+        """Junta as gravações das alterações do bloco em uma só por arquivo, na saída
+
+        Com `historico` as alterações do bloco viram um passo de desfazer.
+        """
+        if self.pendentes_lote is not None:
+            yield  # Já dentro de um lote: grava no fim do mais externo
+            return
+        self.pendentes_lote = {}
+        self.passo = [] if historico else None
+        try:
+            yield
+        finally:
+            pendentes, self.pendentes_lote = self.pendentes_lote, None
+            passo, self.passo = self.passo, None
+            if passo:
+                self.historico.registrar(passo)
+            for file, (data, chaves) in pendentes.items():
+                self.salvar_dados(file, data, None if chaves is None else sorted(chaves))
+
+    def carregar(self):
+        """Lê os três arquivos e monta os índices; retorna [(file, erro)] das falhas"""
+        erros = []
+        for file, data in ((self.prazos_file, self.prazos),
+                           (self.peritos_file, self.peritos),
+                           (self.pericias_file, self.pericias)):
+            try:
+                data.update(self.carregar_dados(file))
+            except Exception as e:
+                erros.append((file, e))
+        self.indice_peritos.carregar(self.peritos.values())
+        self.peritos_por_cpf = {perito.cpf: nome for nome, perito in self.peritos.items()}
+        self.indexar_datas('prazo', list(self.prazos))
+        self.indexar_datas('pericia', list(self.pericias))
+        return erros
+
+    def descarregar(self):
+        """Grava agora as alterações pendentes"""
+        if self.gravador is not None:
+            self.gravador.descarregar()
+
+    def fechar(self):
+        """Grava o que estiver pendente e fecha o armazenamento"""
+        if self.gravador is not None:
+            self.gravador.fechar()
+        else:
+            self.armazenamento.fechar()
+
+    def indexar_datas(self, tipo, chaves):
+        """Atribui ids aos itens das datas informadas e os inclui no índice"""
+        file, data = self.dados[tipo]
+        sem_id = garantir_ids(data, chaves)
+        if sem_id:
+            self.salvar_dados(file, data, sem_id)
+        for data_str in chaves:
+            for item in data[data_str]:
+                self.indice.inserir(tipo, data_str, item)
+
+    def garantir(self, tipo, inicio=None, fim=None):
+        """Lê do disco as datas ainda não carregadas (modo mensal) e as indexa"""
+        file, data = self.dados[tipo]
+        novas = self.armazenamento.garantir(file, data, inicio, fim)
+        if novas:
+            self.indexar_datas(tipo, novas)
+
+    def garantir_periodo(self, inicio=None, fim=None):
+        """Carrega os meses de prazos e perícias entre inicio e fim (todos, se None)"""
+        for tipo in TIPOS:
+            self.garantir(tipo, inicio, fim)
+
+    # Consultas
+
+    def periodo(self, tipo, inicio, fim):
+        """Lista (data_str, item) do tipo entre inicio e fim, em ordem de data"""
+        _, data = self.dados[tipo]
+        self.garantir(tipo, inicio, fim)
+        return [(data_str, item)
+                for data_str in self.indice_datas.datas(tipo, inicio, fim)
+                for item in data.get(data_str, [])]
+
+    def buscar(self, tipo, termo):
+        """Lista (data_str, item) cujo processo contém o termo, mais recentes primeiro"""
+        self.garantir(tipo)
+        return self.indice_processos.buscar(tipo, termo)
+
+    def filtrar(self, inicio=None, fim=None, **filtros):
+        """Lista (tipo, data_str, item) que casam com os filtros, em ordem de data
+
+        Além de inicio e fim (datetime.date, inclusive), aceita tipo,
+        resolvido, prioridade e perito; ver ColunasRegistros.
+        """
+        self.garantir_periodo(inicio, fim)
+        registros = [self.indice.obter(id_item)
+                     for id_item in self.colunas.filtrar(inicio=inicio, fim=fim, **filtros)]
+        registros.sort(key=lambda registro: registro[1])
+        return registros
+
+    def contar(self, inicio=None, fim=None, **filtros):
+        """Quantos registros casam com os filtros (os mesmos de `filtrar`)"""
+        self.garantir_periodo(inicio, fim)
+        return self.colunas.contar(inicio=inicio, fim=fim, **filtros)
+
+    def contar_por(self, coluna, inicio=None, fim=None, **filtros):
+        """{perito ou prioridade: quantidade} dos registros que casam com os filtros"""
+        self.garantir_periodo(inicio, fim)
+        return self.colunas.contar_por(coluna, inicio=inicio, fim=fim, **filtros)
+
+    def garantir_abertos(self, hoje, atrasados):
+        """Lê do disco (modo mensal) só os meses com itens em aberto antes de
+        hoje (atrasados) ou de hoje em diante (pendentes)"""
+        hoje_str = hoje.isoformat()
+        for tipo in TIPOS:
+            file, _ = self.dados[tipo]
+            meses = {data_str[:7] for data_str in self.armazenamento.abertos_em_disco(file)
+                     if (data_str < hoje_str) == atrasados}
+            for mes in sorted(meses):
+                primeiro = datetime.date.fromisoformat(mes + "-01")
+                self.garantir(tipo, primeiro, primeiro)
+
+    def atrasados(self, hoje=None):
+        """Lista (tipo, data_str, item) em aberto de datas anteriores a hoje, em ordem de data"""
+        hoje = hoje or datetime.date.today()
+        self.garantir_abertos(hoje, atrasados=True)
+        return self.indice_abertos.atrasados(hoje)
+
+    def pendentes(self, hoje=None, ler_disco=True):
+        """Lista (tipo, data_str, item) em aberto de hoje em diante, em ordem de data
+
+        Com `ler_disco` False (modo mensal) ficam só os itens dos meses já em memória.
+        """
+        hoje = hoje or datetime.date.today()
+        if ler_disco:
+            self.garantir_abertos(hoje, atrasados=False)
+        return self.indice_abertos.pendentes(hoje)
+
+    def contar_abertos(self, hoje=None):
+        """(atrasados, pendentes) entre os prazos e perícias em aberto
+
+        Os meses ainda não lidos (modo mensal) entram pelo resumo gravado ao
+        lado deles, sem serem carregados.
+        """
+        hoje = hoje or datetime.date.today()
+        atrasados, pendentes = self.indice_abertos.contar(hoje)
+        hoje_str = hoje.isoformat()
+        for file, _ in self.dados.values():
+            for data_str, quantidade in self.armazenamento.abertos_em_disco(file).items():
+                if data_str < hoje_str:
+                    atrasados += quantidade
+                else:
+                    pendentes += quantidade
+        return atrasados, pendentes
+
+    def calendario_forense(self):
+        """CalendarioForense com os feriados de feriados.json (lido no primeiro uso)"""
+        if self.calendario is None:
+            self.calendario = CalendarioForense.de_arquivo(self.feriados_file)
+        return self.calendario
+
+    def vencimentos(self, inicios, dias_uteis):
+        """Vencimentos de prazos de `dias_uteis` dias úteis a partir das datas (intimações)
+
+        `dias_uteis` é um número só ou um por data.
+        """
+        return self.calendario_forense().somar_lote(inicios, dias_uteis)
+
+    def sugerir_peritos(self, termo, limite=LIMITE_SUGESTOES):
+        """Nomes de peritos para o trecho digitado (nome sem acento ou CPF)"""
+        return self.indice_peritos.sugerir(termo, limite)
+
+    def obter(self, id_item):
+        """Retorna (tipo, data_str, item) ou levanta ValueError"""
+        registro = self.indice.obter(id_item)
+        if registro is None:
+            raise ValueError(f"Item não encontrado: {id_item}")
+        return registro
+
+    # Alterações
+
+    @alteracao
+    def cadastrar_perito(self, nome, cpf, telefone, profissao):
+        nome = nome.strip()
+        cpf = formatar_cpf(cpf)
+        telefone = telefone.strip()
+        profissao = profissao.strip()
+
+        if not nome: raise ValueError("Nome é obrigatório!")
+        if not cpf: raise ValueError("CPF inválido! Deve conter 11 dígitos.")
+        if cpf in self.peritos_por_cpf:
+            raise ValueError("CPF já cadastrado!")
+        if not telefone: raise ValueError("Telefone é obrigatório!")
+        if not profissao: raise ValueError("Profissão é obrigatória!")
+
+        perito = Perito(nome=nome, cpf=cpf, telefone=telefone, profissao=profissao,
+                        data_cadastro=hoje_ordinal())
+        # Mesmo nome: o cadastro novo substitui o anterior
+        self._op_perito(nome, perito)
+        return perito
+
+    @alteracao
+    def adicionar_prazo(self, data, processo, perito, descricao, prioridade="Normal",
+                        dias_uteis=None):
+        """Cria um prazo na data (datetime.date) e o retorna
+
+        Com `dias_uteis`, `data` é a data da intimação e o prazo vence depois
+        desse número de dias úteis.
+        """
+        processo = processo.strip()
+        descricao = descricao.strip()
+        if not validar_processo(processo):
+            raise ValueError("Número do processo inválido!")
+        if not perito: raise ValueError("Selecione um perito!")
+        if not descricao: raise ValueError("Descrição é obrigatória!")
+        prioridade = Prioridade.de_texto(prioridade)
+        if prioridade is None: raise ValueError("Prioridade inválida! Use Baixa, Normal ou Alta.")
+        if dias_uteis is not None:
+            data = self.vencimentos([data], validar_dias_uteis(dias_uteis))[0]
+
+        return self._incluir('prazo', data, Prazo(
+            id=novo_id(), processo=processo, perito_nome=perito, descricao=descricao,
+            prioridade=prioridade, concluido=False, data_cadastro=hoje_ordinal()))
+
+    @alteracao
+    def adicionar_pericia(self, data, processo, perito, especialidade, local, observacoes=""):
+        """Agenda uma perícia na data (datetime.date) e a retorna"""
+        processo = processo.strip()
+        especialidade = especialidade.strip()
+        local = local.strip()
+        observacoes = (observacoes or "").strip()
+        if not validar_processo(processo):
+            raise ValueError("Número do processo inválido!")
+        if not perito: raise ValueError("Selecione um perito!")
+        if not especialidade: raise ValueError("Especialidade é obrigatória!")
+        if not local: raise ValueError("Local é obrigatório!")
+
+        return self._incluir('pericia', data, Pericia(
+            id=novo_id(), processo=processo, perito_nome=perito, especialidade=especialidade,
+            local=local, observacoes=observacoes, realizada=False, data_cadastro=hoje_ordinal()))
+
+    def _checar_duplicado(self, tipo, data_str, processo):
+        if self.indice_duplicados.existe(tipo, data_str, processo):
+            raise ValueError(MENSAGEM_DUPLICADO[tipo].format(data_str))
+
+    def _incluir(self, tipo, data, item):
+        self.garantir(tipo, data, data)
+        data_str = data.strftime("%Y-%m-%d")
+        self._checar_duplicado(tipo, data_str, item.processo)
+        self._op_incluir(tipo, data_str, item)
+        return item
+
+    @alteracao
+    def concluir(self, id_item):
+        """Marca o prazo como concluído (ou a perícia como realizada)"""
+        _, _, item = self.obter(id_item)
+        self._op_campos(id_item, {"resolvido": True}, item.extras)
+        return item
+
+    @alteracao
+    def apagar(self, id_item):
+        # Remove só este registro, mesmo que outro item do dia tenha o mesmo processo
+        _, _, item = self.obter(id_item)
+        self._op_retirar(id_item)
+        return item
+
+    @alteracao
+    def reagendar(self, id_item, nova_data):
+        """Move o item para nova_data (datetime.date)"""
+        tipo, data_str, item = self.obter(id_item)
+        self.garantir(tipo, nova_data, nova_data)
+        nova_data_str = nova_data.strftime("%Y-%m-%d")
+        if nova_data_str == data_str:
+            return item
+        self._checar_duplicado(tipo, nova_data_str, item.processo)
+        self._op_mover(id_item, nova_data_str)
+        return item
+
+    @alteracao
+    def editar(self, id_item, campos):
+        """Atualiza os campos informados do item (textos como os da tela)"""
+        tipo, data_str, item = self.obter(id_item)
+        novos = item.converter(campos)
+        processo = novos.get("processo", item.processo)
+        if processo != item.processo:
+            self._checar_duplicado(tipo, data_str, processo)
+        # O valor editado substitui o valor fora do padrão guardado em extras
+        extras = {campo: valor for campo, valor in (item.extras or {}).items()
+                  if campo not in novos} or None
+        self._op_campos(id_item, novos, extras)
+        return item
+
+    # Operações elementares: cada uma grava o que mudou e devolve (e registra
+    # no passo do lote aberto) a operação que a desfaz
+
+    def _registrar(self, inversa):
+        if self.passo is not None:
+            self.passo.append(inversa)
+        return inversa
+
+    def _op_incluir(self, tipo, data_str, item, posicao=None):
+        """Põe o item na data, no fim do dia ou na posição dada"""
+        file, dados = self.dados[tipo]
+        itens = dados.setdefault(data_str, [])
+        itens.insert(len(itens) if posicao is None else posicao, item)
+        self.indice.inserir(tipo, data_str, item)
+        self.salvar_dados(file, dados, [data_str])
+        return self._registrar(("retirar", item.id))
+
+    def _op_retirar(self, id_item):
+        tipo, data_str, item = self.obter(id_item)
+        file, dados = self.dados[tipo]
+        itens = dados[data_str]
+        posicao = next(i for i, p in enumerate(itens) if p is item)
+        dados[data_str] = itens[:posicao] + itens[posicao + 1:]
+        self.indice.remover(id_item)
+        self.salvar_dados(file, dados, [data_str])
+        return self._registrar(("incluir", tipo, data_str, item, posicao))
+
+    def _op_mover(self, id_item, nova_data_str, posicao=None):
+        """Leva o item para outra data, no fim do dia ou na posição dada"""
+        tipo, data_str, item = self.obter(id_item)
+        file, dados = self.dados[tipo]
+        itens = dados[data_str]
+        anterior = next(i for i, p in enumerate(itens) if p is item)
+        dados[data_str] = itens[:anterior] + itens[anterior + 1:]
+        novos = dados.setdefault(nova_data_str, [])
+        novos.insert(len(novos) if posicao is None else posicao, item)
+        self.indice.mover(id_item, nova_data_str)
+        self.salvar_dados(file, dados, [data_str, nova_data_str])
+        return self._registrar(("mover", id_item, data_str, anterior))
+
+    def _op_campos(self, id_item, valores, extras):
+        """Troca campos do item (valores já convertidos) e os extras"""
+        tipo, data_str, item = self.obter(id_item)
+        inversa = ("campos", id_item, {campo: getattr(item, campo) for campo in valores},
+                   dict(item.extras) if item.extras else None)
+        # Sai e volta aos índices para que os ouvintes vejam os valores novos
+        self.indice.remover(id_item)
+        for campo, valor in valores.items():
+            setattr(item, campo, valor)
+        item.extras = extras
+        self.indice.inserir(tipo, data_str, item)
+        file, dados = self.dados[tipo]
+        self.salvar_dados(file, dados, [data_str])
+        return self._registrar(inversa)
+
+    def _op_perito(self, nome, perito):
+        """Põe o cadastro do perito com esse nome (ou o tira, com None)"""
+        anterior = self.peritos.pop(nome, None)
+        if anterior is not None:
+            self.peritos_por_cpf.pop(anterior.cpf, None)
+            self.indice_peritos.retirar(nome)
+        if perito is not None:
+            self.peritos[nome] = perito
+            self.peritos_por_cpf[perito.cpf] = nome
+            self.indice_peritos.incluir(perito)
+        self.salvar_dados(self.peritos_file, self.peritos, [nome])
+        return self._registrar(("perito", nome, anterior))
+
+    # Desfazer e refazer
+
+    def desfazer(self):
+        """Desfaz o último passo; False se não houver o que desfazer"""
+        if not self.historico.desfazer:
+            return False
+        # O passo só sai da pilha depois de aplicado: se falhar, continua lá
+        self.historico.refazer.append(self._reverter(self.historico.desfazer[-1]))
+        self.historico.desfazer.pop()
+        return True
+
+    def refazer(self):
+        """Refaz o último passo desfeito; False se não houver"""
+        if not self.historico.refazer:
+            return False
+        self.historico.desfazer.append(self._reverter(self.historico.refazer[-1]))
+        self.historico.refazer.pop()
+        return True
+
+    def _reverter(self, passo):
+        """Aplica as operações do passo, da última para a primeira; retorna as inversas
+
+        Se uma operação falhar, as já aplicadas são desfeitas antes de repassar
+        o erro, e os dados ficam como estavam antes do passo.
+        """
+        inversas = []
+        with self.lote(historico=False):
+            try:
+                for operacao in reversed(passo):
+                    inversas.append(getattr(self, "_op_" + operacao[0])(*operacao[1:]))
+            except Exception:
+                for inversa in reversed(inversas):
+                    getattr(self, "_op_" + inversa[0])(*inversa[1:])
+                raise
+        return inversas
+
+    # Alterações em lote: tudo na memória e uma gravação por arquivo no fim
+
+    def _varios(self, acao, ids, *args):
+        """Aplica a ação a cada id; retorna as mensagens dos itens que falharam"""
+        erros = []
+        with self.lote():
+            for id_item in ids:
+                try:
+                    acao(id_item, *args)
+                except ValueError as e:
+                    registro = self.indice.obter(id_item)
+                    erros.append(f"{registro[2].processo}: {e}" if registro else str(e))
+        return erros
+
+    def concluir_varios(self, ids):
+        return self._varios(self.concluir, ids)
+
+    def apagar_varios(self, ids):
+        return self._varios(self.apagar, ids)
+
+    def reagendar_varios(self, ids, nova_data):
+        return self._varios(self.reagendar, ids, nova_data)
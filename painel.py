@@ -0,0 +1,108 @@
+"""Modelo incremental do painel "Perícias Marcadas (Próximos 30 dias)".
+
+O PainelPericias mantém em ordem as perícias de hoje até hoje + DIAS_PAINEL,
+uma por linha.  Ele é ouvinte do IndiceRegistros, então inclusões,
+remoções, reagendamentos, edições e conclusões chegam como remover/inserir e
+viram alterações de uma linha só.  A interface retira essas alterações
+(`retirar_pendentes`) e mexe apenas nas linhas afetadas do Text.  Na virada
+do dia, `avancar` tira as datas que ficaram para trás e acrescenta as que
+entraram na janela.
+"""
+import bisect
+import datetime
+
+# Tamanho da janela do painel, em dias a partir de hoje
+DIAS_PAINEL = 30
+
+
+def formatar_linha_painel(data_str, item):
+    status = "✔" if item.realizada else "🔴"
+    return (f"{status} Data: {data_str} | Perito: {item.perito_nome} | "
+            f"Processo: {item.processo} | Especialidade: {item.especialidade}")
+
+
+class PainelPericias:
+    """Linhas do painel e as alterações ainda não aplicadas na tela.
+
+    `consultar(inicio, fim)` lista (data_str, item) das perícias do período,
+    em ordem; é usada para preencher a janela e as datas que entram nela.
+    Dentro de um dia as linhas seguem a ordem de chegada, como na lista do
+    dia; um item que sai e volta na mesma data (edição, conclusão) mantém a
+    posição.
+    """
+
+    def __init__(self, consultar, hoje=None, dias=DIAS_PAINEL):
+        self.consultar = consultar
+        self.dias = dias
+        self.chaves = []      # (data_str, sequência, id), na ordem das linhas
+        self.por_id = {}      # id -> chave
+        self.pendentes = []   # ("inserir", posição, texto) ou ("remover", posição)
+        self.sequencia = 0
+        self.removido = None  # (id, data_str, sequência) do último item removido
+        self.definir_inicio(hoje or datetime.date.today())
+
+    def definir_inicio(self, hoje):
+        """Refaz a janela inteira a partir de hoje"""
+        self.pendentes.extend(("remover", 0) for _ in self.chaves)
+        self.chaves = []
+        self.por_id = {}
+        self._definir_janela(hoje)
+        for data_str, item in self.consultar(self.inicio, self.fim):
+            self._incluir(data_str, item)
+
+    def avancar(self, hoje):
+        """Move a janela para começar em `hoje` (virada do dia)"""
+        if hoje < self.inicio:
+            self.definir_inicio(hoje)  # Relógio voltou: refaz tudo
+            return
+        if hoje == self.inicio:
+            return
+        inicio_str = hoje.isoformat()
+        while self.chaves and self.chaves[0][0] < inicio_str:
+            _, _, id_item = self.chaves.pop(0)
+            del self.por_id[id_item]
+            self.pendentes.append(("remover", 0))
+        fim_anterior = self.fim
+        self._definir_janela(hoje)
+        novas_inicio = max(fim_anterior + datetime.timedelta(days=1), hoje)
+        if novas_inicio <= self.fim:
+            for data_str, item in self.consultar(novas_inicio, self.fim):
+                self.inserir('pericia', data_str, item)
+
+    def _definir_janela(self, hoje):
+        self.inicio = hoje
+        self.fim = hoje + datetime.timedelta(days=self.dias)
+        self.inicio_str = self.inicio.isoformat()
+        self.fim_str = self.fim.isoformat()
+
+    def retirar_pendentes(self):
+        """Alterações desde a última chamada, na ordem em que devem ser aplicadas"""
+        pendentes, self.pendentes = self.pendentes, []
+        return pendentes
+
+    def inserir(self, tipo, data_str, item):
+        if (tipo == 'pericia' and self.inicio_str <= data_str <= self.fim_str
+                and item.id not in self.por_id):
+            self._incluir(data_str, item)
+
+    def remover(self, tipo, data_str, item):
+        chave = self.por_id.pop(item.id, None)
+        if chave is None:
+            return
+        posicao = bisect.bisect_left(self.chaves, chave)
+        del self.chaves[posicao]
+        self.pendentes.append(("remover", posicao))
+        self.removido = (item.id, data_str, chave[1])
+
+    def _incluir(self, data_str, item):
+        if self.removido is not None and self.removido[:2] == (item.id, data_str):
+            sequencia = self.removido[2]
+        else:
+            self.sequencia += 1
+            sequencia = self.sequencia
+        self.removido = None
+        chave = (data_str, sequencia, item.id)
+        posicao = bisect.bisect_left(self.chaves, chave)
+        self.chaves.insert(posicao, chave)
+        self.por_id[item.id] = chave
+        self.pendentes.append(("inserir", posicao, formatar_linha_painel(data_str, item)))
@@ -0,0 +1,257 @@
+"""Prazos, perícias e peritos como objetos de atributos fixos (__slots__).
+
+Cada registro ocupa bem menos memória que o dicionário equivalente e os
+campos são lidos como atributos.  Na memória:
+
+- a data de cadastro é um ordinal (int), ou None quando não há;
+- concluido/realizada são bool, e `resolvido` vale para os dois tipos;
+- a prioridade é um membro de Prioridade;
+- observacoes é sempre str ("" quando vazia);
+- nomes de perito, descrições, especialidades, locais e profissões são
+  internados (sys.intern), então os registros dividem a mesma string.
+
+Os arquivos continuam no formato JSON de sempre.  `de_json`/`para_json`
+convertem um registro e `converter_arquivo` um arquivo inteiro.  Campos
+desconhecidos, ou com valor fora do padrão, ficam em `extras` e voltam ao
+arquivo como vieram.
+"""
+import datetime
+import enum
+import functools
+import sys
+
+from indices import ordinal_da_data
+
+
+class Prioridade(enum.IntEnum):
+    BAIXA = 0
+    NORMAL = 1
+    ALTA = 2
+
+    @property
+    def rotulo(self):
+        """Texto exibido e gravado no arquivo: 'Baixa', 'Normal', 'Alta'"""
+        return ROTULOS_PRIORIDADE[self]
+
+    @classmethod
+    def de_texto(cls, texto):
+        """'Alta' -> Prioridade.ALTA (None se o texto não for uma prioridade)"""
+        if isinstance(texto, cls):
+            return texto
+        if not isinstance(texto, str):
+            return None
+        prioridade = PRIORIDADE_DO_ROTULO.get(texto)
+        if prioridade is None:
+            prioridade = cls.__members__.get(texto.strip().upper())
+        return prioridade
+
+
+ROTULOS_PRIORIDADE = {prioridade: prioridade.name.capitalize() for prioridade in Prioridade}
+PRIORIDADE_DO_ROTULO = {rotulo: prioridade for prioridade, rotulo in ROTULOS_PRIORIDADE.items()}
+
+
+def ler_data(valor):
+    """'2025-05-23' -> ordinal (None se não for uma data)"""
+    return ordinal_em_cache(valor) if isinstance(valor, str) else None
+
+
+# As mesmas datas de cadastro se repetem em muitos registros
+ordinal_em_cache = functools.lru_cache(maxsize=4096)(ordinal_da_data)
+
+
+@functools.lru_cache(maxsize=4096)
+def escrever_data(ordinal):
+    return datetime.date.fromordinal(ordinal).isoformat()
+
+
+# Conversão do valor do arquivo (ou da interface) para o da memória; None
+# indica valor inválido
+LEITURA = {
+    "prioridade": Prioridade.de_texto,
+    "data_cadastro": ler_data,
+    "concluido": bool,
+    "realizada": bool,
+    "observacoes": lambda valor: valor or "",
+}
+
+# Conversão da memória para o arquivo
+ESCRITA = {
+    "prioridade": ROTULOS_PRIORIDADE.__getitem__,
+    "data_cadastro": escrever_data,
+    "observacoes": lambda texto: texto or None,
+}
+
+# Mensagens de edição para os campos que podem ser recusados
+MENSAGEM_INVALIDO = {
+    "prioridade": "Prioridade inválida! Use Baixa, Normal ou Alta.",
+    "data_cadastro": "Data inválida! Use o formato AAAA-MM-DD.",
+}
+
+
+class Registro:
+    """Base dos registros: construção e conversões a partir de CAMPOS"""
+
+    __slots__ = ()
+    CAMPOS = ()          # Campos, na ordem em que vão para o arquivo
+    PADROES = {}         # Valor dos campos ausentes ("" se não estiver aqui)
+    INTERNADOS = ()      # Textos que se repetem entre registros
+    OMITIR_VAZIOS = ()   # Campos gravados só quando preenchidos
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Tabelas por campo montadas uma vez, para a carga e a gravação de
+        # milhares de registros não repetirem as mesmas consultas
+        cls.CONJUNTO_CAMPOS = frozenset(cls.CAMPOS)
+        cls.TABELA_LEITURA = tuple((campo, LEITURA.get(campo), cls.PADROES.get(campo, ""),
+                                    campo in cls.INTERNADOS) for campo in cls.CAMPOS)
+        cls.TABELA_ESCRITA = tuple((campo, ESCRITA.get(campo), campo in cls.OMITIR_VAZIOS)
+                                   for campo in cls.CAMPOS)
+
+    def __init__(self, extras=None, **campos):
+        for campo in self.CAMPOS:
+            valor = campos.pop(campo, self.PADROES.get(campo, ""))
+            if campo in self.INTERNADOS and isinstance(valor, str):
+                valor = sys.intern(valor)
+            setattr(self, campo, valor)
+        if campos:
+            raise TypeError(f"Campos desconhecidos para {type(self).__name__}: {', '.join(campos)}")
+        self.extras = extras
+
+    def __repr__(self):
+        campos = ", ".join(f"{campo}={getattr(self, campo)!r}" for campo in self.CAMPOS)
+        return f"{type(self).__name__}({campos})"
+
+    @classmethod
+    def de_json(cls, dados):
+        """Dicionário do arquivo -> registro"""
+        registro = object.__new__(cls)
+        extras = None
+        for campo, ler, padrao, internar in cls.TABELA_LEITURA:
+            valor = dados.get(campo, padrao)
+            if ler is not None:
+                convertido = ler(valor)
+                if convertido is None:
+                    if valor is not padrao:
+                        # Valor fora do padrão: fica o padrão, e o original volta ao arquivo
+                        extras = extras or {}
+                        extras[campo] = valor
+                    convertido = padrao
+                valor = convertido
+            elif internar and type(valor) is str:
+                valor = sys.intern(valor)
+            setattr(registro, campo, valor)
+        if not cls.CONJUNTO_CAMPOS.issuperset(dados):
+            extras = extras or {}
+            for campo, valor in dados.items():
+                if campo not in cls.CONJUNTO_CAMPOS:
+                    extras[campo] = valor
+        registro.extras = extras
+        return registro
+
+    def para_json(self):
+        """Registro -> dicionário no formato do arquivo"""
+        dados = {}
+        for campo, escrever, omitir in self.TABELA_ESCRITA:
+            valor = getattr(self, campo)
+            if omitir and (valor is None or valor == ""):
+                continue
+            if escrever is not None and valor is not None:
+                valor = escrever(valor)
+            dados[campo] = valor
+        if self.extras:
+            dados.update(self.extras)
+        return dados
+
+    def texto(self, campo):
+        """Valor do campo como aparece na tela (e no arquivo)"""
+        valor = getattr(self, campo)
+        escrever = ESCRITA.get(campo)
+        if escrever is not None and valor is not None:
+            valor = escrever(valor)
+        return "" if valor is None else str(valor)
+
+    def converter(self, campos):
+        """Campos editados (textos da interface) -> {campo: valor da memória}
+
+        Levanta ValueError se algum valor for inválido; não altera o registro.
+        """
+        novos = {}
+        for campo, valor in campos.items():
+            if campo not in self.CAMPOS or campo == "id":
+                raise ValueError(f"Campo desconhecido: {campo}")
+            ler = LEITURA.get(campo)
+            if ler is not None:
+                valor = ler(valor) if valor != "" or campo == "observacoes" else None
+                if valor is None and campo not in self.OMITIR_VAZIOS:
+                    raise ValueError(MENSAGEM_INVALIDO.get(campo, f"Valor inválido: {campo}"))
+            elif campo in self.INTERNADOS and isinstance(valor, str):
+                valor = sys.intern(valor)
+            novos[campo] = valor
+        return novos
+
+
+class Prazo(Registro):
+    __slots__ = ("id", "processo", "perito_nome", "descricao", "prioridade",
+                 "concluido", "observacoes", "data_cadastro", "extras")
+    CAMPOS = __slots__[:-1]
+    PADROES = {"id": None, "prioridade": Prioridade.NORMAL, "concluido": False,
+               "data_cadastro": None}
+    INTERNADOS = ("perito_nome", "descricao")
+    OMITIR_VAZIOS = ("id", "observacoes", "data_cadastro")
+
+    @property
+    def resolvido(self):
+        return self.concluido
+
+    @resolvido.setter
+    def resolvido(self, valor):
+        self.concluido = valor
+
+
+class Pericia(Registro):
+    __slots__ = ("id", "processo", "perito_nome", "especialidade", "local",
+                 "observacoes", "realizada", "data_cadastro", "extras")
+    CAMPOS = __slots__[:-1]
+    PADROES = {"id": None, "realizada": False, "data_cadastro": None}
+    INTERNADOS = ("perito_nome", "especialidade", "local")
+    OMITIR_VAZIOS = ("id", "data_cadastro")
+
+    @property
+    def resolvido(self):
+        return self.realizada
+
+    @resolvido.setter
+    def resolvido(self, valor):
+        self.realizada = valor
+
+
+class Perito(Registro):
+    __slots__ = ("nome", "cpf", "telefone", "profissao", "data_cadastro", "extras")
+    CAMPOS = __slots__[:-1]
+    PADROES = {"data_cadastro": None}
+    INTERNADOS = ("profissao",)
+    OMITIR_VAZIOS = ("data_cadastro",)
+
+
+# Tabela (nome do arquivo sem extensão) -> classe dos registros
+CLASSES = {"prazos": Prazo, "pericias": Pericia, "peritos": Perito}
+
+# Tipos de item com data
+TIPOS = ('prazo', 'pericia')
+
+
+def converter_arquivo(tabela, data):
+    """Conteúdo lido de um arquivo (JSON) -> mesmo dicionário com registros"""
+    classe = CLASSES.get(tabela)
+    if classe is None:
+        return data
+    if classe is Perito:
+        return {nome: Perito.de_json(dados) for nome, dados in data.items()}
+    return {data_str: [classe.de_json(item) for item in itens] for data_str, itens in data.items()}
+
+
+def para_json(registro):
+    """`default` do json.dumps: registro -> dicionário no formato do arquivo"""
+    if isinstance(registro, Registro):
+        return registro.para_json()
+    raise TypeError(f"Object of type {type(registro).__name__} is not JSON serializable")
@@ -0,0 +1,63 @@
+"""Fixtures dos testes: Repositorio numa pasta temporária, em qualquer modo de armazenamento."""
+import datetime
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nucleo import Repositorio  # noqa: E402
+from registros import para_json  # noqa: E402
+
+MODOS = ("json", "diario", "sqlite", "mensal")
+PERITO = "Ana Souza"
+
+
+def processo(numero):
+    """Número de processo válido (padrão CNJ) a partir de um inteiro"""
+    return f"{numero:07d}-00.2024.8.26.0100"
+
+
+def retrato(repo):
+    """Conteúdo do repositório como listas ordenadas, para comparar antes/depois"""
+    repo.garantir_periodo()
+    itens = sorted((tipo, data_str, json.dumps(item, sort_keys=True, default=para_json))
+                   for tipo, data_str, item in repo.indice.por_id.values())
+    peritos = sorted((nome, json.dumps(perito, sort_keys=True, default=para_json))
+                     for nome, perito in repo.peritos.items())
+    return itens, peritos
+
+
+@pytest.fixture
+def hoje():
+    return datetime.date.today()
+
+
+@pytest.fixture
+def abrir(tmp_path):
+    """abrir(modo, assincrono) -> Repositorio carregado da pasta do teste
+
+    Os repositórios abertos são fechados no fim do teste; fechar de novo um
+    que o teste já fechou não faz nada.
+    """
+    abertos = []
+
+    def abrir(modo="json", assincrono=False):
+        repo = Repositorio(str(tmp_path), modo, assincrono=assincrono)
+        assert repo.carregar() == []
+        abertos.append(repo)
+        return repo
+
+    yield abrir
+    for repo in abertos:
+        repo.fechar()
+
+
+@pytest.fixture
+def repo(abrir):
+    """Repositorio em modo json, com gravação imediata e um perito cadastrado"""
+    repo = abrir()
+    repo.cadastrar_perito(PERITO, "52998224725", "(43) 99999-0000", "Médica")
+    return repo
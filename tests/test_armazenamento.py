@@ -0,0 +1,353 @@
+"""Gravar e reabrir em cada modo de armazenamento, inclusive depois de falhas."""
+import datetime
+import json
+import os
+
+import pytest
+
+from armazenamento import caminho_diario, criar_armazenamento, serializar
+from conftest import MODOS, PERITO, processo, retrato
+from registros import Perito, Prazo, converter_arquivo
+
+
+def prazo(numero, descricao="laudo", concluido=False):
+    """Prazo no formato do arquivo"""
+    return {"processo": numero, "perito_nome": "Ana Souza", "descricao": descricao,
+            "prioridade": "Normal", "concluido": concluido, "data_cadastro": "2025-04-30"}
+
+
+def exemplo():
+    return {"2025-05-02": [prazo("0029304-41.2024.8.26.0100")],
+            "2025-05-09": [prazo("1000001-00.2023.8.26.0001"),
+                           prazo("1000002-00.2023.8.26.0001", "quesitos", True)]}
+
+
+@pytest.fixture
+def arquivo(tmp_path):
+    return str(tmp_path / "prazos.json")
+
+
+def em_json(data):
+    """Registros -> dicionários no formato do arquivo, para comparar"""
+    return json.loads(serializar(data))
+
+
+def reabrir(modo, arquivo):
+    """Tudo o que está gravado (no modo mensal, inclusive os meses não lidos na abertura),
+    no formato do arquivo"""
+    armazenamento = criar_armazenamento(modo, os.path.dirname(arquivo))
+    try:
+        data = armazenamento.carregar(arquivo)
+        armazenamento.garantir(arquivo, data)
+        return em_json(data)
+    finally:
+        armazenamento.fechar()
+
+
+@pytest.mark.parametrize("modo", MODOS)
+def test_alteracoes_voltam_ao_reabrir(modo, arquivo):
+    assert reabrir(modo, arquivo) == {}
+    armazenamento = criar_armazenamento(modo, os.path.dirname(arquivo))
+    data = armazenamento.carregar(arquivo)
+    data.update(converter_arquivo("prazos", exemplo()))
+    armazenamento.salvar(arquivo, data, list(data))
+    data["2025-05-09"][1].concluido = False
+    data["2025-05-16"] = [Prazo.de_json(prazo("1000003-00.2023.8.26.0001"))]
+    del data["2025-05-02"]
+    armazenamento.salvar(arquivo, data, ["2025-05-09", "2025-05-16", "2025-05-02"])
+    armazenamento.fechar()
+
+    assert reabrir(modo, arquivo) == em_json(data)
+
+
+@pytest.mark.parametrize("modo", MODOS)
+def test_peritos_voltam_ao_reabrir(modo, tmp_path):
+    arquivo = str(tmp_path / "peritos.json")
+    armazenamento = criar_armazenamento(modo, str(tmp_path))
+    data = armazenamento.carregar(arquivo)
+    for nome, cpf in (("Ana Souza", "529.982.247-25"), ("Bruno Lima", "111.444.777-35")):
+        data[nome] = Perito.de_json({"nome": nome, "cpf": cpf, "telefone": "43999990000",
+                                     "profissao": "Médica", "data_cadastro": "2025-04-30"})
+        armazenamento.salvar(arquivo, data, [nome])
+    del data["Bruno Lima"]
+    armazenamento.salvar(arquivo, data, ["Bruno Lima"])
+    armazenamento.fechar()
+
+    assert reabrir(modo, arquivo) == em_json(data)
+
+
+def test_diario_acrescenta_so_as_chaves_alteradas(arquivo):
+    armazenamento = criar_armazenamento("diario", os.path.dirname(arquivo))
+    data = armazenamento.carregar(arquivo)
+    data.update(converter_arquivo("prazos", exemplo()))
+    armazenamento.salvar(arquivo, data)
+    with open(arquivo, encoding="utf-8") as f:
+        snapshot = f.read()
+
+    data["2025-05-02"][0].concluido = True
+    armazenamento.salvar(arquivo, data, ["2025-05-02"])
+    del data["2025-05-09"]
+    armazenamento.salvar(arquivo, data, ["2025-05-09"])
+    armazenamento.fechar()
+
+    with open(arquivo, encoding="utf-8") as f:
+        assert f.read() == snapshot
+    with open(caminho_diario(arquivo), encoding="utf-8") as f:
+        operacoes = [json.loads(linha) for linha in f]
+    assert [(op["op"], op["k"]) for op in operacoes] == [("set", "2025-05-02"),
+                                                         ("del", "2025-05-09")]
+    assert reabrir("diario", arquivo) == em_json(data)
+
+
+def test_diario_compacta_no_limite(arquivo):
+    armazenamento = criar_armazenamento("diario", os.path.dirname(arquivo))
+    armazenamento.limite = 5
+    data = armazenamento.carregar(arquivo)
+    for dia in range(1, 13):
+        data[f"2025-05-{dia:02d}"] = [Prazo.de_json(prazo(f"{dia:07d}-00.2024.8.26.0100"))]
+        armazenamento.salvar(arquivo, data, [f"2025-05-{dia:02d}"])
+        assert armazenamento.operacoes[arquivo] <= 5
+    armazenamento.fechar()
+
+    diario = caminho_diario(arquivo)
+    if os.path.exists(diario):  # A compactação regrava o snapshot e zera o diário
+        with open(diario, encoding="utf-8") as f:
+            assert len(f.readlines()) <= 5
+    assert reabrir("diario", arquivo) == em_json(data)
+    assert reabrir("json", arquivo) != {}  # O snapshot sozinho é um JSON válido
+
+
+def test_sqlite_migra_os_arquivos_json_na_primeira_abertura(arquivo, tmp_path):
+    with open(arquivo, "w", encoding="utf-8") as f:
+        json.dump(exemplo(), f)
+
+    assert reabrir("sqlite", arquivo) == exemplo()
+    assert os.path.exists(tmp_path / "cpericias.db")
+    # Depois da migração o banco é a fonte: o JSON antigo não é mais lido
+    with open(arquivo, "w", encoding="utf-8") as f:
+        json.dump({}, f)
+    assert reabrir("sqlite", arquivo) == exemplo()
+
+
+def test_sqlite_retoma_a_migracao_interrompida(arquivo, tmp_path, monkeypatch):
+    peritos = str(tmp_path / "peritos.json")
+    with open(arquivo, "w", encoding="utf-8") as f:
+        json.dump(exemplo(), f)
+    with open(peritos, "w", encoding="utf-8") as f:
+        json.dump({"Ana Souza": {"nome": "Ana Souza", "cpf": "529.982.247-25"}}, f)
+
+    # Queda no meio da migração: prazos já foram para o banco, peritos não
+    armazenamento = criar_armazenamento("sqlite", str(tmp_path))
+    armazenamento.carregar(arquivo)
+
+    def falhar(data, chaves):
+        raise OSError("queda")
+
+    monkeypatch.setattr(armazenamento, "_gravar_peritos", falhar)
+    with pytest.raises(OSError):
+        armazenamento.carregar(peritos)
+    armazenamento.fechar()
+
+    with open(arquivo, "w", encoding="utf-8") as f:
+        json.dump({}, f)
+    assert reabrir("sqlite", arquivo) == exemplo()  # Já migrado: o JSON não é relido
+    assert reabrir("sqlite", peritos) == reabrir("json", peritos)
+    assert reabrir("sqlite", peritos) != {}
+
+
+def escrever_meses(tmp_path, meses):
+    pasta = tmp_path / "prazos"
+    pasta.mkdir()
+    for mes, conteudo in meses.items():
+        (pasta / f"{mes}.json").write_text(json.dumps(conteudo), encoding="utf-8")
+
+
+def test_mensal_le_so_os_meses_em_volta_de_hoje(arquivo, tmp_path):
+    hoje = datetime.date.today().isoformat()
+    escrever_meses(tmp_path, {"2024-01": {"2024-01-10": [prazo("1")]},
+                              hoje[:7]: {hoje: [prazo("2")]},
+                              "2040-03": {"2040-03-03": [prazo("3")]}})
+    armazenamento = criar_armazenamento("mensal", str(tmp_path))
+    data = armazenamento.carregar(arquivo)
+    assert list(data) == [hoje]
+
+    assert armazenamento.garantir(arquivo, data, datetime.date(2040, 3, 1),
+                                  datetime.date(2040, 3, 31)) == ["2040-03-03"]
+    assert armazenamento.garantir(arquivo, data, datetime.date(2040, 3, 1),
+                                  datetime.date(2040, 3, 31)) == []
+    assert armazenamento.garantir(arquivo, data) == ["2024-01-10"]
+    assert sorted(data) == ["2024-01-10", hoje, "2040-03-03"]
+
+
+def test_mensal_grava_so_os_meses_alterados(arquivo, tmp_path):
+    escrever_meses(tmp_path, {"2024-01": {"2024-01-10": [prazo("1")]},
+                              "2024-02": {"2024-02-10": [prazo("2")]}})
+    armazenamento = criar_armazenamento("mensal", str(tmp_path))
+    data = armazenamento.carregar(arquivo)
+    fevereiro = (tmp_path / "prazos" / "2024-02.json").read_text(encoding="utf-8")
+
+    # Janeiro não foi lido: a gravação junta a data nova ao que está no disco
+    data["2024-01-20"] = [Prazo.de_json(prazo("3"))]
+    armazenamento.salvar(arquivo, data, ["2024-01-20"])
+    assert (tmp_path / "prazos" / "2024-02.json").read_text(encoding="utf-8") == fevereiro
+    assert reabrir("mensal", arquivo) == {"2024-01-10": [prazo("1")], "2024-01-20": [prazo("3")],
+                                          "2024-02-10": [prazo("2")]}
+
+    # Mês que ficou vazio perde o arquivo
+    armazenamento.garantir(arquivo, data)
+    del data["2024-02-10"]
+    armazenamento.salvar(arquivo, data, ["2024-02-10"])
+    assert not (tmp_path / "prazos" / "2024-02.json").exists()
+
+
+def test_mensal_divide_o_arquivo_unico_na_primeira_abertura(arquivo, tmp_path):
+    with open(arquivo, "w", encoding="utf-8") as f:
+        json.dump(exemplo(), f)
+    assert reabrir("mensal", arquivo) == exemplo()
+    assert sorted(os.listdir(tmp_path / "prazos")) == ["2025-05.json", "abertos.json"]
+    assert os.path.exists(arquivo)  # Mantido como cópia de segurança
+
+    # Peritos continuam num arquivo só
+    peritos = str(tmp_path / "peritos.json")
+    armazenamento = criar_armazenamento("mensal", str(tmp_path))
+    data = {"Ana Souza": Perito(nome="Ana Souza")}
+    armazenamento.salvar(peritos, data, ["Ana Souza"])
+    assert reabrir("json", peritos) == em_json(data)
+
+
+def test_modo_desconhecido(tmp_path):
+    with pytest.raises(ValueError, match="desconhecido"):
+        criar_armazenamento("xml", str(tmp_path))
+
+
+def preencher(repo, hoje):
+    """Cadastra um perito e faz uma alteração de cada tipo, em meses diferentes"""
+    repo.cadastrar_perito(PERITO, "52998224725", "(43) 99999-0000", "Médica")
+    concluido = repo.adicionar_prazo(hoje, processo(1), PERITO, "laudo", "Alta")
+    movido = repo.adicionar_prazo(hoje, processo(2), PERITO, "quesitos")
+    editada = repo.adicionar_pericia(hoje + datetime.timedelta(days=40), processo(3), PERITO,
+                                     "Clínica", "Fórum Central")
+    apagado = repo.adicionar_prazo(hoje - datetime.timedelta(days=400), processo(4), PERITO,
+                                   "antigo")
+    repo.concluir(concluido.id)
+    repo.reagendar(movido.id, hoje + datetime.timedelta(days=70))
+    repo.editar(editada.id, {"local": "Consultório", "observacoes": "levar exames"})
+    repo.apagar(apagado.id)
+
+
+@pytest.mark.parametrize("assincrono", [False, True])
+@pytest.mark.parametrize("modo", MODOS)
+def test_repositorio_volta_igual_ao_reabrir(abrir, hoje, modo, assincrono):
+    repo = abrir(modo, assincrono)
+    preencher(repo, hoje)
+    antes = retrato(repo)
+    repo.fechar()
+
+    assert retrato(abrir(modo)) == antes
+
+
+@pytest.mark.parametrize("modo", MODOS)
+def test_gravacao_que_falhou_e_refeita_ao_fechar(abrir, modo, monkeypatch):
+    repo = abrir(modo, assincrono=True)
+    repo.cadastrar_perito(PERITO, "52998224725", "(43) 99999-0000", "Médica")
+    repo.descarregar()
+
+    salvar = repo.armazenamento.salvar
+    falhas = []
+
+    def falhar_uma_vez(file, data, chaves=None):
+        if not falhas:
+            falhas.append(file)
+            raise OSError("disco cheio")
+        return salvar(file, data, chaves)
+
+    monkeypatch.setattr(repo.armazenamento, "salvar", falhar_uma_vez)
+    # Mês que ainda não tem arquivo no modo mensal
+    repo.adicionar_prazo(datetime.date(2030, 3, 3), processo(1), PERITO, "laudo")
+    repo.descarregar()
+    file, erro = repo.gravador.erros.get(timeout=5)
+    assert file == repo.prazos_file and isinstance(erro, OSError)
+    antes = retrato(repo)
+    repo.fechar()
+
+    novo = abrir(modo)
+    assert retrato(novo) == antes
+    assert [data_str for data_str, _ in novo.periodo(
+        'prazo', datetime.date(2030, 3, 1), datetime.date(2030, 3, 31))] == ["2030-03-03"]
+
+
+@pytest.mark.parametrize("cortada", ['{"op": "set", "k": "2025-0',
+                                     '{"op": "del", "k": "1999-01-01"}'])
+def test_diario_com_ultima_linha_cortada(abrir, tmp_path, hoje, cortada):
+    repo = abrir("diario")
+    repo.cadastrar_perito(PERITO, "52998224725", "(43) 99999-0000", "Médica")
+    repo.adicionar_prazo(hoje, processo(1), PERITO, "laudo")
+    repo.fechar()
+    with open(tmp_path / "prazos.diario.jsonl", "a", encoding="utf-8") as f:
+        f.write(cortada)  # Queda no meio da gravação: sem o "\n" final
+
+    repo = abrir("diario")
+    repo.adicionar_prazo(hoje, processo(2), PERITO, "quesitos")
+    antes = retrato(repo)
+    repo.fechar()
+
+    novo = abrir("diario")
+    assert retrato(novo) == antes
+    assert len(novo.periodo('prazo', hoje, hoje)) == 2
+
+
+def gerar_meses(abrir, hoje):
+    """Grava, no modo mensal, itens em aberto e concluídos espalhados por dois anos"""
+    repo = abrir("mensal")
+    repo.cadastrar_perito(PERITO, "52998224725", "(43) 99999-0000", "Médica")
+    for numero, dias in enumerate(range(-365, 366, 9)):
+        item = repo.adicionar_prazo(hoje + datetime.timedelta(days=dias), processo(numero),
+                                    PERITO, "laudo")
+        if numero % 3 == 0:
+            repo.concluir(item.id)
+    repo.fechar()
+
+
+def contar_tudo(repo, hoje):
+    repo.garantir_periodo()
+    abertos = [data_str for _, data_str, item in repo.indice.por_id.values() if not item.resolvido]
+    atrasados = sum(1 for data_str in abertos if data_str < hoje.isoformat())
+    return atrasados, len(abertos) - atrasados
+
+
+def test_mensal_abre_so_os_meses_em_volta_de_hoje(abrir, hoje):
+    gerar_meses(abrir, hoje)
+    repo = abrir("mensal")
+    meses = {data_str[:7] for _, data_str, _ in repo.indice.por_id.values()}
+    assert len(meses) <= 3
+    # O selo conta os meses não lidos pelo resumo, sem carregá-los
+    contagem = repo.contar_abertos()
+    assert {data_str[:7] for _, data_str, _ in repo.indice.por_id.values()} == meses
+    assert contagem == contar_tudo(abrir("mensal"), hoje)
+
+
+def test_mensal_atrasados_le_so_os_meses_necessarios(abrir, hoje):
+    gerar_meses(abrir, hoje)
+    repo = abrir("mensal")
+    atrasados = repo.atrasados()
+    assert all(data_str < hoje.isoformat() for _, data_str, _ in atrasados)
+    assert not any(data_str > (hoje + datetime.timedelta(days=62)).isoformat()
+                   for _, data_str, _ in repo.indice.por_id.values())
+    assert (len(atrasados), len(repo.pendentes())) == contar_tudo(abrir("mensal"), hoje)
+
+
+def test_mensal_refaz_o_resumo_de_mes_alterado_por_fora(abrir, tmp_path, hoje):
+    gerar_meses(abrir, hoje)
+    pasta = tmp_path / "prazos"
+    mes = (hoje.replace(day=1) - datetime.timedelta(days=200)).strftime("%Y-%m")
+    with open(pasta / f"{mes}.json", encoding="utf-8") as f:
+        conteudo = json.load(f)
+    for itens in conteudo.values():
+        for item in itens:
+            item["concluido"] = False
+    with open(pasta / f"{mes}.json", "w", encoding="utf-8") as f:
+        json.dump(conteudo, f)
+
+    assert abrir("mensal").contar_abertos() == contar_tudo(abrir("mensal"), hoje)
+    os.remove(pasta / "abertos.json")
+    assert abrir("mensal").contar_abertos() == contar_tudo(abrir("mensal"), hoje)
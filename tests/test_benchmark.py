@@ -0,0 +1,36 @@
+"""Benchmark em escala mínima: dados sintéticos válidos e todas as operações medidas."""
+import json
+import random
+
+import pytest
+
+from benchmark import comparar, executar, gerar_cpf, gerar_dados, gerar_processo
+from conftest import MODOS
+from nucleo import formatar_cpf, validar_processo
+
+
+def test_processos_e_cpfs_validos():
+    rnd = random.Random(1)
+    for _ in range(200):
+        assert validar_processo(gerar_processo(rnd))
+        cpf = gerar_cpf(rnd)
+        assert formatar_cpf(cpf) == cpf
+
+
+@pytest.mark.parametrize("modo", MODOS)
+def test_executar_mede_todas_as_operacoes(tmp_path, modo):
+    gerar_dados(str(tmp_path), 200, 10)
+    with open(tmp_path / "peritos.json", encoding="utf-8") as f:
+        assert len(json.load(f)) == 10
+    resultados = executar(str(tmp_path), modo, leves=2, pesadas=1)
+    assert {"carregar_dados", "visao_mes", "buscar_processo_trecho", "checagem_duplicado",
+            "apagar"} <= set(resultados)
+    assert all(tempos["min_ms"] <= tempos["max_ms"] for tempos in resultados.values())
+
+
+def test_comparar_marca_as_mais_lentas(capsys):
+    base = {"resultados": {"a": {"mediana_ms": 1.0}, "b": {"mediana_ms": 1.0}}}
+    atual = {"resultados": {"a": {"mediana_ms": 1.1}, "b": {"mediana_ms": 2.0},
+                            "c": {"mediana_ms": 3.0}}}
+    assert comparar(atual, base) == ["b"]
+    assert "PIOR" in capsys.readouterr().out
@@ -0,0 +1,119 @@
+"""Linha de comando sobre uma pasta de dados temporária."""
+import datetime
+import json
+
+import pytest
+
+from conftest import PERITO
+from cpericias_cli import main
+
+DIA = datetime.date(2030, 3, 4)
+
+
+@pytest.fixture
+def pasta(abrir, tmp_path):
+    repo = abrir()
+    repo.cadastrar_perito(PERITO, "52998224725", "(43) 99999-0000", "Médica")
+    repo.adicionar_prazo(DIA, "0029304-41.2024.8.26.0100", PERITO, "laudo")
+    repo.adicionar_prazo(DIA, "1000001-00.2023.8.26.0001", PERITO, "quesitos")
+    repo.adicionar_pericia(DIA, "0029304-41.2024.8.26.0100", PERITO, "Clínica", "Fórum")
+    repo.fechar()
+    return str(tmp_path)
+
+
+def test_listar_por_tipo_e_processo(pasta, capsys):
+    assert main(["--pasta", pasta, "listar", "--tipo", "prazo", "--processo", "0029304"]) == 0
+    saida = capsys.readouterr()
+    assert saida.err == "1 registro(s)\n"
+    assert "| Prazo | 0029304-41.2024.8.26.0100 | Ana Souza | laudo |" in saida.out
+
+
+@pytest.mark.parametrize("processo", ["0029304-41", "002930441", "29304-41.2024"])
+def test_listar_por_processo_com_ou_sem_pontuacao(pasta, capsys, processo):
+    assert main(["--pasta", pasta, "listar", "--processo", processo]) == 0
+    saida = capsys.readouterr()
+    assert saida.err == "2 registro(s)\n"
+    assert "1000001" not in saida.out
+
+
+def test_listar_processo_sem_digitos_nao_lista_tudo(pasta, capsys):
+    assert main(["--pasta", pasta, "listar", "--processo", "abc"]) == 0
+    assert capsys.readouterr().err == "0 registro(s)\n"
+
+
+def test_buscar_sem_pontuacao(pasta, capsys):
+    assert main(["--pasta", pasta, "buscar", "002930441", "--formato", "json"]) == 0
+    registros = json.loads(capsys.readouterr().out)
+    assert sorted(registro["tipo"] for registro in registros) == ["pericia", "prazo"]
+
+
+def test_concluir_grava_ao_sair(pasta, abrir, capsys):
+    assert main(["--pasta", pasta, "concluir", "--processo", "1000001", "--simular"]) == 0
+    assert "1 registro(s) a concluir" in capsys.readouterr().err
+    assert main(["--pasta", pasta, "concluir", "--processo", "1000001"]) == 0
+    assert "1 registro(s) concluído(s)" in capsys.readouterr().err
+    repo = abrir()
+    assert [item.processo for _, item in repo.periodo('prazo', DIA, DIA)
+            if item.concluido] == ["1000001-00.2023.8.26.0001"]
+
+
+def test_concluir_sem_filtro(pasta, capsys):
+    assert main(["--pasta", pasta, "concluir"]) == 1
+    assert "Informe --id" in capsys.readouterr().err
+
+
+def test_exportar(pasta, tmp_path, capsys):
+    saida = str(tmp_path / "agenda.csv")
+    assert main(["--pasta", pasta, "exportar", saida, "--pendentes"]) == 0
+    assert "3 registro(s) exportado(s)" in capsys.readouterr().err
+    with open(saida, encoding="utf-8") as f:
+        assert len(f.read().splitlines()) == 4
+    assert main(["--pasta", pasta, "exportar", str(tmp_path / "agenda.txt")]) == 1
+
+
+def test_resumo(abrir, tmp_path, hoje, capsys):
+    repo = abrir()
+    repo.cadastrar_perito(PERITO, "52998224725", "(43) 99999-0000", "Médica")
+    repo.adicionar_prazo(hoje - datetime.timedelta(days=2), "0029304-41.2024.8.26.0100", PERITO,
+                         "laudo")
+    repo.adicionar_prazo(hoje, "1000001-00.2023.8.26.0001", PERITO, "quesitos", "Alta")
+    repo.adicionar_pericia(hoje + datetime.timedelta(days=3), "0029304-41.2024.8.26.0100", PERITO,
+                           "Clínica", "Fórum")
+    repo.fechar()
+
+    assert main(["--pasta", str(tmp_path), "resumo", "--dias", "5"]) == 0
+    assert capsys.readouterr().out.splitlines() == [
+        "Atrasados: 1 prazo(s), 0 perícia(s)",
+        "Prazos pendentes nos próximos 5 dias: Alta 1, Normal 0, Baixa 0",
+        "Peritos com mais pendências nos próximos 5 dias:",
+        "       2  Ana Souza"]
+
+
+def test_vencimento(pasta, capsys):
+    assert main(["--pasta", pasta, "vencimento", "2025-05-23", "1"]) == 0
+    assert capsys.readouterr().out.startswith("2025-05-26")
+    assert main(["--pasta", pasta, "vencimento", "2025-05-23", "zero"]) == 1
+
+
+def test_importar(pasta, abrir, tmp_path, capsys):
+    entrada = tmp_path / "intimacoes.csv"
+    entrada.write_text(
+        "processo,perito_nome,descricao,intimacao,dias_uteis,prioridade\n"
+        "0000001-00.2024.8.26.0100,Ana Souza,laudo,2025-05-23,1,Alta\n"
+        "0000002-00.2024.8.26.0100,Ana Souza,laudo,2025-05-23,0,\n"
+        "0000003-00.2024.8.26.0100,Ana Souza,laudo,23/05/2025,1,\n"
+        "0000004-00.2024.8.26.0100,Ana Souza,laudo,2025-12-18,2,\n", encoding="utf-8")
+    assert main(["--pasta", pasta, "importar", str(entrada), "--simular"]) == 0
+    saida = capsys.readouterr()
+    assert saida.out.splitlines() == ["criaria prazo 2025-05-26 0000001-00.2024.8.26.0100",
+                                      "criaria prazo 2026-01-21 0000004-00.2024.8.26.0100"]
+    assert "2 prazo(s) a criar, 2 erro(s)" in saida.err
+
+    assert main(["--pasta", pasta, "importar", str(entrada)]) == 0
+    assert "2 prazo(s) criado(s), 2 erro(s)" in capsys.readouterr().err
+    repo = abrir()
+    assert [item.prioridade.rotulo for _, item in repo.buscar('prazo', "0000001")] == ["Alta"]
+
+    entrada.write_text("processo,intimacao\n", encoding="utf-8")
+    assert main(["--pasta", pasta, "importar", str(entrada)]) == 1
+    assert "Colunas ausentes" in capsys.readouterr().err
@@ -0,0 +1,97 @@
+"""Espelho em colunas: filtros e contagens, com e sem numpy."""
+import datetime
+
+import pytest
+
+import colunas
+from conftest import PERITO, processo
+from registros import Prioridade
+
+HOJE = datetime.date(2030, 3, 10)
+OUTRO = "Bruno Lima"
+
+
+@pytest.fixture(params=["numpy", "python"])
+def repo(request, repo, monkeypatch):
+    if request.param == "python":
+        monkeypatch.setattr(colunas, "carregar_numpy", lambda: None)
+    repo.cadastrar_perito(OUTRO, "11144477735", "(43) 98888-0000", "Engenheiro")
+    for numero in range(12):
+        data = HOJE + datetime.timedelta(days=numero * 3 - 15)
+        perito = PERITO if numero % 3 else OUTRO
+        if numero % 4 == 3:
+            item = repo.adicionar_pericia(data, processo(numero), perito, "Clínica", "Fórum")
+        else:
+            item = repo.adicionar_prazo(data, processo(numero), perito, "laudo",
+                                        Prioridade(numero % 3).rotulo)
+        if numero % 5 == 0:
+            repo.concluir(item.id)
+    return repo
+
+
+def esperado(repo, tipo=None, inicio=None, fim=None, resolvido=None, prioridade=None,
+             perito=None):
+    """Os mesmos filtros, registro a registro"""
+    return sorted(
+        item.id for tipo_item, data_str, item in repo.indice.por_id.values()
+        if (tipo is None or tipo_item == tipo)
+        and (inicio is None or data_str >= inicio.isoformat())
+        and (fim is None or data_str <= fim.isoformat())
+        and (resolvido is None or item.resolvido == resolvido)
+        and (prioridade is None or getattr(item, "prioridade", None) == prioridade)
+        and (perito is None or item.perito_nome == perito))
+
+
+FILTROS = [
+    {},
+    {"tipo": 'prazo', "resolvido": False},
+    {"tipo": 'pericia'},
+    {"inicio": HOJE, "fim": HOJE + datetime.timedelta(days=15)},
+    {"fim": HOJE - datetime.timedelta(days=1), "resolvido": False},
+    {"prioridade": Prioridade.ALTA, "perito": PERITO},
+    {"perito": "Ninguém"},
+]
+
+
+def conferir(repo):
+    for filtros in FILTROS:
+        assert sorted(item.id for _, _, item in repo.filtrar(**filtros)) == esperado(
+            repo, **filtros)
+        assert repo.contar(**filtros) == len(esperado(repo, **filtros))
+
+
+def test_filtros_acompanham_as_alteracoes(repo):
+    conferir(repo)
+    ids = [item.id for _, _, item in repo.filtrar(tipo='prazo', resolvido=False)]
+    repo.concluir(ids[0])
+    repo.apagar(ids[1])
+    repo.reagendar(ids[2], HOJE + datetime.timedelta(days=40))
+    repo.editar(ids[3], {"prioridade": "Alta"})
+    # A linha livre do item apagado é reaproveitada
+    linhas = len(repo.colunas.ids)
+    repo.adicionar_prazo(HOJE, processo(99), "Carla Dias", "laudo", "Baixa")
+    assert len(repo.colunas.ids) == linhas
+    conferir(repo)
+
+
+def test_filtrar_em_ordem_de_data(repo):
+    datas = [data_str for _, data_str, _ in repo.filtrar()]
+    assert datas == sorted(datas) and len(datas) == 12
+
+
+def test_contar_por(repo):
+    pendentes = repo.contar_por('perito', resolvido=False)
+    assert pendentes == {PERITO: len(esperado(repo, resolvido=False, perito=PERITO)),
+                         OUTRO: len(esperado(repo, resolvido=False, perito=OUTRO))}
+    por_prioridade = repo.contar_por('prioridade')
+    assert por_prioridade[None] == len(esperado(repo, tipo='pericia'))
+    for prioridade in Prioridade:
+        assert por_prioridade.get(prioridade, 0) == len(esperado(repo, prioridade=prioridade))
+    assert repo.contar_por('perito', perito="Ninguém") == {}
+
+
+def test_contar_por_logo_depois_de_carregar(repo, abrir):
+    contagem = repo.contar_por('perito')
+    repo.fechar()
+    # Primeira consulta do repositório recém-carregado: as colunas ainda não existem
+    assert abrir().contar_por('perito') == contagem == {PERITO: 8, OUTRO: 4}
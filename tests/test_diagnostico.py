@@ -0,0 +1,65 @@
+"""Medidor de latência: percentis da janela, chamadas lentas e exportação."""
+import json
+import logging
+
+import pytest
+
+from diagnostico import Medidor, percentil
+
+
+def test_percentil():
+    assert percentil([], 0.5) == 0.0
+    ordenadas = list(range(1, 101))
+    assert percentil(ordenadas, 0.5) == 51
+    assert percentil(ordenadas, 0.95) == 96
+    assert percentil(ordenadas, 1.0) == 100
+
+
+def test_resumo_usa_so_a_janela():
+    medidor = Medidor(janela=10)
+    for ms in range(100):
+        medidor.registrar("visao_dia", float(ms))
+    resumo = medidor.resumo()["visao_dia"]
+    assert resumo["chamadas"] == 100
+    assert (resumo["p50_ms"], resumo["max_ms"]) == (95.0, 99.0)
+
+
+def test_lentas_vao_para_o_log(caplog):
+    medidor = Medidor(limite_lento_ms=50)
+    with caplog.at_level(logging.WARNING, logger="cpericias"):
+        medidor.registrar("rapida", 10.0)
+        medidor.registrar("lenta", 120.0)
+    assert [operacao for _, operacao, _ in medidor.chamadas_lentas()] == ["lenta"]
+    assert "lenta levou 120.0 ms" in caplog.text
+    medidor.limpar()
+    assert medidor.resumo() == {} and medidor.chamadas_lentas() == []
+
+
+def test_medir_registra_mesmo_com_excecao(tmp_path):
+    medidor = Medidor()
+
+    @medidor.medir("falha")
+    def falhar():
+        raise ValueError("x")
+
+    with pytest.raises(ValueError):
+        falhar()
+    assert medidor.resumo()["falha"]["chamadas"] == 1
+
+    caminho = tmp_path / "diagnostico.json"
+    medidor.exportar(str(caminho))
+    dados = json.loads(caminho.read_text(encoding="utf-8"))
+    assert list(dados["amostras"]) == ["falha"] and dados["lentas"] == []
+
+
+def test_fases_ficam_fora_dos_percentis(tmp_path):
+    medidor = Medidor()
+    medidor.marcar_fase("janela", 123.456)
+    medidor.marcar_fase("dados", 480.04)
+    assert medidor.fases_inicializacao() == {"janela": 123.5, "dados": 480.0}
+    assert medidor.resumo() == {}
+
+    caminho = tmp_path / "diagnostico.json"
+    medidor.exportar(str(caminho))
+    assert json.loads(caminho.read_text(encoding="utf-8"))["inicializacao_ms"] == {
+        "janela": 123.5, "dados": 480.0}
@@ -0,0 +1,84 @@
+"""Calendário forense: feriados, recesso e contagem de prazos em dias úteis."""
+import datetime
+import json
+
+import pytest
+
+from dias_uteis import CalendarioForense, feriados_nacionais, pascoa
+
+D = datetime.date
+
+
+@pytest.mark.parametrize("ano, domingo", [(2024, D(2024, 3, 31)), (2025, D(2025, 4, 20)),
+                                          (2026, D(2026, 4, 5))])
+def test_pascoa(ano, domingo):
+    assert pascoa(ano) == domingo
+
+
+def test_feriados_nacionais():
+    feriados = feriados_nacionais(2025)
+    # Carnaval, Sexta-feira Santa e Corpus Christi
+    assert {D(2025, 3, 3), D(2025, 3, 4), D(2025, 4, 18), D(2025, 6, 19)} <= feriados
+    assert {D(2025, 1, 1), D(2025, 4, 21), D(2025, 11, 20), D(2025, 12, 25)} <= feriados
+    assert D(2023, 11, 20) not in feriados_nacionais(2023)
+
+
+@pytest.mark.parametrize("inicio, dias, vencimento", [
+    (D(2025, 5, 23), 1, D(2025, 5, 26)),    # Sexta + 1: segunda
+    (D(2025, 5, 24), 1, D(2025, 5, 26)),    # Intimação no sábado
+    (D(2025, 6, 18), 1, D(2025, 6, 20)),    # Corpus Christi
+    (D(2025, 12, 18), 1, D(2025, 12, 19)),
+    (D(2025, 12, 18), 2, D(2026, 1, 21)),   # Suspenso no recesso
+    (D(2025, 5, 23), 15, D(2025, 6, 13)),
+])
+def test_somar(inicio, dias, vencimento):
+    assert CalendarioForense().somar(inicio, dias) == vencimento
+
+
+def test_somar_lote_igual_a_somar_um_a_um():
+    calendario = CalendarioForense()
+    inicios = [D(2024, 1, 1) + datetime.timedelta(days=dias) for dias in range(0, 1500, 7)]
+    quantidades = [1 + dias % 30 for dias in range(len(inicios))]
+    assert calendario.somar_lote(inicios, quantidades) == [
+        CalendarioForense().somar(inicio, quantidade)
+        for inicio, quantidade in zip(inicios, quantidades)]
+    # Datas muito à frente estendem as tabelas
+    assert calendario.somar(D(2090, 5, 19), 1) == D(2090, 5, 22)
+    with pytest.raises(ValueError):
+        calendario.somar_lote(inicios, [1])
+    with pytest.raises(ValueError):
+        calendario.somar(D(2025, 5, 23), 0)
+
+
+def test_dia_util_e_restantes():
+    calendario = CalendarioForense()
+    assert calendario.dia_util(D(2025, 5, 26))
+    assert not calendario.dia_util(D(2025, 5, 25))
+    assert not calendario.dia_util(D(2026, 1, 20))
+    assert calendario.restantes(D(2025, 5, 26), D(2025, 5, 23)) == 1
+    assert calendario.restantes(D(2025, 5, 23), D(2025, 5, 26)) == -1
+    assert calendario.restantes(D(2025, 5, 23), D(2025, 5, 23)) == 0
+
+
+def test_de_arquivo(tmp_path):
+    caminho = tmp_path / "feriados.json"
+    assert CalendarioForense.de_arquivo(str(caminho)).somar(D(2025, 3, 18), 1) == D(2025, 3, 19)
+
+    caminho.write_text(json.dumps({"feriados": ["03-19", "2025-05-26"],
+                                   "recessos": [["2025-07-01", "2025-07-31"]]}), encoding="utf-8")
+    calendario = CalendarioForense.de_arquivo(str(caminho))
+    assert calendario.somar(D(2025, 3, 18), 1) == D(2025, 3, 20)
+    assert calendario.somar(D(2026, 3, 18), 1) == D(2026, 3, 20)
+    assert calendario.somar(D(2025, 5, 23), 1) == D(2025, 5, 27)
+    assert calendario.somar(D(2025, 6, 30), 1) == D(2025, 8, 1)
+    # A lista de recessos do arquivo substitui o recesso padrão
+    assert calendario.somar(D(2025, 12, 18), 2) == D(2025, 12, 22)
+
+
+@pytest.mark.parametrize("conteudo", ['{"feriados": ["13-01"]}', '{"feriados": ',
+                                      '["12-25"]', '{"recessos": [["12-20"]]}'])
+def test_arquivo_invalido(tmp_path, conteudo):
+    caminho = tmp_path / "feriados.json"
+    caminho.write_text(conteudo, encoding="utf-8")
+    with pytest.raises(ValueError):
+        CalendarioForense.de_arquivo(str(caminho))
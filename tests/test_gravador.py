@@ -0,0 +1,96 @@
+"""Gravação em segundo plano: agrupamento das rajadas e novas tentativas."""
+import pytest
+
+from armazenamento import TENTATIVAS_GRAVACAO, GravadorAssincrono
+
+
+class ArmazenamentoFalso:
+    """Registra as gravações; `falhas` são as exceções das próximas gravações"""
+
+    def __init__(self):
+        self.gravacoes = []
+        self.falhas = []
+        self.fechado = False
+
+    def salvar(self, file, data, chaves=None):
+        if self.falhas:
+            raise self.falhas.pop(0)
+        self.gravacoes.append((file, dict(data), chaves))
+
+    def fechar(self):
+        self.fechado = True
+
+
+@pytest.fixture
+def armazenamento():
+    return ArmazenamentoFalso()
+
+
+@pytest.fixture
+def gravador(armazenamento, monkeypatch):
+    """Gravador sem a thread: só grava no descarregar(), na hora que o teste pede"""
+    monkeypatch.setattr(GravadorAssincrono, "_executar", lambda self: None)
+    gravador = GravadorAssincrono(armazenamento)
+    yield gravador
+    gravador.fechar()
+
+
+def test_rajada_vira_uma_gravacao_por_arquivo(armazenamento):
+    gravador = GravadorAssincrono(armazenamento, atraso=0.05)
+    data = {}
+    for dia in ("2025-05-03", "2025-05-01", "2025-05-02", "2025-05-01"):
+        data[dia] = [dia]
+        gravador.agendar("prazos.json", data, [dia])
+    gravador.agendar("peritos.json", {"Ana": {}}, ["Ana"])
+    gravador.fechar()
+
+    assert sorted(armazenamento.gravacoes) == [
+        ("peritos.json", {"Ana": {}}, ["Ana"]),
+        ("prazos.json", data, ["2025-05-01", "2025-05-02", "2025-05-03"])]
+    assert armazenamento.fechado
+
+
+def test_arquivo_inteiro_prevalece_sobre_chaves(gravador, armazenamento):
+    gravador.agendar("prazos.json", {}, ["2025-05-01"])
+    gravador.agendar("prazos.json", {}, None)
+    gravador.agendar("prazos.json", {}, ["2025-05-02"])
+    gravador.descarregar()
+    assert armazenamento.gravacoes == [("prazos.json", {}, None)]
+
+
+def test_falha_volta_para_a_interface_e_regrava_o_arquivo_inteiro(gravador, armazenamento):
+    armazenamento.falhas.append(OSError("disco cheio"))
+    gravador.agendar("prazos.json", {"2025-05-01": []}, ["2025-05-01"])
+    gravador.descarregar()
+    file, erro = gravador.erros.get(timeout=5)
+    assert file == "prazos.json" and isinstance(erro, OSError)
+    assert armazenamento.gravacoes == []
+
+    # A próxima alteração grava tudo, não só a chave dela
+    gravador.agendar("prazos.json", {"2025-05-01": [], "2025-05-02": []}, ["2025-05-02"])
+    gravador.descarregar()
+    assert armazenamento.gravacoes == [
+        ("prazos.json", {"2025-05-01": [], "2025-05-02": []}, None)]
+
+
+def test_falha_e_refeita_ao_fechar(gravador, armazenamento):
+    armazenamento.falhas.append(OSError("disco cheio"))
+    gravador.agendar("prazos.json", {"2025-05-01": []}, ["2025-05-01"])
+    gravador.descarregar()
+    gravador.fechar()
+    assert armazenamento.gravacoes == [("prazos.json", {"2025-05-01": []}, None)]
+    assert gravador.erros.qsize() == 1
+
+
+def test_dicionario_alterado_durante_a_gravacao_tenta_de_novo(gravador, armazenamento):
+    armazenamento.falhas.extend([RuntimeError("dictionary changed size during iteration")] * 2)
+    gravador.agendar("prazos.json", {}, ["2025-05-01"])
+    gravador.descarregar()
+    assert gravador.erros.empty()
+    assert len(armazenamento.gravacoes) == 1
+
+    armazenamento.falhas.extend([RuntimeError("mudou")] * TENTATIVAS_GRAVACAO)
+    gravador.agendar("prazos.json", {}, ["2025-05-01"])
+    gravador.descarregar()
+    assert isinstance(gravador.erros.get(timeout=5)[1], RuntimeError)
+
@@ -0,0 +1,13 @@
+"""Módulos pesados ficam fora da importação do núcleo."""
+import os
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_nucleo_nao_importa_sqlite3_nem_tkinter():
+    codigo = "import sys, nucleo; print(sorted({'sqlite3', 'tkinter'} & set(sys.modules)))"
+    saida = subprocess.run([sys.executable, "-c", codigo], cwd=RAIZ, capture_output=True,
+                           text=True, check=True).stdout
+    assert saida.strip() == "[]"
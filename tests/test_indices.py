@@ -0,0 +1,157 @@
+"""Índices em memória sobre prazos e perícias."""
+import datetime
+
+from indices import (IndiceAbertos, IndiceDatas, IndiceDuplicados, IndicePeritos, IndiceProcessos, IndiceRegistros,
+                     garantir_ids, normalizar_processo, normalizar_texto, novo_id)
+from registros import Pericia, Perito, Prazo
+
+
+def prazo(processo, **campos):
+    campos.setdefault("perito_nome", "Ana Souza")
+    return Prazo(processo=processo, descricao="laudo", **campos)
+
+
+def test_garantir_ids_so_nos_itens_sem_id():
+    data = {"2025-05-01": [prazo("1", id="a"), prazo("2")],
+            "2025-05-02": [prazo("3", id="b")],
+            "2025-05-03": [prazo("4")]}
+    assert garantir_ids(data, ["2025-05-01", "2025-05-02"]) == ["2025-05-01"]
+    assert data["2025-05-01"][0].id == "a"
+    assert data["2025-05-01"][1].id
+    assert data["2025-05-03"][0].id is None
+    assert garantir_ids(data) == ["2025-05-03"]
+    assert garantir_ids(data) == []
+    ids = [item.id for itens in data.values() for item in itens]
+    assert len(set(ids)) == len(ids)
+
+
+def test_registros_por_id():
+    indice = IndiceRegistros()
+    item = prazo("1", id=novo_id())
+    indice.inserir('prazo', "2025-05-01", item)
+    assert indice.obter(item.id) == ('prazo', "2025-05-01", item)
+
+    indice.mover(item.id, "2025-06-01")
+    assert indice.obter(item.id) == ('prazo', "2025-06-01", item)
+    assert indice.remover(item.id) == ('prazo', "2025-06-01", item)
+    assert indice.obter(item.id) is None
+    assert indice.remover(item.id) is None
+
+
+def test_datas_por_intervalo_acompanham_o_indice_de_registros():
+    indice = IndiceRegistros()
+    datas = IndiceDatas()
+    indice.ouvintes.append(datas)
+    itens = [(data_str, prazo(str(numero), id=novo_id())) for numero, data_str in enumerate(
+        ["2025-05-09", "2025-05-02", "2025-05-09", "2025-06-01", "sem data"])]
+    for data_str, item in itens:
+        indice.inserir('prazo', data_str, item)
+    indice.inserir('pericia', "2025-05-05", prazo("p", id=novo_id()))
+    maio = (datetime.date(2025, 5, 1), datetime.date(2025, 5, 31))
+
+    assert datas.datas('prazo', *maio) == ["2025-05-02", "2025-05-09"]
+    assert datas.datas('pericia', *maio) == ["2025-05-05"]
+    assert datas.datas('prazo', datetime.date(2025, 5, 9), datetime.date(2025, 5, 9)) == [
+        "2025-05-09"]
+
+    # A data só sai quando perde o último item
+    indice.remover(itens[0][1].id)
+    assert datas.datas('prazo', *maio) == ["2025-05-02", "2025-05-09"]
+    indice.mover(itens[2][1].id, "2025-06-02")
+    assert datas.datas('prazo', *maio) == ["2025-05-02"]
+    assert datas.datas('prazo', datetime.date(2025, 6, 1), datetime.date(2025, 6, 30)) == [
+        "2025-06-01", "2025-06-02"]
+
+
+def test_duplicados_contam_itens_repetidos():
+    indice = IndiceDuplicados()
+    primeiro, segundo = prazo("1"), prazo("1")
+    indice.inserir('prazo', "2025-05-01", primeiro)
+    indice.inserir('prazo', "2025-05-01", segundo)  # Dados antigos podem ter repetições
+    assert indice.existe('prazo', "2025-05-01", "1")
+    assert not indice.existe('pericia', "2025-05-01", "1")
+    indice.remover('prazo', "2025-05-01", primeiro)
+    assert indice.existe('prazo', "2025-05-01", "1")
+    indice.remover('prazo', "2025-05-01", segundo)
+    assert not indice.existe('prazo', "2025-05-01", "1")
+
+
+def test_processos_com_e_sem_pontuacao():
+    assert normalizar_processo("0029304-41.2024.8.26.0100") == "00293044120248260100"
+    indice = IndiceProcessos()
+    antigo = prazo("0029304-41.2024.8.26.0100", id=novo_id())
+    novo = prazo("0029304-41.2024.8.26.0100", id=novo_id())
+    outro = prazo("1000001-00.2023.8.26.0001", id=novo_id())
+    pericia = prazo("0029304-41.2024.8.26.0100", id=novo_id())
+    indice.inserir('prazo', "2024-01-10", antigo)
+    indice.inserir('prazo', "2024-03-01", novo)
+    indice.inserir('prazo', "2024-02-01", outro)
+    indice.inserir('pericia', "2024-02-01", pericia)
+
+    for termo in ("0029304-41.2024", "0029304412024", "41.2024.8", "29"):
+        assert indice.buscar('prazo', termo) == [("2024-03-01", novo), ("2024-01-10", antigo)]
+    assert indice.buscar('pericia', "2930441") == [("2024-02-01", pericia)]
+    assert indice.buscar('prazo', "abc") == []
+    assert len(indice.buscar('prazo', "")) == 3
+
+    indice.remover('prazo', "2024-01-10", antigo)
+    indice.remover('prazo', "2024-03-01", novo)
+    assert indice.buscar('prazo', "0029304") == []
+    assert indice.buscar('pericia', "0029304") == [("2024-02-01", pericia)]
+    assert indice.buscar('prazo', "1000001") == [("2024-02-01", outro)]
+
+
+def montar_peritos(nomes):
+    indice = IndicePeritos()
+    indice.carregar(Perito(nome=nome, cpf=f"{numero:03d}.000.000-00")
+                    for numero, nome in enumerate(nomes))
+    return indice
+
+
+def test_peritos_sem_acento_e_pelo_comeco_das_palavras():
+    assert normalizar_texto("João SÁ") == "joao sa"
+    indice = montar_peritos(["José Antônio Silva", "Joana Lima", "Maria José Prado"])
+    assert indice.sugerir("jose") == ["José Antônio Silva", "Maria José Prado"]
+    assert indice.sugerir("ANTON") == ["José Antônio Silva"]
+    assert indice.sugerir("jo si") == ["José Antônio Silva"]
+    assert indice.sugerir("ilva") == []
+    assert indice.sugerir("001.0") == ["Joana Lima"]
+    assert indice.sugerir("", limite=2) == ["Joana Lima", "José Antônio Silva"]
+
+
+def test_peritos_mais_usados_primeiro():
+    nomes = [f"Perito {numero:02d}" for numero in range(60)]
+    indice = montar_peritos(nomes)
+    hoje = datetime.date(2030, 3, 4).toordinal()
+    indice.inserir('prazo', "2030-03-04", prazo("x", perito_nome="Perito 42", data_cadastro=hoje - 1))
+    indice.inserir('prazo', "2030-03-04", prazo("x", perito_nome="Perito 07", data_cadastro=hoje))
+    # "perito" casa com todos (faixa grande); "42" só com um
+    assert indice.sugerir("perito", limite=3) == ["Perito 07", "Perito 42", "Perito 00"]
+    assert indice.sugerir("perito 4", limite=3) == ["Perito 42", "Perito 40", "Perito 41"]
+
+    indice.retirar("Perito 07")
+    indice.incluir(Perito(nome="Perito 99", cpf="999.000.000-00"))
+    assert indice.sugerir("perito", limite=3) == ["Perito 42", "Perito 00", "Perito 01"]
+    assert indice.sugerir("perito 9") == ["Perito 99"]
+
+
+def test_abertos_divide_em_atrasados_e_pendentes():
+    indice = IndiceAbertos()
+    itens = {data_str: prazo("x", id=novo_id()) for data_str in ("2030-03-01", "2030-03-05",
+                                                                 "2030-03-09")}
+    for data_str, item in itens.items():
+        indice.inserir('prazo', data_str, item)
+    indice.inserir('prazo', "2030-03-02", prazo("x", id=novo_id(), concluido=True))
+    hoje = datetime.date(2030, 3, 5)
+
+    assert [data_str for _, data_str, _ in indice.atrasados(hoje)] == ["2030-03-01"]
+    assert [data_str for _, data_str, _ in indice.pendentes(hoje)] == ["2030-03-05", "2030-03-09"]
+    assert indice.contar(hoje) == (1, 2)
+
+    # Depois da primeira consulta a lista ordenada é mantida a cada alteração
+    indice.remover('prazo', "2030-03-05", itens["2030-03-05"])
+    indice.inserir('pericia', "2030-03-03", Pericia(id=novo_id(), processo="y"))
+    assert [(tipo, data_str) for tipo, data_str, _ in indice.atrasados(hoje)] == [
+        ('prazo', "2030-03-01"), ('pericia', "2030-03-03")]
+    assert indice.contar(hoje) == (2, 1)
+    assert indice.contar(datetime.date(2031, 1, 1)) == (3, 0)
@@ -0,0 +1,73 @@
+"""Agenda de lembretes: ordem dos disparos, remoções e lembretes já exibidos."""
+import datetime
+
+from indices import novo_id
+from lembretes import AgendaLembretes
+from registros import Pericia, Prazo, Prioridade
+
+
+class Relogio:
+    def __init__(self, agora):
+        self.agora = agora
+
+    def __call__(self):
+        return self.agora
+
+
+def prazo(prioridade=Prioridade.ALTA):
+    return Prazo(id=novo_id(), processo="0029304-41.2024.8.26.0100", perito_nome="Ana Souza",
+                 descricao="laudo", prioridade=prioridade)
+
+
+def test_disparos_em_ordem_e_atrasado_na_hora():
+    relogio = Relogio(datetime.datetime(2030, 3, 8, 10, 0))
+    agenda = AgendaLembretes(relogio)
+    alta = prazo()
+    pericia = Pericia(id=novo_id(), processo="1", perito_nome="Ana Souza", local="Fórum")
+    agenda.carregar([('prazo', "2030-03-10", alta), ('pericia', "2030-03-12", pericia),
+                     ('prazo', "2030-03-01", prazo())])
+
+    # O disparo de 3 dias antes já passou: sai na hora
+    assert agenda.proximo() == datetime.datetime(2030, 3, 7, 8, 0)
+    assert [texto[:30] for texto in agenda.retirar_vencidos()] == [
+        "Prazo Alta vence em 2 dias (10"]
+    assert agenda.proximo() == datetime.datetime(2030, 3, 9, 8, 0)
+
+    # Com o timer atrasado, os dias contam a partir de agora
+    relogio.agora = datetime.datetime(2030, 3, 10, 9, 0)
+    assert [texto.split(" (")[0] for texto in agenda.retirar_vencidos()] == [
+        "Prazo Alta vence hoje", "Prazo Alta vence hoje"]
+    assert agenda.proximo() == datetime.datetime(2030, 3, 11, 8, 0)
+    relogio.agora = datetime.datetime(2030, 3, 13, 9, 0)
+    assert agenda.retirar_vencidos() == []  # A perícia já passou
+    assert agenda.proximo() is None
+
+
+def test_remover_e_inserir_de_novo_nao_repete_o_exibido():
+    relogio = Relogio(datetime.datetime(2030, 3, 9, 9, 0))
+    agenda = AgendaLembretes(relogio)
+    item = prazo(Prioridade.NORMAL)
+    agenda.inserir('prazo', "2030-03-10", item)
+    assert len(agenda.retirar_vencidos()) == 1
+
+    # Edição: o item sai e volta ao índice
+    agenda.remover('prazo', "2030-03-10", item)
+    agenda.inserir('prazo', "2030-03-10", item)
+    assert agenda.retirar_vencidos() == []
+    assert agenda.proximo() == datetime.datetime(2030, 3, 10, 8, 0)
+
+    agenda.remover('prazo', "2030-03-10", item)
+    assert agenda.proximo() is None
+
+    # Passada a data, a memória dos exibidos dela é descartada
+    relogio.agora = datetime.datetime(2030, 3, 11, 9, 0)
+    assert agenda.retirar_vencidos() == []
+    assert agenda.exibidos == {}
+
+
+def test_item_resolvido_ou_vencido_nao_entra():
+    agenda = AgendaLembretes(Relogio(datetime.datetime(2030, 3, 9, 9, 0)))
+    concluido = prazo()
+    concluido.concluido = True
+    agenda.carregar([('prazo', "2030-03-10", concluido), ('prazo', "2030-03-08", prazo())])
+    assert agenda.proximo() is None
@@ -0,0 +1,56 @@
+"""Marcadores do calendário: contagem do mês exibido e alterações por dia."""
+import datetime
+
+from conftest import PERITO, processo
+from marcadores import MarcadoresCalendario, estado_do_dia, texto_marcador
+
+HOJE = datetime.date(2030, 3, 10)
+
+
+def dia(numero):
+    return datetime.date(2030, 3, numero)
+
+
+def test_estado_e_texto():
+    assert estado_do_dia("2030-03-09", 1, 2, "2030-03-10") == 'atrasado'
+    assert estado_do_dia("2030-03-10", 1, 0, "2030-03-10") == 'pendente'
+    assert estado_do_dia("2030-03-09", 0, 2, "2030-03-10") == 'concluido'
+    assert estado_do_dia("2030-03-09", 0, 0, "2030-03-10") is None
+    assert texto_marcador(1, 2) == "1 pendente(s), 2 concluído(s)"
+
+
+def test_mes_exibido_e_mutacoes(repo):
+    atrasado = repo.adicionar_prazo(dia(5), processo(1), PERITO, "laudo")
+    repo.adicionar_pericia(dia(5), processo(2), PERITO, "Clínica", "Fórum")
+    repo.adicionar_prazo(datetime.date(2030, 4, 1), processo(3), PERITO, "laudo")
+    marcadores = MarcadoresCalendario(repo.periodo, HOJE)
+    repo.indice.ouvintes.append(marcadores)
+    marcadores.exibir_mes(2030, 3)
+    assert marcadores.retirar_alteracoes() == (True, {"2030-03-05": ('atrasado', 2, 0)})
+
+    repo.concluir(atrasado.id)
+    novo = repo.adicionar_prazo(dia(20), processo(4), PERITO, "laudo")
+    repo.adicionar_prazo(datetime.date(2030, 4, 2), processo(5), PERITO, "laudo")  # Outro mês
+    assert marcadores.retirar_alteracoes() == (False, {"2030-03-05": ('atrasado', 1, 1),
+                                                       "2030-03-20": ('pendente', 1, 0)})
+
+    repo.reagendar(novo.id, dia(21))
+    assert marcadores.retirar_alteracoes() == (False, {"2030-03-20": None,
+                                                       "2030-03-21": ('pendente', 1, 0)})
+    assert marcadores.retirar_alteracoes() == (False, {})
+
+
+def test_virada_do_dia(repo):
+    repo.adicionar_prazo(dia(10), processo(1), PERITO, "laudo")
+    feito = repo.adicionar_prazo(dia(11), processo(2), PERITO, "laudo")
+    repo.concluir(feito.id)
+    repo.adicionar_prazo(dia(12), processo(3), PERITO, "laudo")
+    marcadores = MarcadoresCalendario(repo.periodo, HOJE)
+    marcadores.exibir_mes(2030, 3)
+    marcadores.retirar_alteracoes()
+
+    marcadores.definir_hoje(dia(12))
+    # Só o dia pendente que ficou para trás muda; o concluído continua igual
+    assert marcadores.retirar_alteracoes() == (False, {"2030-03-10": ('atrasado', 1, 0)})
+    marcadores.definir_hoje(dia(13))
+    assert marcadores.retirar_alteracoes() == (False, {"2030-03-12": ('atrasado', 1, 0)})
@@ -0,0 +1,322 @@
+"""Regras do Repositorio: validação, duplicados, alterações e consultas."""
+import datetime
+
+import pytest
+
+from conftest import MODOS, PERITO, processo, retrato
+
+DIA = datetime.date(2030, 3, 4)
+
+
+def test_prazo_duplicado_no_mesmo_dia(repo):
+    repo.adicionar_prazo(DIA, processo(1), PERITO, "laudo")
+    with pytest.raises(ValueError, match="Prazo já cadastrado para 2030-03-04!"):
+        repo.adicionar_prazo(DIA, processo(1), PERITO, "outro")
+    # Outro dia, outro processo ou outro tipo não são duplicados
+    repo.adicionar_prazo(DIA + datetime.timedelta(days=1), processo(1), PERITO, "laudo")
+    repo.adicionar_prazo(DIA, processo(2), PERITO, "laudo")
+    repo.adicionar_pericia(DIA, processo(1), PERITO, "Clínica", "Fórum")
+    with pytest.raises(ValueError, match="Perícia já cadastrada"):
+        repo.adicionar_pericia(DIA, processo(1), PERITO, "Clínica", "Outro local")
+
+
+def test_reagendar_e_editar_nao_criam_duplicado(repo):
+    repo.adicionar_prazo(DIA, processo(1), PERITO, "laudo")
+    outro = repo.adicionar_prazo(DIA + datetime.timedelta(days=1), processo(1), PERITO, "laudo")
+    terceiro = repo.adicionar_prazo(DIA, processo(2), PERITO, "laudo")
+    antes = retrato(repo)
+
+    with pytest.raises(ValueError, match="Prazo já cadastrado"):
+        repo.reagendar(outro.id, DIA)
+    with pytest.raises(ValueError, match="Prazo já cadastrado"):
+        repo.editar(terceiro.id, {"processo": processo(1)})
+    assert retrato(repo) == antes
+    # Reagendar para a própria data não é duplicado
+    repo.reagendar(terceiro.id, DIA)
+
+
+def test_pode_cadastrar_de_novo_depois_de_apagar(repo):
+    item = repo.adicionar_prazo(DIA, processo(1), PERITO, "laudo")
+    repo.apagar(item.id)
+    repo.adicionar_prazo(DIA, processo(1), PERITO, "laudo")
+
+
+def test_cpf_duplicado(repo):
+    with pytest.raises(ValueError, match="CPF já cadastrado!"):
+        repo.cadastrar_perito("Bruno Lima", "529.982.247-25", "(43) 98888-0000", "Engenheiro")
+    repo.cadastrar_perito("Bruno Lima", "11144477735", "(43) 98888-0000", "Engenheiro")
+    assert sorted(repo.peritos) == ["Ana Souza", "Bruno Lima"]
+    # Recadastro com o mesmo nome libera o CPF anterior
+    repo.cadastrar_perito("Bruno Lima", "39053344705", "(43) 98888-0000", "Engenheiro")
+    repo.cadastrar_perito("Carla Dias", "111.444.777-35", "(43) 97777-0000", "Contadora")
+    with pytest.raises(ValueError, match="CPF já cadastrado!"):
+        repo.cadastrar_perito("Davi Reis", "39053344705", "(43) 96666-0000", "Médico")
+
+
+def test_sugerir_peritos_acompanha_cadastros_e_uso(repo):
+    repo.cadastrar_perito("Ângela Souza", "11144477735", "(43) 98888-0000", "Engenheira")
+    assert repo.sugerir_peritos("souza") == ["Ana Souza", "Ângela Souza"]
+    assert repo.sugerir_peritos("ang") == ["Ângela Souza"]
+    assert repo.sugerir_peritos("111.444") == ["Ângela Souza"]
+    repo.adicionar_prazo(DIA, processo(1), "Ângela Souza", "laudo")
+    assert repo.sugerir_peritos("souza") == ["Ângela Souza", "Ana Souza"]
+
+
+@pytest.mark.parametrize("campos, mensagem", [
+    (dict(processo="123"), "Número do processo inválido!"),
+    (dict(perito=""), "Selecione um perito!"),
+    (dict(descricao="  "), "Descrição é obrigatória!"),
+    (dict(prioridade="Urgente"), "Prioridade inválida!"),
+    (dict(dias_uteis=0), "Dias úteis deve ser"),
+])
+def test_validacao_do_prazo(repo, campos, mensagem):
+    argumentos = dict(data=DIA, processo=processo(1), perito=PERITO, descricao="laudo")
+    argumentos.update(campos)
+    antes = retrato(repo)
+    with pytest.raises(ValueError, match=mensagem):
+        repo.adicionar_prazo(**argumentos)
+    assert retrato(repo) == antes
+    assert len(repo.historico.desfazer) == 1  # Só o cadastro do perito
+
+
+def test_prazo_em_dias_uteis(repo):
+    # Sexta-feira + 1 dia útil = segunda-feira
+    item = repo.adicionar_prazo(datetime.date(2025, 5, 23), processo(1), PERITO, "laudo",
+                                dias_uteis=1)
+    assert repo.obter(item.id)[1] == "2025-05-26"
+
+
+def test_concluir_reagendar_editar_e_apagar(repo):
+    item = repo.adicionar_prazo(DIA, processo(1), PERITO, "laudo")
+    outro = repo.adicionar_prazo(DIA, processo(2), PERITO, "laudo")
+    repo.concluir(item.id)
+    repo.reagendar(item.id, DIA + datetime.timedelta(days=1))
+    repo.editar(item.id, {"processo": processo(3)})
+    assert repo.obter(item.id) == ('prazo', "2030-03-05", item)
+    assert item.concluido and item.processo == processo(3)
+    assert repo.buscar('prazo', "0000001") == []
+    assert repo.buscar('prazo', "0000003") == [("2030-03-05", item)]
+
+    antes = retrato(repo)
+    with pytest.raises(ValueError, match="Prioridade inválida"):
+        repo.editar(item.id, {"descricao": "outra", "prioridade": "Urgente"})
+    assert retrato(repo) == antes
+
+    repo.apagar(outro.id)
+    assert repo.periodo('prazo', DIA, DIA) == []
+    with pytest.raises(ValueError, match="Item não encontrado"):
+        repo.obter(outro.id)
+
+
+def test_alteracoes_crescem_a_cada_mudanca(repo):
+    contagens = [repo.alteracoes]
+    item = repo.adicionar_prazo(DIA, processo(1), PERITO, "laudo")
+    contagens.append(repo.alteracoes)
+    repo.concluir(item.id)
+    contagens.append(repo.alteracoes)
+    repo.desfazer()
+    contagens.append(repo.alteracoes)
+    assert contagens == sorted(set(contagens))
+
+
+def contar_gravacoes(repo, monkeypatch):
+    gravacoes = []
+    salvar = repo.armazenamento.salvar
+
+    def contar(file, data, chaves=None):
+        gravacoes.append(file)
+        return salvar(file, data, chaves)
+
+    monkeypatch.setattr(repo.armazenamento, "salvar", contar)
+    return gravacoes
+
+
+def test_lote_grava_cada_arquivo_uma_vez(repo, monkeypatch):
+    gravacoes = contar_gravacoes(repo, monkeypatch)
+    with repo.lote():
+        for numero in range(5):
+            item = repo.adicionar_prazo(DIA, processo(numero), PERITO, "laudo")
+            repo.concluir(item.id)
+        repo.adicionar_pericia(DIA, processo(1), PERITO, "Clínica", "Fórum")
+        with repo.lote():  # Lote dentro de lote grava no fim do mais externo
+            repo.adicionar_prazo(DIA, processo(9), PERITO, "laudo")
+        assert gravacoes == []
+    assert sorted(gravacoes) == sorted([repo.prazos_file, repo.pericias_file])
+    # O lote inteiro é um passo só
+    repo.desfazer()
+    assert repo.periodo('prazo', DIA, DIA) == [] and repo.periodo('pericia', DIA, DIA) == []
+
+
+def test_lote_com_erro_grava_o_que_foi_feito(repo, monkeypatch):
+    gravacoes = contar_gravacoes(repo, monkeypatch)
+    with pytest.raises(ValueError):
+        with repo.lote():
+            repo.adicionar_prazo(DIA, processo(1), PERITO, "laudo")
+            repo.adicionar_prazo(DIA, processo(1), PERITO, "laudo")
+    assert gravacoes == [repo.prazos_file]
+    assert len(repo.periodo('prazo', DIA, DIA)) == 1
+
+
+def test_varios_junta_as_mensagens_de_erro(repo, monkeypatch):
+    gravacoes = contar_gravacoes(repo, monkeypatch)
+    ids = [repo.adicionar_prazo(DIA + datetime.timedelta(days=numero), processo(1), PERITO,
+                                "laudo").id for numero in range(3)]
+    del gravacoes[:]
+    erros = repo.reagendar_varios(ids + ["inexistente"], DIA)
+    assert erros == [f"{processo(1)}: Prazo já cadastrado para 2030-03-04!"] * 2 + [
+        "Item não encontrado: inexistente"]
+    assert gravacoes == []  # Nada mudou
+
+    assert repo.concluir_varios(ids) == []
+    assert gravacoes == [repo.prazos_file]
+    assert all(item.resolvido for _, _, item in map(repo.obter, ids))
+    assert repo.apagar_varios(ids) == []
+    assert repo.periodo('prazo', DIA, DIA + datetime.timedelta(days=2)) == []
+
+
+@pytest.mark.parametrize("modo", ["json", "mensal"])
+def test_desfazer_e_refazer_voltam_a_cada_estado(abrir, modo):
+    repo = abrir(modo)
+    estados = [retrato(repo)]
+    repo.cadastrar_perito(PERITO, "52998224725", "(43) 99999-0000", "Médica")
+    estados.append(retrato(repo))
+    item = repo.adicionar_prazo(DIA, processo(1), PERITO, "laudo")
+    estados.append(retrato(repo))
+    repo.editar(item.id, {"descricao": "laudo complementar", "prioridade": "Alta"})
+    estados.append(retrato(repo))
+    repo.reagendar(item.id, DIA + datetime.timedelta(days=45))
+    estados.append(retrato(repo))
+    repo.concluir(item.id)
+    estados.append(retrato(repo))
+    repo.apagar(item.id)
+    estados.append(retrato(repo))
+
+    for estado in reversed(estados[:-1]):
+        assert repo.desfazer()
+        assert retrato(repo) == estado
+    assert not repo.desfazer()
+    for estado in estados[1:4]:
+        assert repo.refazer()
+        assert retrato(repo) == estado
+
+    # O que foi desfeito também é gravado
+    repo.fechar()
+    repo = abrir(modo)
+    assert retrato(repo) == estados[3]
+
+
+def test_alteracao_nova_descarta_o_refazer(repo):
+    item = repo.adicionar_prazo(DIA, processo(1), PERITO, "laudo")
+    repo.concluir(item.id)
+    assert repo.desfazer()
+    repo.adicionar_prazo(DIA, processo(2), PERITO, "laudo")
+    assert not repo.refazer()
+    assert not repo.obter(item.id)[2].resolvido
+
+
+def test_desfazer_apagar_volta_a_mesma_posicao(repo):
+    ids = [repo.adicionar_prazo(DIA, processo(numero), PERITO, "laudo").id for numero in range(3)]
+    repo.apagar(ids[1])
+    repo.desfazer()
+    assert [item.id for _, item in repo.periodo('prazo', DIA, DIA)] == ids
+
+
+@pytest.mark.parametrize("acao", ["desfazer", "refazer"])
+def test_passo_que_falha_no_meio_nao_muda_nada(repo, monkeypatch, acao):
+    ids = [repo.adicionar_prazo(DIA, processo(numero), PERITO, "laudo").id for numero in range(3)]
+    repo.concluir_varios(ids)
+    if acao == "refazer":
+        repo.desfazer()
+    antes = retrato(repo)
+    pilhas = len(repo.historico.desfazer), len(repo.historico.refazer)
+
+    op_campos = repo._op_campos
+    chamadas = []
+
+    def falhar_na_segunda(*args):
+        chamadas.append(args)
+        if len(chamadas) == 2:
+            raise OSError("falha no meio do passo")
+        return op_campos(*args)
+
+    monkeypatch.setattr(repo, "_op_campos", falhar_na_segunda)
+    with pytest.raises(OSError):
+        getattr(repo, acao)()
+    assert retrato(repo) == antes
+    assert (len(repo.historico.desfazer), len(repo.historico.refazer)) == pilhas
+
+    # O passo continua na pilha e pode ser aplicado inteiro
+    monkeypatch.undo()
+    assert getattr(repo, acao)()
+    assert [repo.obter(id_item)[2].resolvido for id_item in ids] == [acao == "refazer"] * 3
+
+
+def test_editar_descarta_o_valor_antigo_guardado_e_desfazer_o_traz_de_volta(abrir, tmp_path):
+    (tmp_path / "prazos.json").write_text(
+        '{"2030-03-04": [{"id": "a1", "processo": "%s", "perito_nome": "%s", '
+        '"descricao": "laudo", "data_cadastro": "30/04/2025"}]}' % (processo(1), PERITO),
+        encoding="utf-8")
+    repo = abrir()
+    _, _, item = repo.obter("a1")
+    repo.editar("a1", {"data_cadastro": "2025-04-30"})
+    assert item.para_json()["data_cadastro"] == "2025-04-30"
+    repo.desfazer()
+    assert item.para_json()["data_cadastro"] == "30/04/2025"
+
+
+def test_atrasados_pendentes_e_contagem(repo):
+    hoje = datetime.date(2030, 3, 10)
+    antigo = repo.adicionar_prazo(hoje - datetime.timedelta(days=5), processo(1), PERITO, "laudo")
+    repo.adicionar_pericia(hoje - datetime.timedelta(days=1), processo(2), PERITO, "Clínica", "Fórum")
+    repo.adicionar_prazo(hoje, processo(3), PERITO, "laudo")
+    feito = repo.adicionar_prazo(hoje + datetime.timedelta(days=2), processo(4), PERITO, "laudo")
+    repo.concluir(feito.id)
+
+    assert [(tipo, data_str) for tipo, data_str, _ in repo.atrasados(hoje)] == [
+        ('prazo', "2030-03-05"), ('pericia', "2030-03-09")]
+    assert [data_str for _, data_str, _ in repo.pendentes(hoje)] == ["2030-03-10"]
+    assert repo.contar_abertos(hoje) == (2, 1)
+    repo.concluir(antigo.id)
+    assert repo.contar_abertos(hoje) == (1, 1)
+    repo.reagendar(antigo.id, hoje)  # Concluído não volta a contar
+    assert repo.contar_abertos(hoje) == (1, 1)
+
+
+@pytest.mark.parametrize("modo", MODOS)
+def test_buscar_por_processo(abrir, modo):
+    repo = abrir(modo)
+    repo.cadastrar_perito(PERITO, "52998224725", "(43) 99999-0000", "Médica")
+    repo.adicionar_prazo(DIA, "0029304-41.2024.8.26.0100", PERITO, "laudo")
+    repo.adicionar_prazo(DIA + datetime.timedelta(days=3), "0029304-41.2024.8.26.0100", PERITO,
+                         "quesitos")
+    repo.adicionar_prazo(DIA, processo(2), PERITO, "laudo")
+    for termo in ("0029304-41", "002930441", "29304"):
+        assert [data_str for data_str, _ in repo.buscar('prazo', termo)] == [
+            "2030-03-07", "2030-03-04"]
+    assert repo.buscar('pericia', "0029304") == []
+    assert repo.buscar('prazo', "%") == []
+
+
+@pytest.mark.parametrize("modo", MODOS)
+def test_periodo_em_ordem_de_data(abrir, modo):
+    repo = abrir(modo)
+    repo.cadastrar_perito(PERITO, "52998224725", "(43) 99999-0000", "Médica")
+    for dias in (20, 0, 10, 40):
+        repo.adicionar_prazo(DIA + datetime.timedelta(days=dias), processo(dias), PERITO, "laudo")
+    assert [data_str for data_str, _ in repo.periodo(
+        'prazo', DIA, DIA + datetime.timedelta(days=20))] == [
+        "2030-03-04", "2030-03-14", "2030-03-24"]
+
+
+@pytest.mark.parametrize("modo", MODOS)
+def test_consultas_nao_esperam_pelo_gravador(abrir, modo, monkeypatch):
+    repo = abrir(modo, assincrono=True)
+    repo.cadastrar_perito(PERITO, "52998224725", "(43) 99999-0000", "Médica")
+    repo.adicionar_prazo(DIA, processo(1), PERITO, "laudo")
+
+    def descarregar(file=None):
+        raise AssertionError("consulta esperou pela gravação")
+
+    monkeypatch.setattr(repo.gravador, "descarregar", descarregar)
+    assert len(repo.periodo('prazo', DIA, DIA)) == 1
+    assert len(repo.buscar('prazo', "0000001")) == 1
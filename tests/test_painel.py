@@ -0,0 +1,69 @@
+"""Painel de perícias dos próximos 30 dias: alterações de uma linha e virada do dia."""
+import datetime
+
+from conftest import PERITO, processo
+from painel import PainelPericias, formatar_linha_painel
+
+HOJE = datetime.date(2030, 3, 4)
+
+
+def aplicar(linhas, painel):
+    """Aplica as alterações pendentes numa lista, como a interface faz no Text"""
+    for alteracao in painel.retirar_pendentes():
+        if alteracao[0] == "inserir":
+            linhas.insert(alteracao[1], alteracao[2])
+        else:
+            del linhas[alteracao[1]]
+    return linhas
+
+
+def refeito(repo, hoje):
+    """Linhas de um painel montado do zero, para comparar com o incremental"""
+    return aplicar([], PainelPericias(lambda inicio, fim: repo.periodo('pericia', inicio, fim),
+                                      hoje))
+
+
+def pericia(repo, dias, numero):
+    return repo.adicionar_pericia(HOJE + datetime.timedelta(days=dias), processo(numero), PERITO,
+                                  "Clínica", "Fórum")
+
+
+def test_alteracoes_viram_linhas(repo):
+    primeira = pericia(repo, 5, 1)
+    painel = PainelPericias(lambda inicio, fim: repo.periodo('pericia', inicio, fim), HOJE)
+    repo.indice.ouvintes.append(painel)
+    linhas = aplicar([], painel)
+    assert linhas == [formatar_linha_painel("2030-03-09", primeira)]
+
+    segunda = pericia(repo, 5, 2)
+    pericia(repo, 2, 3)
+    fora = pericia(repo, 31, 4)
+    repo.concluir(primeira.id)
+    repo.editar(segunda.id, {"especialidade": "Ortopedia"})
+    assert aplicar(linhas, painel) == refeito(repo, HOJE)
+    assert linhas[1].startswith("✔ Data: 2030-03-09")  # Concluída, na mesma posição
+
+    repo.reagendar(fora.id, HOJE + datetime.timedelta(days=1))
+    repo.reagendar(segunda.id, HOJE + datetime.timedelta(days=40))
+    repo.apagar(primeira.id)
+    repo.adicionar_prazo(HOJE, processo(5), PERITO, "laudo")  # Prazos não entram
+    assert aplicar(linhas, painel) == refeito(repo, HOJE)
+    assert len(linhas) == 2
+
+
+def test_virada_do_dia(repo):
+    for dias, numero in ((0, 1), (1, 2), (30, 3), (31, 4), (33, 5)):
+        pericia(repo, dias, numero)
+    painel = PainelPericias(lambda inicio, fim: repo.periodo('pericia', inicio, fim), HOJE)
+    linhas = aplicar([], painel)
+    assert len(linhas) == 3
+
+    for dias in (1, 3, 3):
+        painel.avancar(HOJE + datetime.timedelta(days=dias))
+        assert aplicar(linhas, painel) == refeito(repo, HOJE + datetime.timedelta(days=dias))
+    assert [linha.split(" | ")[0][-10:] for linha in linhas] == [
+        "2030-04-03", "2030-04-04", "2030-04-06"]
+
+    # Relógio para trás: a janela é refeita
+    painel.avancar(HOJE)
+    assert aplicar(linhas, painel) == refeito(repo, HOJE)
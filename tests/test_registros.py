@@ -0,0 +1,57 @@
+"""Registros de atributos fixos: conversão de e para o formato do arquivo."""
+import datetime
+
+import pytest
+
+from registros import Pericia, Perito, Prazo, Prioridade, converter_arquivo
+
+
+def test_prazo_volta_ao_arquivo_como_veio():
+    dados = {"id": "a1", "processo": "0029304-41.2024.8.26.0100", "perito_nome": "Ana Souza",
+             "descricao": "laudo", "prioridade": "Alta", "concluido": True,
+             "data_cadastro": "2025-04-30"}
+    prazo = Prazo.de_json(dados)
+    assert prazo.prioridade is Prioridade.ALTA and prazo.resolvido
+    assert prazo.data_cadastro == datetime.date(2025, 4, 30).toordinal()
+    assert prazo.observacoes == ""
+    assert prazo.para_json() == dados
+
+
+def test_campos_desconhecidos_e_valores_fora_do_padrao_sao_mantidos():
+    dados = {"processo": "1", "perito_nome": "Ana Souza", "especialidade": "Clínica",
+             "local": "Fórum", "observacoes": None, "realizada": False,
+             "data_cadastro": "30/04/2025", "sala": 12}
+    pericia = Pericia.de_json(dados)
+    assert pericia.data_cadastro is None
+    assert pericia.extras == {"data_cadastro": "30/04/2025", "sala": 12}
+    assert pericia.para_json() == dados
+
+
+def test_converter_valida_sem_alterar_o_registro():
+    prazo = Prazo(processo="1", perito_nome="Ana Souza", descricao="laudo")
+    with pytest.raises(ValueError, match="Prioridade inválida"):
+        prazo.converter({"descricao": "outra", "prioridade": "Urgente"})
+    with pytest.raises(ValueError, match="Campo desconhecido"):
+        prazo.converter({"id": "x"})
+    assert prazo.converter({"prioridade": "baixa", "observacoes": "",
+                            "data_cadastro": "2025-04-30"}) == {
+        "prioridade": Prioridade.BAIXA, "observacoes": "",
+        "data_cadastro": datetime.date(2025, 4, 30).toordinal()}
+    assert (prazo.descricao, prazo.prioridade) == ("laudo", Prioridade.NORMAL)
+    assert prazo.texto("prioridade") == "Normal" and prazo.texto("data_cadastro") == ""
+
+
+def test_prioridade_de_texto():
+    assert Prioridade.de_texto("Normal") is Prioridade.NORMAL
+    assert Prioridade.de_texto(" alta ") is Prioridade.ALTA
+    assert Prioridade.de_texto("Urgente") is None and Prioridade.de_texto(2) is None
+
+
+def test_converter_arquivo():
+    peritos = converter_arquivo("peritos", {"Ana Souza": {"nome": "Ana Souza", "cpf": "1"}})
+    assert isinstance(peritos["Ana Souza"], Perito)
+    prazos = converter_arquivo("prazos", {"2025-05-02": [{"processo": "1"}]})
+    assert isinstance(prazos["2025-05-02"][0], Prazo)
+    assert converter_arquivo("outro", {"x": 1}) == {"x": 1}
+    with pytest.raises(TypeError):
+        Prazo(processo="1", cor="azul")